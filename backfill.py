@@ -0,0 +1,223 @@
+"""
+Rebuild past days of FotMob match and transfer reports in one run.
+
+A team page already lists the whole season's fixtures, so each team page and
+transfers page is loaded once for the whole range. Every finished fixture in
+the range is picked from it, and the match pages are analysed in parallel.
+Match pages shared by two subscribed teams are analysed only once.
+Analysed match pages are cached in datas/backfill/match_details/, so an
+interrupted backfill resumes where it stopped.
+
+Reports are written where the daily collect_news.py run would have put
+them: a match or transfer on day X goes into datas/fotmob/<X+1>/. Existing
+daily files are kept unless --overwrite is given. RSS news cannot be
+backfilled, because Google News only serves current articles.
+
+    python backfill.py --start 20250815 --end 20251231
+    python backfill.py --start 20250815 --end 20251231 --teams Arsenal,Chelsea --workers 6
+    python backfill.py --start 20250815 --end 20251231 --overwrite
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+import argparse
+import json
+import os
+
+from bundles import write_bundle
+from collect_news import write_fotmob_reports
+from config import TEAMS
+from metrics import tracer
+from scrappers.fotmob import fot_mob_crawler
+from scrappers.records import MatchEvent, MatchStats
+from scrappers.resilience import submit_with_context
+from scrappers.team_registry import team_registry
+
+DETAILS_CACHE_DIR = "datas/backfill/match_details"
+DEFAULT_WORKERS = 4
+
+
+def output_date(moment: datetime) -> str:
+    """Date of the daily run that would have collected something that happened at moment"""
+    return (moment + timedelta(days=1)).strftime("%Y%m%d")
+
+
+class Backfill:
+    def __init__(self, teams, start_date: str, end_date: str, workers=DEFAULT_WORKERS, overwrite=False, refresh=False):
+        self.teams = teams
+        self.start_dt, self.end_dt = fot_mob_crawler.parse_date_range(start_date, end_date)
+        self.workers = workers
+        self.overwrite = overwrite
+        self.refresh = refresh
+        self.failures = []
+
+    ### MATCH DETAILS CACHE ###
+    def _details_path(self, page_url):
+        return os.path.join(DETAILS_CACHE_DIR, f"{fot_mob_crawler._traffic_name(page_url)}.json")
+
+    def load_details(self, page_url):
+        path = self._details_path(page_url)
+        if self.refresh or not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            data = json.load(f)
+        return {
+            "competition": data["competition"],
+            "stats": MatchStats.from_dict(data["stats"]),
+            "events": [MatchEvent.from_dict(event) for event in data["events"]],
+        }
+
+    def save_details(self, page_url, details):
+        path = self._details_path(page_url)
+        os.makedirs(DETAILS_CACHE_DIR, exist_ok=True)
+        with open(path + ".tmp", "w") as f:
+            json.dump({
+                "page_url": page_url,
+                "competition": details["competition"],
+                "stats": details["stats"].to_dict(),
+                "events": [event.to_dict() for event in details["events"]],
+            }, f, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+
+    def analyze(self, page_url):
+        with tracer.span("backfill.match_page", url=page_url):
+            details = fot_mob_crawler._analyze_match_details(page_url)
+        self.save_details(page_url, details)
+        return details
+
+    ### STEPS ###
+    def load_team(self, team):
+        """(team data, finished fixtures, transfers) for the whole range, one page load each"""
+        entry = team_registry.get(team["name"]) or {}
+        if "fotmob_id" not in entry:
+            raise RuntimeError("not found in FOTMOB_TEAMS")
+        with tracer.team(team["name"]):
+            with tracer.span("backfill.team_page"):
+                team_data = fot_mob_crawler._get_team_data(entry["fotmob_id"])
+            if not team_data:
+                raise RuntimeError("could not capture FotMob team data")
+            fixtures = fot_mob_crawler.get_finished_fixtures(self.start_dt, self.end_dt, team_data)
+            with tracer.span("backfill.transfers"):
+                transfers = fot_mob_crawler.get_team_transfers(self.start_dt, self.end_dt, team_data, entry["fotmob_id"])
+        return team_data, fixtures, transfers
+
+    def _map(self, fn, items, describe):
+        """Run fn over items on the worker pool; returns {item: result} for the ones that succeeded"""
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {submit_with_context(executor, fn, item): item for item in items}
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    results[item] = future.result()
+                except Exception as e:
+                    print(f"{describe(item)} failed: {e}")
+                    self.failures.append(describe(item))
+        return results
+
+    def run(self):
+        names = [team["name"] for team in self.teams]
+        by_name = {team["name"]: team for team in self.teams}
+        print(f"Loading {len(names)} team page(s)...")
+        loaded = self._map(lambda name: self.load_team(by_name[name]), names, lambda name: f"[{name}] team page")
+
+        page_urls = list(dict.fromkeys(
+            fixture.get("pageUrl")
+            for _, fixtures, _ in loaded.values()
+            for fixture, _ in fixtures
+            if fixture.get("pageUrl")
+        ))
+        details = {}
+        for page_url in page_urls:
+            cached = self.load_details(page_url)
+            if cached is not None:
+                details[page_url] = cached
+        pending = [page_url for page_url in page_urls if page_url not in details]
+        tracer.record("backfill.match_page", 0.0, cache_hits=len(details))
+        print(f"{len(page_urls)} match page(s) in range: {len(details)} cached, analysing {len(pending)} with {self.workers} worker(s)")
+        details.update(self._map(self.analyze, pending, lambda page_url: f"match page {page_url}"))
+
+        last_day = min(self.end_dt, datetime.now(timezone.utc) - timedelta(days=1))
+        days = []
+        current = self.start_dt
+        while current <= last_day:
+            days.append(output_date(current))
+            current += timedelta(days=1)
+
+        written_days = set()
+        for name in names:
+            if name not in loaded:
+                continue
+            team_data, fixtures, transfers = loaded[name]
+            team_name = fot_mob_crawler._transform_team_name(team_data.get("details", {}).get("name", name))
+            matches_by_day = {}
+            incomplete_days = set()
+            for fixture, match_date in fixtures:
+                day = output_date(match_date)
+                if fixture.get("pageUrl") not in details:
+                    # Leave the day unwritten so the next run can fill it in
+                    incomplete_days.add(day)
+                    continue
+                matches_by_day.setdefault(day, []).append(
+                    fot_mob_crawler.build_match(fixture, match_date, team_name, details[fixture["pageUrl"]])
+                )
+            transfers_by_day = {}
+            for transfer in transfers:
+                transfer_date = datetime.fromisoformat(transfer.date.replace("Z", "+00:00"))
+                transfers_by_day.setdefault(output_date(transfer_date), []).append(transfer)
+
+            written = 0
+            for day in days:
+                if day in incomplete_days:
+                    continue
+                path = f"datas/fotmob/{day}/team_daily_report_{name.replace(' ', '_')}_matches.md"
+                if os.path.exists(path) and not self.overwrite:
+                    continue
+                day_start, day_end = fot_mob_crawler.parse_date_range(
+                    (datetime.strptime(day, "%Y%m%d") - timedelta(days=1)).strftime("%Y%m%d"), day
+                )
+                with tracer.team(name):
+                    write_fotmob_reports(name, day, day_start, day_end, matches_by_day.get(day, []), transfers_by_day.get(day, []))
+                written_days.add(day)
+                written += 1
+            print(f"[{name}] {len(fixtures)} match(es), {len(transfers)} transfer(s), {written} day(s) written"
+                  + (f", {len(incomplete_days)} day(s) left for the next run" if incomplete_days else ""))
+
+        for day in sorted(written_days):
+            write_bundle(day)
+        return not self.failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild past days of FotMob reports in one run")
+    parser.add_argument("--start", type=str, required=True, help="First match date in YYYYMMDD format")
+    parser.add_argument("--end", type=str, required=True, help="Last match date in YYYYMMDD format")
+    parser.add_argument("--teams", type=str, help="Comma-separated team names (default: every team in setting.yml)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"Match pages analysed in parallel (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--overwrite", action="store_true", help="Replace daily reports that already exist")
+    parser.add_argument("--refresh", action="store_true", help="Re-analyse match pages even if they are cached")
+    args = parser.parse_args()
+
+    teams = TEAMS
+    if args.teams:
+        wanted = [name.strip() for name in args.teams.split(",")]
+        unknown = [name for name in wanted if name not in {team["name"] for team in TEAMS}]
+        if unknown:
+            parser.error(f"Unknown team(s): {', '.join(unknown)}")
+        teams = [team for team in TEAMS if team["name"] in wanted]
+    try:
+        datetime.strptime(args.start, "%Y%m%d")
+        datetime.strptime(args.end, "%Y%m%d")
+    except ValueError as e:
+        parser.error(str(e))
+
+    tracer.start_run("backfill")
+    try:
+        ok = Backfill(teams, args.start, args.end, args.workers, args.overwrite, args.refresh).run()
+    finally:
+        tracer.write()
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
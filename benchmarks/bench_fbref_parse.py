@@ -0,0 +1,119 @@
+"""
+Micro-benchmark: FBref match log parsing.
+
+Compares the previous BeautifulSoup + pd.read_html path with the targeted
+lxml path in FBrefScraper.parse_match_logs on a synthetic season page whose
+matchlogs_all table sits inside an HTML comment, as on fbref.com.
+
+    python -m benchmarks.bench_fbref_parse [--matches 60] [--filler-tables 12] [--repeat 5]
+"""
+from io import StringIO
+import argparse
+import os
+import random
+import timeit
+
+for key in ["OPENAI_API_KEY", "GOOGLE_CLOUD_EMAIL", "GOOGLE_CLOUD_SPREADSHEET_URL", "SMTP_USERNAME", "SMTP_PASSWORD"]:
+    os.environ.setdefault(key, "benchmark")
+
+from bs4 import BeautifulSoup
+import pandas as pd
+
+from scrappers.fbref import FBrefScraper
+
+MATCHLOG_HEADERS = [
+    ("date", "Date"), ("start_time", "Time"), ("comp", "Comp"), ("round", "Round"),
+    ("dayofweek", "Day"), ("venue", "Venue"), ("result", "Result"), ("goals_for", "GF"),
+    ("goals_against", "GA"), ("opponent", "Opponent"), ("xg_for", "xG"), ("xg_against", "xGA"),
+    ("possession", "Poss"), ("attendance", "Attendance"), ("captain", "Captain"),
+    ("formation", "Formation"), ("referee", "Referee"), ("match_report", "Match Report"), ("notes", "Notes"),
+]
+
+
+def make_season_page(n_matches: int = 60, n_filler_tables: int = 12, seed: int = 0) -> bytes:
+    """Build an FBref-like season page with the match log table inside a comment"""
+    rng = random.Random(seed)
+    head = "".join(f'<th data-stat="{stat}" scope="col">{label}</th>' for stat, label in MATCHLOG_HEADERS)
+    rows = []
+    for i in range(n_matches):
+        gf, ga = rng.randint(0, 4), rng.randint(0, 4)
+        values = {
+            "date": f"2025-{8 + i // 12 % 5:02d}-{1 + i % 28:02d}", "start_time": "15:00",
+            "comp": rng.choice(["Premier League", "FA Cup", "Champions Lg", "EFL Cup"]),
+            "round": f"Matchweek {i + 1}", "dayofweek": "Sat", "venue": rng.choice(["Home", "Away"]),
+            "result": "W" if gf > ga else "L" if gf < ga else "D", "goals_for": str(gf),
+            "goals_against": str(ga), "opponent": f"Opponent {i}", "xg_for": f"{rng.random() * 3:.1f}",
+            "xg_against": f"{rng.random() * 3:.1f}", "possession": str(rng.randint(30, 70)),
+            "attendance": f"{rng.randint(20000, 75000):,}", "captain": "Captain Name",
+            "formation": "4-2-3-1", "referee": "Referee Name", "match_report": '<a href="/en/matches/x">Match Report</a>',
+            "notes": "",
+        }
+        cells = "".join(
+            f'<th scope="row" data-stat="{stat}"><a href="/en/matches/{i}">{values[stat]}</a></th>' if stat == "date"
+            else f'<td data-stat="{stat}">{values[stat]}</td>'
+            for stat, _ in MATCHLOG_HEADERS
+        )
+        rows.append(f"<tr>{cells}</tr>")
+        if i and i % 20 == 0:
+            rows.append(f'<tr class="thead">{head}</tr>')
+    matchlogs = (
+        '<table class="stats_table sortable" id="matchlogs_all">'
+        f"<caption>Scores &amp; Fixtures</caption><thead><tr>{head}</tr></thead>"
+        f"<tbody>{''.join(rows)}</tbody></table>"
+    )
+
+    fillers = []
+    for t in range(n_filler_tables):
+        filler_rows = "".join(
+            "<tr>" + "".join(f'<td data-stat="c{c}">{rng.randint(0, 999)}</td>' for c in range(20)) + "</tr>"
+            for _ in range(40)
+        )
+        fillers.append(f'<div class="table_wrapper"><!--\n<table id="stats_{t}"><tbody>{filler_rows}</tbody></table>\n--></div>')
+
+    script = "<script>" + "var x = 1;" * 5000 + "</script>"
+    page = (
+        "<!DOCTYPE html><html><head><title>Match Logs</title>" + script + "</head><body>"
+        + "".join(fillers[: n_filler_tables // 2])
+        + f'<div class="table_wrapper" id="all_matchlogs"><!--\n{matchlogs}\n--></div>'
+        + "".join(fillers[n_filler_tables // 2:])
+        + "</body></html>"
+    )
+    return page.encode("utf-8")
+
+
+def legacy_parse(html: bytes) -> pd.DataFrame:
+    """Previous path: full BeautifulSoup parse, comment scan, pd.read_html"""
+    soup = BeautifulSoup(BeautifulSoup(html, "lxml").prettify(), "lxml")
+    table = soup.find("table", id="matchlogs_all")
+    if table:
+        return pd.read_html(StringIO(str(table)))[0]
+    comments = soup.find_all(string=lambda text: isinstance(text, str) and "<table" in text)
+    for c in comments:
+        if 'id="matchlogs_all"' in c:
+            return pd.read_html(StringIO(str(c)))[0]
+    raise RuntimeError("Match log table not found")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FBref match log parsing")
+    parser.add_argument("--matches", type=int, default=60)
+    parser.add_argument("--filler-tables", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    html = make_season_page(args.matches, args.filler_tables)
+    scraper = FBrefScraper()
+
+    legacy_df = legacy_parse(html)
+    lxml_df = scraper.parse_match_logs(html)
+    # read_html keeps the repeated header rows as data; the lxml path drops them
+    assert len(legacy_df[legacy_df["Date"] != "Date"]) == len(lxml_df)
+
+    print(f"page size: {len(html) / 1024:.0f} KiB, matches: {len(lxml_df)}")
+    for name, fn in [("bs4 + read_html", legacy_parse), ("lxml targeted", scraper.parse_match_logs)]:
+        best = min(timeit.repeat(lambda: fn(html), number=1, repeat=args.repeat))
+        print(f"{name:<16} {best * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
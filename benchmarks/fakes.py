@@ -0,0 +1,381 @@
+"""
+Local stand-ins for the pipeline's external services, for benchmarks/loadtest.py.
+
+One threaded HTTP server answers for FotMob (team, transfers and match
+pages), Google News RSS, the OpenAI chat completions API, the subscriber
+sheet (as a JSON list of rows) and the GCS JSON API; a small SMTP server
+accepts the newsletters. Every request first passes through an Injector,
+which adds the configured latency (with +-50% jitter) and fails the
+configured share of requests, and records per-service latency.
+
+The data is synthetic and sized by Scale: teams named "Load Team 001"...,
+each with one finished match and one transfer on the collection day, and
+subscribers that follow one to three teams.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+import base64
+import hashlib
+import json
+import os
+import random
+import socketserver
+import threading
+import time
+
+SERVICES = ("fotmob", "rss", "openai", "sheets", "gcs", "smtp")
+# Headers of the subscriber sheet (see google_sheet_parser.py)
+TEAM_COLUMN = "어떤 팀의 소식을 받아보고 싶나요?"
+EMAIL_COLUMN = "뉴스 레터를 수신할 이메일을 입력해주세요."
+FIRST_TEAM_ID = 900001
+
+
+@dataclass
+class Scale:
+    teams: int = 6
+    subscribers: int = 100
+    news_items: int = 10
+    completion_chars: int = 2000
+    seed: int = 0
+
+    def team_names(self):
+        return [f"Load Team {i + 1:03d}" for i in range(self.teams)]
+
+    def team_id(self, index):
+        return FIRST_TEAM_ID + index
+
+
+class Injector:
+    """Per-service latency and error injection, plus the latencies it produced"""
+
+    def __init__(self, latency_ms=None, error_rate=None, seed=0):
+        self.latency_ms = latency_ms or {}
+        self.error_rate = error_rate or {}
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = {service: 0 for service in SERVICES}
+        self.errors = {service: 0 for service in SERVICES}
+        self.latencies = {service: [] for service in SERVICES}
+
+    def __call__(self, service):
+        """Sleep for the service's latency; True when this request should fail"""
+        with self.lock:
+            base = self.latency_ms.get(service, 0)
+            delay = base * self.random.uniform(0.5, 1.5) / 1000 if base else 0.0
+            fail = self.random.random() < self.error_rate.get(service, 0)
+            self.requests[service] += 1
+            self.errors[service] += int(fail)
+            self.latencies[service].append(delay)
+        if delay:
+            time.sleep(delay)
+        return fail
+
+
+### SYNTHETIC DATA ###
+def _iso(moment):
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _slug(name):
+    return name.lower().replace(" ", "-")
+
+
+def fotmob_team_payload(scale: Scale, index: int, match_day: datetime) -> dict:
+    """Team overview data: one finished match against the next team on match_day"""
+    names = scale.team_names()
+    name = names[index]
+    opponent = names[(index + 1) % len(names)] if len(names) > 1 else "Load Opponent"
+    kickoff = match_day.replace(hour=15, minute=0, second=0, microsecond=0)
+    home = index % 2 == 0
+    return {
+        "details": {"id": scale.team_id(index), "name": name, "shortName": name},
+        "fixtures": {"allFixtures": {"fixtures": [{
+            "id": 4900000 + index,
+            "pageUrl": f"/matches/{_slug(name)}-vs-{_slug(opponent)}/{index:04d}#{4900000 + index}",
+            "opponent": {"id": 0, "name": opponent},
+            "home": {"id": scale.team_id(index), "name": name} if home else {"id": 0, "name": opponent},
+            "away": {"id": 0, "name": opponent} if home else {"id": scale.team_id(index), "name": name},
+            "tournament": {"name": "Load League", "leagueId": 0},
+            "status": {"utcTime": _iso(kickoff), "finished": True, "started": True, "cancelled": False, "scoreStr": "2 - 1"},
+        }]}},
+    }
+
+
+def fotmob_transfers_payload(scale: Scale, index: int, match_day: datetime) -> dict:
+    name = scale.team_names()[index]
+    return {"transfers": [{
+        "name": f"Load Player {index + 1:03d}",
+        "fromClub": "Load Seller FC",
+        "toClub": name,
+        "transferDate": _iso(match_day.replace(hour=12, minute=0, second=0, microsecond=0)),
+    }]}
+
+
+FOTMOB_MATCH_PAGE = (
+    "<!doctype html><html><body>"
+    '<div class="MFHeaderLeagueCSS"><span>Load League</span></div>'
+    '<div class="PossessionSegment"><span>55%</span><span>45%</span></div>'
+    '<div class="StatValue"><span>1.84</span><span>0.92</span><span>14</span><span>8</span></div>'
+    "</body></html>"
+)
+
+
+def rss_feed(query: str, count: int, now: datetime) -> bytes:
+    items = "".join(
+        f"<item><title>{query} transfer story {i} - Sky Sports</title>"
+        f"<link>https://news.example.com/{quote(query)}/{now:%Y%m%d}/{i}</link>"
+        f"<guid isPermaLink=\"false\">{now:%Y%m%d}-{i}</guid>"
+        f"<pubDate>{format_datetime(now - timedelta(hours=i))}</pubDate>"
+        f"<description>Story {i}</description></item>"
+        for i in range(count)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        f"<title>{query} - Google News</title><link>https://news.google.com/</link>{items}</channel></rss>"
+    ).encode("utf-8")
+
+
+def subscriber_rows(scale: Scale) -> list:
+    """Sheet rows: every subscriber follows one to three teams"""
+    rng = random.Random(scale.seed)
+    names = scale.team_names()
+    rows = []
+    for i in range(scale.subscribers):
+        teams = rng.sample(names, min(len(names), rng.randint(1, 3)))
+        rows.append({TEAM_COLUMN: ", ".join(teams), EMAIL_COLUMN: f"subscriber{i:06d}@loadtest.invalid"})
+    return rows
+
+
+def chat_completion(body: dict, completion_chars: int) -> dict:
+    prompt_chars = sum(len(str(message.get("content", ""))) for message in body.get("messages", []))
+    content = ("## Load test section\n\n" + "Synthetic newsletter text. " * (completion_chars // 27 + 1))[:completion_chars]
+    prompt_tokens = prompt_chars // 4
+    completion_tokens = len(content) // 4
+    return {
+        "id": f"chatcmpl-loadtest-{time.time_ns()}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "unknown"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens},
+    }
+
+
+### HTTP ###
+class FakeServices(ThreadingHTTPServer):
+    """
+    Routes by path prefix:
+        /fotmob/...          team overview, transfers and match pages (+ /fotmob/api/transfers)
+        /rss/search          Google News RSS search
+        /openai/v1/...       chat completions
+        /sheets/records      subscriber rows as JSON
+        /storage/v1, /download/storage/v1, /upload/storage/v1
+                             GCS JSON API over the files under bucket_dir
+    """
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, scale: Scale, injector: Injector, bucket_dir: str, match_day: datetime, address=("127.0.0.1", 0)):
+        super().__init__(address, FakeHandler)
+        self.scale = scale
+        self.injector = injector
+        self.bucket_dir = bucket_dir
+        self.match_day = match_day
+        self.team_index = {scale.team_id(i): i for i in range(scale.teams)}
+        self.subscribers = json.dumps(subscriber_rows(scale), ensure_ascii=False).encode("utf-8")
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b"", content_type="application/json", headers=None):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        elif isinstance(body, (dict, list)):
+            body = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _service(self, path):
+        if path.startswith("/fotmob/"):
+            return "fotmob"
+        if path.startswith("/rss/"):
+            return "rss"
+        if path.startswith("/openai/"):
+            return "openai"
+        if path.startswith("/sheets/"):
+            return "sheets"
+        if "/storage/v1/" in path:
+            return "gcs"
+        return None
+
+    def _handle(self, method):
+        parts = urlsplit(self.path)
+        path, query = parts.path, parse_qs(parts.query)
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        service = self._service(path)
+        if service is None:
+            return self._send(404, {"error": f"no stand-in for {path}"})
+        if self.server.injector(service):
+            return self._send(503, {"error": {"message": "injected failure", "type": "server_error"}})
+        return getattr(self, f"_{service}")(method, path, query, body)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    ### SERVICES ###
+    def _fotmob(self, method, path, query, body):
+        server = self.server
+        segments = path.strip("/").split("/")
+        if segments[1:2] == ["teams"] and len(segments) >= 4:
+            index = server.team_index.get(int(segments[2]))
+            if index is None:
+                return self._send(404, "unknown team", "text/html")
+            if segments[3] == "overview":
+                payload = fotmob_team_payload(server.scale, index, server.match_day)
+                page = (
+                    "<!doctype html><html><body>"
+                    '<script id="__NEXT_DATA__" type="application/json">'
+                    f"{json.dumps({'props': {'pageProps': payload}})}</script></body></html>"
+                )
+                return self._send(200, page, "text/html")
+            if segments[3] == "transfers":
+                page = f"<!doctype html><html><body><script>fetch('/fotmob/api/transfers?teamId={segments[2]}')</script></body></html>"
+                return self._send(200, page, "text/html")
+        if segments[1:3] == ["api", "transfers"]:
+            index = server.team_index.get(int(query.get("teamId", ["0"])[0]))
+            if index is None:
+                return self._send(404, {"error": "unknown team"})
+            return self._send(200, fotmob_transfers_payload(server.scale, index, server.match_day))
+        if segments[1:2] == ["matches"]:
+            return self._send(200, FOTMOB_MATCH_PAGE, "text/html")
+        return self._send(404, "not found", "text/html")
+
+    def _rss(self, method, path, query, body):
+        search = query.get("q", [""])[0]
+        team = search.split('"')[1] if search.count('"') >= 2 else search
+        feed = rss_feed(team, self.server.scale.news_items, datetime.now(timezone.utc))
+        return self._send(200, feed, "application/rss+xml", {"ETag": f'"{hashlib.sha1(feed).hexdigest()}"'})
+
+    def _openai(self, method, path, query, body):
+        if not path.endswith("/chat/completions"):
+            return self._send(404, {"error": {"message": f"unsupported endpoint {path}"}})
+        return self._send(200, chat_completion(json.loads(body or b"{}"), self.server.scale.completion_chars))
+
+    def _sheets(self, method, path, query, body):
+        return self._send(200, self.server.subscribers)
+
+    def _gcs(self, method, path, query, body):
+        # /storage/v1/b/<bucket>/o[/<object>], optionally under /download or /upload
+        segments = path.split("/storage/v1/b/", 1)[1].split("/", 2)
+        bucket = segments[0]
+        root = os.path.join(self.server.bucket_dir, bucket)
+        if len(segments) == 2 or not segments[2]:
+            prefix = query.get("prefix", [""])[0]
+            items = []
+            for dirpath, _, filenames in os.walk(root):
+                for filename in filenames:
+                    name = os.path.relpath(os.path.join(dirpath, filename), root).replace(os.sep, "/")
+                    if name.startswith(prefix):
+                        items.append(self._object_resource(bucket, name, os.path.join(dirpath, filename)))
+            return self._send(200, {"kind": "storage#objects", "items": sorted(items, key=lambda item: item["name"])})
+        name = unquote(segments[2])
+        local_path = os.path.join(root, name)
+        if not os.path.isfile(local_path):
+            return self._send(404, {"error": {"code": 404, "message": f"No such object: {bucket}/{name}"}})
+        if query.get("alt") == ["media"]:
+            with open(local_path, "rb") as f:
+                data = f.read()
+            md5 = base64.b64encode(hashlib.md5(data).digest()).decode()
+            return self._send(200, data, "application/octet-stream", {"x-goog-hash": f"md5={md5}"})
+        return self._send(200, self._object_resource(bucket, name, local_path))
+
+    def _object_resource(self, bucket, name, local_path):
+        return {
+            "kind": "storage#object",
+            "bucket": bucket,
+            "name": name,
+            "size": str(os.path.getsize(local_path)),
+            "generation": "1",
+            "mediaLink": f"{self.server.url}/download/storage/v1/b/{bucket}/o/{quote(name, safe='')}?alt=media",
+        }
+
+
+### SMTP ###
+class FakeSMTPServer(socketserver.ThreadingTCPServer):
+    """
+    Accepts mail without TLS (run the pipeline with SMTP_STARTTLS=0) and
+    any AUTH PLAIN credentials. Injected failures reject the message at MAIL FROM.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    def __init__(self, injector: Injector, address=("127.0.0.1", 0)):
+        super().__init__(address, SMTPHandler)
+        self.injector = injector
+        self.lock = threading.Lock()
+        self.messages = 0
+        self.bytes = 0
+        self.connections = 0
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line):
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self._reply("220 loadtest ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("ascii", "replace").strip().upper()
+            if command.startswith("EHLO"):
+                self.wfile.write(b"250-loadtest\r\n250-AUTH PLAIN\r\n250 SIZE 52428800\r\n")
+            elif command.startswith(("HELO", "RCPT", "RSET", "NOOP")):
+                self._reply("250 OK")
+            elif command.startswith("AUTH"):
+                self._reply("235 2.7.0 Authentication successful")
+            elif command.startswith("MAIL"):
+                if server.injector("smtp"):
+                    self._reply("451 4.3.0 Injected failure")
+                else:
+                    self._reply("250 OK")
+            elif command == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                size = 0
+                for data_line in self.rfile:
+                    if data_line in (b".\r\n", b".\n"):
+                        break
+                    size += len(data_line)
+                with server.lock:
+                    server.messages += 1
+                    server.bytes += size
+                self._reply("250 OK queued")
+            elif command == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
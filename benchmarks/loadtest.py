@@ -0,0 +1,392 @@
+"""
+End-to-end load test of the daily pipeline against local stand-in services.
+
+The harness starts the fakes in benchmarks/fakes.py (FotMob, Google News RSS,
+OpenAI, the subscriber sheet, GCS and SMTP) with the chosen latency and
+error rates, builds a throwaway working directory with --teams synthetic
+teams, and runs the pipeline's own scripts in it with every URL and client
+pointed at the fakes:
+
+    collect    collect_news.py
+    download   download_from_gcs.py (the collected day, uploaded to the fake bucket)
+    generate   generate_newsletter.py
+    send       send_mail.py (--subscribers synthetic subscribers)
+
+Each stage reports its wall time, throughput, peak RSS and CPU time. Span
+latency percentiles come from the traces the scripts write through metrics.py,
+and the stand-ins report what they served and how many failures they injected.
+
+Collected data is filed under yesterday's date, the last day a
+generate_newsletter.py run today reads. Without "collect" in --stages, that day
+is seeded from benchmarks/fixtures instead, which is also the way to load-test
+the later stages where Chromium is not installed.
+
+    python -m benchmarks.loadtest                                   # 6 teams, 100 subscribers
+    python -m benchmarks.loadtest --teams 60 --subscribers 100000
+    python -m benchmarks.loadtest --latency openai=3000,smtp=80 --error-rate openai=0.05
+    python -m benchmarks.loadtest --stages download,generate,send  # seeded data, no browser needed
+    python -m benchmarks.loadtest --json loadtest.json --keep
+"""
+from datetime import datetime, timedelta, timezone
+import argparse
+import glob
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.fakes import SERVICES, FakeServices, FakeSMTPServer, Injector, Scale
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STAGES = ("collect", "download", "generate", "send")
+STAGE_COMMANDS = {
+    "collect": ["collect_news.py"],
+    "download": ["download_from_gcs.py", "--days", "1", "--types", "fotmob,news_rss"],
+    "generate": ["generate_newsletter.py"],
+    "send": ["send_mail.py"],
+}
+# Round numbers in the range the live services answer in
+DEFAULT_LATENCY_MS = {"fotmob": 300, "rss": 150, "openai": 2000, "sheets": 500, "gcs": 50, "smtp": 40}
+PERCENTILES = (50, 95, 99)
+
+
+def parse_service_values(value: str, cast=float) -> dict:
+    """'openai=800,smtp=40' -> {"openai": 800.0, "smtp": 40.0}"""
+    values = {}
+    for item in filter(None, (part.strip() for part in (value or "").split(","))):
+        service, _, number = item.partition("=")
+        if service not in SERVICES:
+            raise ValueError(f"Unknown service: {service}. Valid: {SERVICES}")
+        values[service] = cast(number)
+    return values
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+### WORKING DIRECTORY ###
+def prepare_workdir(workdir: str, scale: Scale):
+    """setting.yml/teams.yml for the synthetic teams; prompts and examples copied from the repo"""
+    import yaml
+
+    with open(os.path.join(REPO_DIR, "setting.yml")) as f:
+        setting = yaml.safe_load(f)
+    setting["teams"] = [{"name": name} for name in scale.team_names()]
+    teams = {
+        "fbref": {"teams": []},
+        "FPL": {"teams": []},
+        "fotmob": {"leagues": [], "teams": [{"name": name, "id": scale.team_id(i)} for i, name in enumerate(scale.team_names())]},
+    }
+    with open(os.path.join(workdir, "setting.yml"), "w") as f:
+        yaml.safe_dump(setting, f, allow_unicode=True, sort_keys=False)
+    with open(os.path.join(workdir, "teams.yml"), "w") as f:
+        yaml.safe_dump(teams, f, allow_unicode=True, sort_keys=False)
+    for name in ("prompt.yml", "example.yml"):
+        shutil.copy(os.path.join(REPO_DIR, name), workdir)
+
+
+def stage_env(services: FakeServices, smtp: FakeSMTPServer, settle_ms: int) -> dict:
+    env = {key: value for key, value in os.environ.items() if not key.startswith(("FOTMOB_TRAFFIC", "GOOGLE_APPLICATION"))}
+    env.update({
+        "PYTHONPATH": REPO_DIR,
+        "PYTHONUNBUFFERED": "1",
+        "OPENAI_API_KEY": "loadtest",
+        "URL_OPENAI": f"{services.url}/openai/v1",
+        "URL_FOTMOB": f"{services.url}/fotmob/",
+        "URL_NEWS_RSS": f"{services.url}/rss/",
+        "FOTMOB_MAX_SETTLE_MS": str(settle_ms),
+        "GOOGLE_CLOUD_EMAIL": "loadtest@loadtest.invalid",
+        "GOOGLE_CLOUD_SPREADSHEET_URL": f"{services.url}/sheets",
+        "GOOGLE_SHEET_RECORDS_URL": f"{services.url}/sheets/records",
+        "STORAGE_EMULATOR_HOST": services.url,
+        "SMTP_SERVER": smtp.server_address[0],
+        "SMTP_PORT": str(smtp.server_address[1]),
+        "SMTP_USERNAME": "newsletter@loadtest.invalid",
+        "SMTP_PASSWORD": "loadtest",
+        "SMTP_STARTTLS": "0",
+    })
+    return env
+
+
+def seed_day(date_str: str):
+    """Write every configured team's daily reports for date_str from the benchmark fixtures (runs in the working directory)"""
+    from benchmarks.run import load_matches, read_fixture
+    from collect_news import write_fotmob_reports
+    from config import TEAMS
+    from scrappers.fotmob import fot_mob_crawler
+    from scrappers.news_rss import news_rss
+    from scrappers.records import Transfer
+
+    day = datetime.strptime(date_str, "%Y%m%d")
+    start_dt, end_dt = fot_mob_crawler.parse_date_range((day - timedelta(days=1)).strftime("%Y%m%d"), date_str)
+    matches = load_matches()[:2]
+    news_items = news_rss.parse_news_items(read_fixture("news_rss.xml"))[:news_rss.max_new_items]
+    os.makedirs(f"datas/news_rss/{date_str}", exist_ok=True)
+    for team in TEAMS:
+        transfers = [Transfer(player="Load Player", type=f"Load Seller FC -> {team['name']}", date=start_dt.strftime("%Y-%m-%dT12:00:00.000Z"))]
+        write_fotmob_reports(team["name"], date_str, start_dt, end_dt, matches, transfers)
+        with open(f"datas/news_rss/{date_str}/team_daily_report_{team['name'].replace(' ', '_')}.md", "w") as f:
+            f.write(news_rss.get_news_rss_markdown(news_items, team["name"]))
+
+
+def publish_day(workdir: str, bucket_dir: str, collected_date: str, report_date: str, clear_local: bool):
+    """
+    File the collected day under report_date, bundle it and put the bundle in
+    the fake bucket, as the collect workflow's upload step does.
+
+    Returns:
+        number of files bundled
+    """
+    from bundles import BUNDLE_DATA_TYPES, write_bundle
+    from download_from_gcs import BUCKET_NAME, GCS_PREFIX
+
+    root = os.path.join(workdir, "datas")
+    if collected_date != report_date:
+        for data_type in BUNDLE_DATA_TYPES:
+            source = os.path.join(root, data_type, collected_date)
+            if os.path.isdir(source):
+                shutil.rmtree(os.path.join(root, data_type, report_date), ignore_errors=True)
+                os.rename(source, os.path.join(root, data_type, report_date))
+    path, count = write_bundle(report_date, root=root)
+    if path is None:
+        return 0
+    remote = os.path.join(bucket_dir, BUCKET_NAME, GCS_PREFIX, "bundles", os.path.basename(path))
+    os.makedirs(os.path.dirname(remote), exist_ok=True)
+    shutil.copy(path, remote)
+    if clear_local:
+        # The download stage has to fetch the day the way the generate job does
+        for data_type in (*BUNDLE_DATA_TYPES, "bundles"):
+            shutil.rmtree(os.path.join(root, data_type), ignore_errors=True)
+    return count
+
+
+### STAGES ###
+def run_stage(name: str, workdir: str, env: dict, log_dir: str) -> dict:
+    """Run the stage's script to completion; wall time, exit code and the child's own peak RSS and CPU time"""
+    log_path = os.path.join(log_dir, f"{name}.log")
+    command = [sys.executable, os.path.join(REPO_DIR, STAGE_COMMANDS[name][0]), *STAGE_COMMANDS[name][1:]]
+    started = time.perf_counter()
+    with open(log_path, "w") as log:
+        process = subprocess.Popen(command, cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return {
+        "stage": name,
+        "exit_code": process.returncode,
+        "wall_s": time.perf_counter() - started,
+        # ru_maxrss is reported in KiB on Linux
+        "max_rss_mb": usage.ru_maxrss / 1024,
+        "cpu_s": usage.ru_utime + usage.ru_stime,
+        "log": log_path,
+    }
+
+
+def count_units(name: str, workdir: str, scale: Scale, collected_date: str, smtp: FakeSMTPServer, smtp_before: int):
+    """(units done, units expected, unit) for the stage's throughput"""
+    root = os.path.join(workdir, "datas")
+    if name == "collect":
+        done = sum(
+            all(os.path.exists(path) for path in (
+                f"{root}/fotmob/{collected_date}/team_daily_report_{team}_matches.md",
+                f"{root}/fotmob/{collected_date}/team_daily_report_{team}_transfers.md",
+                f"{root}/news_rss/{collected_date}/team_daily_report_{team}.md",
+            ))
+            for team in (team_name.replace(" ", "_") for team_name in scale.team_names())
+        )
+        return done, scale.teams, "teams"
+    if name == "download":
+        return len(glob.glob(f"{root}/bundles/*.zbundle")), 1, "bundles"
+    if name == "generate":
+        today = datetime.now(timezone.utc).strftime("%Y%m%d")
+        return len(glob.glob(f"{root}/newsletter/{today}/*.md")), scale.teams, "newsletters"
+    return smtp.messages - smtp_before, scale.subscribers, "emails"
+
+
+def load_spans(workdir: str, seen: set) -> list:
+    """Span records from trace files written since the last call"""
+    spans = []
+    for path in sorted(glob.glob(os.path.join(workdir, "datas", "metrics", "*", "*.jsonl"))):
+        if path in seen:
+            continue
+        seen.add(path)
+        with open(path) as f:
+            spans.extend(json.loads(line) for line in f if line.strip())
+    return spans
+
+
+def span_percentiles(spans: list) -> dict:
+    by_stage = {}
+    for span in spans:
+        entry = by_stage.setdefault(span["stage"], {"durations": [], "errors": 0})
+        entry["durations"].append(span["duration_s"])
+        entry["errors"] += 1 if span.get("error") else 0
+    summary = {}
+    for stage, entry in sorted(by_stage.items()):
+        durations = sorted(entry["durations"])
+        summary[stage] = {
+            "calls": len(durations),
+            "errors": entry["errors"],
+            **{f"p{p}_s": percentile(durations, p) for p in PERCENTILES},
+            "max_s": durations[-1],
+        }
+    return summary
+
+
+def service_summary(injector: Injector) -> dict:
+    summary = {}
+    for service in SERVICES:
+        latencies = sorted(injector.latencies[service])
+        if not latencies:
+            continue
+        summary[service] = {
+            "requests": injector.requests[service],
+            "injected_errors": injector.errors[service],
+            **{f"p{p}_latency_s": percentile(latencies, p) for p in PERCENTILES},
+        }
+    return summary
+
+
+### REPORT ###
+def print_report(result: dict):
+    scale = result["scale"]
+    print(f"\nLoad test: {scale['teams']} team(s), {scale['subscribers']} subscriber(s)")
+    print(f"{'stage':<10} {'exit':>4} {'wall s':>8} {'done':>14} {'per s':>9} {'peak RSS MB':>12} {'cpu s':>7}")
+    for stage in result["stages"]:
+        done = f"{stage['units']}/{stage['expected']} {stage['unit']}"
+        print(
+            f"{stage['stage']:<10} {stage['exit_code']:>4} {stage['wall_s']:>8.2f} {done:>14} "
+            f"{stage['throughput_per_s']:>9.2f} {stage['max_rss_mb']:>12.1f} {stage['cpu_s']:>7.2f}"
+        )
+
+    print(f"\n{'stand-in':<10} {'requests':>9} {'injected':>9} " + " ".join(f"{f'p{p} ms':>8}" for p in PERCENTILES))
+    for service, entry in result["services"].items():
+        print(
+            f"{service:<10} {entry['requests']:>9} {entry['injected_errors']:>9} "
+            + " ".join(f"{entry[f'p{p}_latency_s'] * 1000:>8.0f}" for p in PERCENTILES)
+        )
+
+    print(f"\n{'span':<34} {'calls':>7} {'errors':>7} " + " ".join(f"{f'p{p} ms':>9}" for p in PERCENTILES) + f" {'max ms':>9}")
+    for stage in result["stages"]:
+        for name, entry in stage["spans"].items():
+            print(
+                f"{name:<34} {entry['calls']:>7} {entry['errors']:>7} "
+                + " ".join(f"{entry[f'p{p}_s'] * 1000:>9.1f}" for p in PERCENTILES)
+                + f" {entry['max_s'] * 1000:>9.1f}"
+            )
+
+    failed = [stage for stage in result["stages"] if stage["exit_code"] != 0]
+    for stage in failed:
+        print(f"\n{stage['stage']} exited with {stage['exit_code']}; see {stage['log']}")
+
+
+def run(args) -> dict:
+    scale = Scale(args.teams, args.subscribers, args.news_items, args.completion_chars, args.seed)
+    latency = {**DEFAULT_LATENCY_MS, **parse_service_values(args.latency)}
+    injector = Injector(latency, parse_service_values(args.error_rate), args.seed)
+
+    workdir = tempfile.mkdtemp(prefix="footballnews-loadtest-")
+    bucket_dir = os.path.join(workdir, "bucket")
+    log_dir = os.path.join(workdir, "logs")
+    os.makedirs(bucket_dir)
+    os.makedirs(log_dir)
+    prepare_workdir(workdir, scale)
+
+    collected_date = datetime.now().strftime("%Y%m%d")
+    report_date = (datetime.now(timezone.utc) - timedelta(days=1)).strftime("%Y%m%d")
+    services = FakeServices(scale, injector, bucket_dir, datetime.now(timezone.utc) - timedelta(days=1))
+    smtp = FakeSMTPServer(injector)
+    for server in (services, smtp):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    env = stage_env(services, smtp, args.settle_ms)
+    print(f"Stand-ins at {services.url} (SMTP {smtp.server_address[1]}), working directory {workdir}")
+
+    result = {
+        "scale": {"teams": scale.teams, "subscribers": scale.subscribers, "news_items": scale.news_items},
+        "latency_ms": latency,
+        "error_rate": injector.error_rate,
+        "workdir": workdir,
+        "stages": [],
+    }
+    seen_traces = set()
+    published = False
+    try:
+        if "collect" not in args.stages:
+            print(f"Seeding {scale.teams} team(s) of collected data for {collected_date}")
+            subprocess.run([sys.executable, "-m", "benchmarks.loadtest", "--seed-day", collected_date],
+                           cwd=workdir, env=env, check=True, stdout=subprocess.DEVNULL)
+
+        for name in STAGES:
+            if name not in args.stages:
+                continue
+            if name in ("download", "generate") and not published:
+                count = publish_day(workdir, bucket_dir, collected_date, report_date, clear_local="download" in args.stages)
+                published = True
+                print(f"Published {count} collected file(s) as {report_date}")
+            print(f"Running {name}...")
+            smtp_before = smtp.messages
+            stage = run_stage(name, workdir, env, log_dir)
+            stage["units"], stage["expected"], stage["unit"] = count_units(name, workdir, scale, collected_date, smtp, smtp_before)
+            stage["throughput_per_s"] = stage["units"] / stage["wall_s"] if stage["wall_s"] else 0.0
+            stage["spans"] = span_percentiles(load_spans(workdir, seen_traces))
+            result["stages"].append(stage)
+    finally:
+        services.shutdown()
+        smtp.shutdown()
+        result["services"] = service_summary(injector)
+        result["smtp"] = {"connections": smtp.connections, "messages": smtp.messages, "bytes": smtp.bytes}
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the pipeline end to end against local stand-in services")
+    parser.add_argument("--teams", type=int, default=6, help="Synthetic teams to collect and write newsletters for (default: 6)")
+    parser.add_argument("--subscribers", type=int, default=100, help="Synthetic subscribers, each following 1-3 teams (default: 100)")
+    parser.add_argument("--stages", type=str, default=",".join(STAGES), help=f"Comma-separated stages to run (default: {','.join(STAGES)})")
+    parser.add_argument("--latency", type=str, help="Per-service latency in ms, e.g. openai=3000,smtp=80 "
+                        f"(default: {','.join(f'{k}={v}' for k, v in DEFAULT_LATENCY_MS.items())})")
+    parser.add_argument("--error-rate", type=str, help="Per-service share of requests that fail, e.g. openai=0.05,rss=0.1")
+    parser.add_argument("--news-items", type=int, default=10, help="Items in every RSS feed (default: 10)")
+    parser.add_argument("--completion-chars", type=int, default=2000, help="Length of every fake OpenAI completion (default: 2000)")
+    parser.add_argument("--settle-ms", type=int, default=500, help="Cap on the FotMob page settle wait (default: 500)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for subscribers, latency jitter and errors")
+    parser.add_argument("--json", type=str, help="Also write the results to this JSON file")
+    parser.add_argument("--keep", action="store_true", help="Keep the working directory (logs, traces, outputs)")
+    parser.add_argument("--seed-day", type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.seed_day:
+        seed_day(args.seed_day)
+        return
+    args.stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    unknown = [stage for stage in args.stages if stage not in STAGES]
+    if unknown:
+        parser.error(f"Unknown stages: {unknown}. Valid: {STAGES}")
+    try:
+        parse_service_values(args.latency)
+        parse_service_values(args.error_rate)
+    except ValueError as e:
+        parser.error(str(e))
+
+    result = run(args)
+    print_report(result)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nResults written: {args.json}")
+    if any(stage["exit_code"] != 0 for stage in result["stages"]):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Write the offline benchmark fixtures under benchmarks/fixtures/.
+
+The payloads mirror the shape of the live FotMob, FPL, FBref and Google News
+responses the scrapers consume, with deterministic contents so timings are
+comparable between runs. Regenerate after changing the shapes here:
+
+    python -m benchmarks.make_fixtures
+"""
+from datetime import datetime, timedelta, timezone
+import json
+import os
+import random
+
+import yaml
+
+from benchmarks.bench_fbref_parse import make_season_page
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+CLUBS = [
+    "Arsenal", "Aston Villa", "Bournemouth", "Brentford", "Brighton", "Burnley", "Chelsea",
+    "Crystal Palace", "Everton", "Fulham", "Leeds", "Liverpool", "Man City", "Man Utd",
+    "Newcastle", "Nott'm Forest", "Sunderland", "Spurs", "West Ham", "Wolves",
+]
+SEASON_START = datetime(2025, 8, 16, 14, 0, tzinfo=timezone.utc)
+
+
+def make_fpl():
+    rng = random.Random(1)
+    teams = [{"id": i, "name": name, "short_name": name[:3].upper()} for i, name in enumerate(CLUBS, 1)]
+    events = [
+        {"id": gw, "deadline_time": (SEASON_START + timedelta(weeks=gw - 1)).strftime("%Y-%m-%dT%H:%M:%SZ"), "finished": gw <= 20}
+        for gw in range(1, 39)
+    ]
+    fixtures = []
+    fixture_id = 1
+    for gw in range(1, 39):
+        ids = list(range(1, 21))
+        rng.shuffle(ids)
+        for h, a in zip(ids[::2], ids[1::2]):
+            finished = gw <= 20
+            fixtures.append({
+                "id": fixture_id, "code": 2561000 + fixture_id, "event": gw, "finished": finished,
+                "kickoff_time": (SEASON_START + timedelta(weeks=gw - 1, hours=rng.choice([0, 2, 4]))).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "team_h": h, "team_a": a,
+                "team_h_score": rng.randint(0, 4) if finished else None,
+                "team_a_score": rng.randint(0, 4) if finished else None,
+                "team_h_difficulty": rng.randint(2, 5), "team_a_difficulty": rng.randint(2, 5),
+                "stats": [],
+            })
+            fixture_id += 1
+    return {"teams": teams, "events": events}, fixtures
+
+
+def make_fotmob():
+    rng = random.Random(2)
+    fixtures = []
+    details = {}
+    for i in range(52):
+        kickoff = SEASON_START + timedelta(days=4 * i)
+        finished = i < 30
+        home = rng.random() < 0.5
+        opponent = rng.choice([c for c in CLUBS if c != "Man Utd"])
+        score = f"{rng.randint(0, 4)} - {rng.randint(0, 4)}"
+        page_url = f"/matches/man-united-vs-{opponent.lower().replace(' ', '-')}/{i:04x}#{4800000 + i}"
+        fixtures.append({
+            "id": 4800000 + i,
+            "pageUrl": page_url,
+            "opponent": {"id": 9000 + i, "name": opponent, "score": 1},
+            "home": {"id": 10260 if home else 9000 + i, "name": "Man United" if home else opponent},
+            "away": {"id": 9000 + i if home else 10260, "name": opponent if home else "Man United"},
+            "displayTournament": True,
+            "tournament": {"name": rng.choice(["Premier League", "FA Cup", "EFL Cup"]), "leagueId": 47},
+            "status": {
+                "utcTime": kickoff.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                "finished": finished, "started": finished, "cancelled": False,
+                "scoreStr": score if finished else None,
+            },
+        })
+        if finished:
+            events = []
+            for minute in sorted(rng.sample(range(1, 95), 18)):
+                event_type = rng.choice(["goal", "card", "substitution", "substitution"])
+                event = {"time": str(minute), "type": event_type, "side": rng.choice(["home", "away"])}
+                if event_type == "goal":
+                    event.update({"scorer": f"Player {minute}", "score": "1 - 0", "assist": f"Player {minute + 1}"})
+                elif event_type == "card":
+                    event.update({"player": f"Player {minute}", "card_type": rng.choice(["Yellow Card", "Red Card"])})
+                else:
+                    event.update({"player_in": f"Sub {minute}", "player_out": f"Player {minute}"})
+                events.append(event)
+            possession = rng.randint(35, 65)
+            details[page_url] = {
+                "competition": fixtures[-1]["tournament"]["name"],
+                "stats": {
+                    "possesion": {"home": f"{possession}%", "away": f"{100 - possession}%"},
+                    "xg_point": {"home": f"{rng.random() * 3:.2f}", "away": f"{rng.random() * 3:.2f}"},
+                    "total_shots": {"home": str(rng.randint(5, 25)), "away": str(rng.randint(5, 25))},
+                },
+                "events": events,
+            }
+    team = {
+        "details": {"id": 10260, "name": "Manchester United", "shortName": "Man United"},
+        "fixtures": {"allFixtures": {"fixtures": fixtures}},
+    }
+    return team, details
+
+
+def make_rss(n_items: int = 100):
+    rng = random.Random(3)
+    outlets = ["Sky Sports", "BBC", "The Athletic"]
+    items = []
+    for i in range(n_items):
+        published = SEASON_START + timedelta(hours=7 * i)
+        items.append(
+            "<item>"
+            f"<title>Manchester United transfer story number {i} - {rng.choice(outlets)}</title>"
+            f"<link>https://news.google.com/rss/articles/CBMi{i:08d}?oc=5</link>"
+            f'<guid isPermaLink="false">CBMi{i:08d}</guid>'
+            f"<pubDate>{published.strftime('%a, %d %b %Y %H:%M:%S GMT')}</pubDate>"
+            f"<description>&lt;a href=\"https://example.com/{i}\"&gt;Story {i}&lt;/a&gt;</description>"
+            "</item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/"><channel>'
+        "<title>\"Manchester United\" transfer - Google News</title>"
+        "<link>https://news.google.com/</link><language>en-GB</language>"
+        + "".join(items) + "</channel></rss>"
+    ).encode("utf-8")
+
+
+def make_newsletter():
+    with open("example.yml", "r") as f:
+        examples = yaml.safe_load(f)
+    sections = [e["output"] for report in examples.values() for e in report]
+    return "# Manchester United · 주간 뉴스레터 (2025-10-13 ~ 2025-10-20)\n\n" + "\n\n".join(sections * 3)
+
+
+def main():
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    bootstrap, fpl_fixtures = make_fpl()
+    team, details = make_fotmob()
+    outputs = {
+        "fpl_bootstrap_projected.json": json.dumps(bootstrap, separators=(",", ":")).encode(),
+        "fpl_fixtures.json": json.dumps(fpl_fixtures, separators=(",", ":")).encode(),
+        "fotmob_team.json": json.dumps(team, ensure_ascii=False, separators=(",", ":")).encode(),
+        "fotmob_match_details.json": json.dumps(details, ensure_ascii=False, separators=(",", ":")).encode(),
+        "fbref_matchlogs.html": make_season_page(55, 6),
+        "news_rss.xml": make_rss(),
+        "newsletter.md": make_newsletter().encode("utf-8"),
+    }
+    for name, content in outputs.items():
+        with open(os.path.join(FIXTURES_DIR, name), "wb") as f:
+            f.write(content)
+        print(f"Wrote {name} ({len(content) / 1024:.1f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
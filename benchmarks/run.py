@@ -0,0 +1,245 @@
+"""
+Offline benchmark suite for the pipeline's hot paths.
+
+Every stage runs on the saved payloads in benchmarks/fixtures/ (see
+make_fixtures.py), so no network, browser or API key is needed. For each
+stage the runner reports the median and best wall time over --repeat runs
+and the peak traced allocation of a single run, then compares the results
+against benchmarks/baseline.json.
+
+    python -m benchmarks.run                     # run and compare with the baseline
+    python -m benchmarks.run --only fbref        # stages whose name contains "fbref"
+    python -m benchmarks.run --save-baseline     # record the current results
+    python -m benchmarks.run --check             # exit 1 on a regression
+"""
+from types import SimpleNamespace
+import argparse
+import json
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+
+for key in ["OPENAI_API_KEY", "GOOGLE_CLOUD_EMAIL", "GOOGLE_CLOUD_SPREADSHEET_URL", "SMTP_USERNAME", "SMTP_PASSWORD"]:
+    os.environ.setdefault(key, "benchmark")
+
+BENCH_DIR = os.path.dirname(__file__)
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+
+def read_fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+def load_match_details() -> dict:
+    """Match page URL -> details in the shape FotMobCrawler._analyze_match_details returns"""
+    from scrappers.records import MatchEvent, MatchStats
+
+    return {
+        url: {
+            "competition": detail["competition"],
+            "stats": MatchStats.from_dict(detail["stats"]),
+            "events": [MatchEvent.from_dict(event) for event in detail["events"]],
+        }
+        for url, detail in json.loads(read_fixture("fotmob_match_details.json")).items()
+    }
+
+
+def load_matches() -> list:
+    from scrappers.records import Match
+
+    team_data = json.loads(read_fixture("fotmob_team.json"))
+    details = load_match_details()
+    matches = []
+    for fixture in team_data["fixtures"]["allFixtures"]["fixtures"]:
+        if fixture["pageUrl"] in details:
+            detail = details[fixture["pageUrl"]]
+            matches.append(Match(
+                utc_date=fixture["status"]["utcTime"], local_date_str=fixture["status"]["utcTime"][:16],
+                opponent=fixture["opponent"]["name"], score=fixture["status"]["scoreStr"],
+                home_team=fixture["home"]["name"], away_team=fixture["away"]["name"],
+                competition=detail["competition"], venue="Home", stats=detail["stats"], events=detail["events"],
+            ))
+    return matches
+
+
+### STAGES ###
+# Each stage builds its inputs once and returns the callable that is timed.
+def stage_fotmob_team_matches():
+    import scrappers.fotmob as fotmob
+
+    team_data = json.loads(read_fixture("fotmob_team.json"))
+    details = load_match_details()
+    crawler = fotmob.FotMobCrawler()
+    crawler._analyze_match_details = details.__getitem__
+    start_date, end_date = crawler.parse_date_range("20250801", "20260630")
+
+    def run():
+        # get_team_matches paces live page visits; that wait is not parsing cost
+        real_time, fotmob.time = fotmob.time, SimpleNamespace(sleep=lambda seconds: None)
+        try:
+            return crawler.get_team_matches(start_date, end_date, team_data, 10260)
+        finally:
+            fotmob.time = real_time
+    return run
+
+
+def stage_fotmob_markdown_report():
+    from scrappers.fotmob import FotMobCrawler
+
+    crawler = FotMobCrawler()
+    data = {"team_name": "Manchester United", "period": "2025-08-01 ~ 2026-06-30", "matches": load_matches(), "transfers": []}
+    return lambda: crawler.generate_markdown_report(data, "matches")
+
+
+def stage_match_records_json():
+    from scrappers.records import Match, dumps_records, loads_records
+
+    matches = load_matches()
+    return lambda: loads_records(Match, dumps_records(matches))
+
+
+def stage_fbref_parse_match_logs():
+    from scrappers.fbref import FBrefScraper
+
+    scraper = FBrefScraper()
+    html = read_fixture("fbref_matchlogs.html")
+    return lambda: scraper.parse_match_logs(html)
+
+
+def stage_fpl_parse_fixture():
+    from scrappers.fpl import FPLScraper, load_json_bytes
+
+    bootstrap = load_json_bytes(read_fixture("fpl_bootstrap_projected.json"))
+    fixtures = load_json_bytes(read_fixture("fpl_fixtures.json"))
+    finished = [f for f in fixtures if f["finished"]]
+    teams = bootstrap["teams"]
+
+    def run():
+        scraper = FPLScraper()
+        results = []
+        for team in teams:
+            team_id = scraper.get_team_id(team["name"], teams)
+            team_fixtures = scraper.get_team_fixtures(team_id, finished)
+            results.append(scraper.parse_fixture(team_fixtures, team_id, team["name"], teams))
+        return results
+    return run
+
+
+def stage_news_rss_parse():
+    from scrappers.news_rss import NewsRSS
+
+    parser = NewsRSS()
+    body = read_fixture("news_rss.xml")
+    return lambda: parser.parse_news_items(body)
+
+
+def stage_llm_prompt_building():
+    from summarizers.llm import llmSummarizer
+
+    matches_data = read_fixture("newsletter.md").decode("utf-8")
+    return lambda: (
+        llmSummarizer.build_matches_prompt(matches_data),
+        llmSummarizer.build_transfers_and_news_prompt(matches_data, matches_data),
+    )
+
+
+def stage_smtp_markdown_to_html():
+    from email_sender.smtp_sender import smtp_sender
+
+    newsletter = read_fixture("newsletter.md").decode("utf-8")
+    return lambda: smtp_sender.convert_markdown_to_html(newsletter, "FootballNews")
+
+
+STAGES = {
+    "fotmob.get_team_matches": stage_fotmob_team_matches,
+    "fotmob.generate_markdown_report": stage_fotmob_markdown_report,
+    "records.match_json_round_trip": stage_match_records_json,
+    "fbref.parse_match_logs": stage_fbref_parse_match_logs,
+    "fpl.parse_fixture": stage_fpl_parse_fixture,
+    "news_rss.parse_news_items": stage_news_rss_parse,
+    "llm.build_prompts": stage_llm_prompt_building,
+    "smtp.convert_markdown_to_html": stage_smtp_markdown_to_html,
+}
+
+
+### RUNNER ###
+def measure(fn, repeat: int) -> dict:
+    fn()  # warm-up: imports, caches, lazy compilation
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "best_ms": round(min(timings), 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("stages", {}).get(name)
+        if not base:
+            continue
+        for metric in ("median_ms", "peak_kib"):
+            if base[metric] and result[metric] > base[metric] * (1 + threshold):
+                regressions.append(f"{name}: {metric} {base[metric]} -> {result[metric]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite")
+    parser.add_argument("--only", type=str, help="Only run stages whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per stage (default: 20)")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown before flagging (default: 0.25)")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Write results to {BASELINE_PATH}")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 when a stage regresses")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, "r") as f:
+            baseline = json.load(f)
+
+    results = {}
+    print(f"{'stage':<34} {'median ms':>10} {'best ms':>10} {'peak KiB':>10} {'vs base':>8}")
+    for name, make_stage in STAGES.items():
+        if args.only and args.only not in name:
+            continue
+        results[name] = result = measure(make_stage(), args.repeat)
+        base = baseline.get("stages", {}).get(name)
+        delta = f"{(result['median_ms'] / base['median_ms'] - 1) * 100:+.0f}%" if base and base["median_ms"] else "-"
+        print(f"{name:<34} {result['median_ms']:>10.2f} {result['best_ms']:>10.2f} {result['peak_kib']:>10.1f} {delta:>8}")
+
+    if args.save_baseline:
+        stages = dict(baseline.get("stages", {}), **results)
+        with open(BASELINE_PATH, "w") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), "stages": stages}, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline saved to {BASELINE_PATH}")
+        return
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print("\nRegressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        if args.check:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Pack a day's collected markdown into one compressed, indexed bundle.
+
+A day of collection is three small files per team. Uploading them as
+separate GCS objects means every downstream job lists and downloads dozens
+of tiny objects. A bundle holds all of them in one file
+(datas/bundles/<date>.zbundle) that can be downloaded in a single request.
+Each member is compressed as its own zstd frame, so one member can be read
+without decompressing the others:
+
+    MAGIC | frame | frame | ... | index (zstd JSON) | index offset, index length, MAGIC
+
+The index maps each member path (relative to datas/, e.g.
+"fotmob/20250101/team_daily_report_Arsenal_matches.md") to its offset,
+compressed length and size.
+
+    python bundles.py --date 20250101   # pack datas/{fotmob,news_rss}/20250101
+"""
+from datetime import datetime
+import argparse
+import json
+import os
+import struct
+
+import zstandard
+
+DATA_ROOT = "datas"
+BUNDLES_DIR = f"{DATA_ROOT}/bundles"
+BUNDLE_DATA_TYPES = ("fotmob", "news_rss")
+COMPRESSION_LEVEL = 10
+MAGIC = b"FNBNDL01"
+FOOTER = struct.Struct("<QQ8s")
+
+
+def bundle_path(date_str: str, bundles_dir=BUNDLES_DIR) -> str:
+    return f"{bundles_dir}/{date_str}.zbundle"
+
+
+def write_bundle(date_str: str, data_types=BUNDLE_DATA_TYPES, root=DATA_ROOT, path=None):
+    """
+    Pack every file under <root>/<data_type>/<date_str>/ into one bundle.
+
+    Returns:
+        (bundle path, member count), or (None, 0) when there is nothing to pack
+    """
+    members = []
+    for data_type in data_types:
+        day_dir = os.path.join(root, data_type, date_str)
+        if not os.path.isdir(day_dir):
+            continue
+        for dirpath, _, filenames in os.walk(day_dir):
+            for filename in sorted(filenames):
+                full_path = os.path.join(dirpath, filename)
+                members.append((os.path.relpath(full_path, root).replace(os.sep, "/"), full_path))
+    if not members:
+        return None, 0
+
+    path = path or bundle_path(date_str, os.path.join(root, "bundles"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    compressor = zstandard.ZstdCompressor(level=COMPRESSION_LEVEL)
+    index = {}
+    with open(path + ".tmp", "wb") as f:
+        f.write(MAGIC)
+        for name, full_path in sorted(members):
+            with open(full_path, "rb") as member:
+                data = member.read()
+            frame = compressor.compress(data)
+            index[name] = {"offset": f.tell(), "length": len(frame), "size": len(data)}
+            f.write(frame)
+        index_offset = f.tell()
+        index_frame = compressor.compress(json.dumps(index, ensure_ascii=False).encode("utf-8"))
+        f.write(index_frame)
+        f.write(FOOTER.pack(index_offset, len(index_frame), MAGIC))
+    os.replace(path + ".tmp", path)
+    return path, len(index)
+
+
+class Bundle:
+    """Read-only view of a bundle file; members are decompressed on demand"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._decompressor = zstandard.ZstdDecompressor()
+        try:
+            self._file.seek(-FOOTER.size, os.SEEK_END)
+            index_offset, index_length, magic = FOOTER.unpack(self._file.read(FOOTER.size))
+            if magic != MAGIC:
+                raise ValueError(f"Not a bundle: {path}")
+            self.index = json.loads(self._read_frame(index_offset, index_length))
+        except Exception:
+            self._file.close()
+            raise
+
+    def _read_frame(self, offset, length):
+        self._file.seek(offset)
+        return self._decompressor.decompress(self._file.read(length))
+
+    def names(self):
+        return list(self.index)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def read(self, name: str) -> bytes:
+        entry = self.index[name]
+        return self._read_frame(entry["offset"], entry["length"])
+
+    def extract(self, root=DATA_ROOT, prefixes=None):
+        """Write members (optionally only those under the given prefixes) back out as files under root"""
+        extracted = []
+        for name in self.index:
+            if prefixes and not name.startswith(tuple(prefixes)):
+                continue
+            out_path = os.path.join(root, name)
+            os.makedirs(os.path.dirname(out_path), exist_ok=True)
+            with open(out_path, "wb") as f:
+                f.write(self.read(name))
+            extracted.append(out_path)
+        return extracted
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_open_bundles = {}
+
+
+def open_bundle(date_str: str, root=DATA_ROOT):
+    """The day's local bundle (opened once per process), or None when there is none"""
+    path = bundle_path(date_str, os.path.join(root, "bundles"))
+    if path not in _open_bundles:
+        _open_bundles[path] = Bundle(path) if os.path.exists(path) else None
+    return _open_bundles[path]
+
+
+def read_data_file(path: str, root=DATA_ROOT):
+    """
+    Text of a data file such as datas/fotmob/<date>/<file>.md, read from the
+    loose file when present and otherwise from that day's bundle.
+
+    Returns:
+        str, or None when the file is in neither place
+    """
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            return f.read()
+    name = os.path.relpath(path, root).replace(os.sep, "/")
+    parts = name.split("/")
+    if len(parts) < 3 or name.startswith("../"):
+        return None
+    bundle = open_bundle(parts[1], root)
+    if bundle is None or name not in bundle:
+        return None
+    return bundle.read(name).decode("utf-8")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pack a day's collected data into one bundle")
+    parser.add_argument("--date", type=str, default=datetime.now().strftime("%Y%m%d"), help="Date to pack in YYYYMMDD format (default: today)")
+    args = parser.parse_args()
+
+    path, count = write_bundle(args.date)
+    if path:
+        print(f"Bundle written: {path} ({count} file(s), {os.path.getsize(path)} bytes)")
+    else:
+        print(f"Nothing to pack for {args.date}")
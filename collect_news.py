@@ -1,43 +1,189 @@
+import argparse
 import os
+import time
 from datetime import datetime, timedelta
 
-from config import FOTMOB_TEAMS, TEAMS
+from bundles import write_bundle
+from config import TEAMS
+from metrics import tracer
 from scrappers.fotmob import fot_mob_crawler
+from scrappers.match_resolver import MatchResolver, match_resolver
 from scrappers.news_rss import news_rss
+from scrappers.resilience import RUN_BUDGET_SECONDS, TEAM_BUDGET_SECONDS, deadline
+from scrappers.team_registry import team_registry
+import sharding
 
+# 리그 모드: 리그 경기 목록을 한 번만 불러와 구독 팀 전체에 나눠주고,
+# 리그 외 대회(컵 대회 등)의 기본 정보는 FBref로 보충
+LEAGUE_MODE_SOURCES = ("fpl", "fotmob_league", "fbref")
 
-def get_fotmob_data(team, start_date, end_date):
-        fotmob_team = next((t for t in FOTMOB_TEAMS if t['name'] == team['name']), None)
-        if not fotmob_team:
+
+def get_fotmob_data(team, start_date, end_date, resolver=match_resolver, transfers=None):
+        fotmob_team = team_registry.get(team['name'])
+        if not fotmob_team or "fotmob_id" not in fotmob_team:
             print(f"Warning: Team '{team['name']}' not found in FOTMOB_TEAMS")
             return None
         
-        target_team_id = fotmob_team['id']
-        team_name = fotmob_team['name'].replace(" ", "_")
+        target_team_id = fotmob_team['fotmob_id']
     
-        raw_data = fot_mob_crawler.get_team_data(start_date, end_date, target_team_id)
+        # 경기 기본 정보는 가장 저렴한 소스(FPL -> FBref -> FotMob)에서 채우고,
+        # FotMob 경기 페이지는 이벤트/xG 등이 필요한 경기에만 방문
+        start_dt, end_dt = fot_mob_crawler.parse_date_range(start_date, end_date)
+        with tracer.span("collect.resolve_matches") as span:
+            matches = [m.to_match() for m in resolver.resolve(team['name'], start_dt, end_dt)]
+            span.set(matches=len(matches))
+        if transfers is None:
+            with tracer.span("collect.transfers"):
+                transfers = fot_mob_crawler.get_team_transfers(start_dt, end_dt, None, target_team_id)
+        write_fotmob_reports(fotmob_team['name'], datetime.now().strftime('%Y%m%d'), start_dt, end_dt, matches, transfers)
+
+def write_fotmob_reports(team_name, date_str, start_dt, end_dt, matches, transfers):
+    """팀의 경기/이적 리포트를 datas/fotmob/<date_str>/ 에 저장 (transfers가 None이면 이적 리포트는 그대로 둠)"""
+    with tracer.span("collect.render_markdown"):
+        raw_data = fot_mob_crawler.build_report_data(team_name, start_dt, end_dt, matches, transfers or [])
         matches_output = fot_mob_crawler.generate_markdown_report(raw_data, 'matches')
-        transfers_output = fot_mob_crawler.generate_markdown_report(raw_data, 'transfers')
-        
-        os.makedirs(f"datas/fotmob/{datetime.now().strftime('%Y%m%d')}", exist_ok=True)
-        with open(f"datas/fotmob/{datetime.now().strftime('%Y%m%d')}/team_daily_report_{team_name}_matches.md", "w") as f:
+        transfers_output = fot_mob_crawler.generate_markdown_report(raw_data, 'transfers') if transfers is not None else None
+
+    team_name = team_name.replace(" ", "_")
+    with tracer.span("collect.write") as span:
+        os.makedirs(f"datas/fotmob/{date_str}", exist_ok=True)
+        with open(f"datas/fotmob/{date_str}/team_daily_report_{team_name}_matches.md", "w") as f:
             f.write(matches_output if matches_output else "")
-        with open(f"datas/fotmob/{datetime.now().strftime('%Y%m%d')}/team_daily_report_{team_name}_transfers.md", "w") as f:
-            f.write(transfers_output if transfers_output else "")
+        if transfers is not None:
+            with open(f"datas/fotmob/{date_str}/team_daily_report_{team_name}_transfers.md", "w") as f:
+                f.write(transfers_output if transfers_output else "")
+        span.add(bytes=len(matches_output or "") + len(transfers_output or ""))
 
-def get_news_rss_data(team):
-    news_items = news_rss.get_transfer_news_rss(team['name'])
+def get_news_rss_data(team, news_items=None):
+    if news_items is None:
+        news_items = news_rss.get_transfer_news_rss(team['name'])
     markdown_output = news_rss.get_news_rss_markdown(news_items, team['name'])
     os.makedirs(f"datas/news_rss/{datetime.now().strftime('%Y%m%d')}", exist_ok=True)
-    with open(f"datas/news_rss/{datetime.now().strftime('%Y%m%d')}/team_daily_report_{team['name'].replace(" ", "_")}.md", "w") as f:
+    with open(f"datas/news_rss/{datetime.now().strftime('%Y%m%d')}/team_daily_report_{team['name'].replace(' ', '_')}.md", "w") as f:
         f.write(markdown_output if markdown_output else "There is no transfer news this week.")
 
+def collect_team(team, start_date, end_date, news_items=None, resolver=match_resolver, transfers=None):
+    # 한 팀이 느린 소스 때문에 전체 작업을 붙잡지 않도록 팀별 시간 예산 적용
+    with tracer.span("collect.team"), deadline(TEAM_BUDGET_SECONDS):
+        get_fotmob_data(team, start_date, end_date, resolver, transfers)
+        get_news_rss_data(team, news_items)
+
+
+def get_league_transfers(teams, start_date, end_date):
+    """
+    리그별 이적 페이지를 한 번씩만 불러와 팀 이름 -> 이적 목록으로 나눕니다.
+    페이지를 불러오지 못한 리그의 팀은 결과에서 빠집니다.
+    """
+    start_dt, end_dt = fot_mob_crawler.parse_date_range(start_date, end_date)
+    transfers_by_team = {}
+    for league_id in team_registry.league_ids([team['name'] for team in teams]):
+        with tracer.span("collect.league_transfers", league_id=league_id):
+            by_fotmob_id = fot_mob_crawler.get_league_transfers(start_dt, end_dt, league_id)
+        if by_fotmob_id is None:
+            continue
+        for team in teams:
+            entry = team_registry.get(team['name']) or {}
+            if entry.get("league_id") == league_id:
+                transfers_by_team[team['name']] = by_fotmob_id.get(entry["fotmob_id"], [])
+    return transfers_by_team
+
+
+def collected_paths(team, date_str):
+    """Files collect_team writes for the team on date_str"""
+    team_name = team['name'].replace(" ", "_")
+    return [
+        f"datas/fotmob/{date_str}/team_daily_report_{team_name}_matches.md",
+        f"datas/fotmob/{date_str}/team_daily_report_{team_name}_transfers.md",
+        f"datas/news_rss/{date_str}/team_daily_report_{team_name}.md",
+    ]
+
+
+def merge_shards(today, count):
+    """샤드 결과가 모두 모였는지 확인하고 RSS 상태와 팀별 비용을 합칩니다"""
+    manifests, problems = sharding.check_shards(today, count)
+    if problems:
+        print(f"Shard merge failed ({len(problems)} problem(s)):")
+        for problem in problems:
+            print(f"  - {problem}")
+        raise SystemExit(1)
+
+    news_rss.merge_shard_state([sharding.shard_label(i, count) for i in range(1, count + 1)], today)
+    sharding.update_team_costs(manifests)
+    bundle_path, member_count = write_bundle(today)
+    print(f"Bundle written: {bundle_path} ({member_count} file(s))")
+    print(f"All {len(TEAMS)} team(s) collected across {count} shard(s)")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Collect match, transfer and RSS data for the configured teams")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--shard", type=str, help="Collect only shard i of N (e.g. 1/3)")
+    group.add_argument("--merge", type=int, metavar="N", help="Check and merge the outputs of N shards")
+    parser.add_argument("--league", action="store_true", help="Load each league's fixtures and transfers once and share them between its teams")
+    args = parser.parse_args()
+
     today = datetime.now().strftime('%Y%m%d')
     start_date = (datetime.now() - timedelta(days=1)).strftime('%Y%m%d')
 
-    for team in TEAMS:
-        get_fotmob_data(team, start_date, today)
-        get_news_rss_data(team)
\ No newline at end of file
+    if args.merge:
+        merge_shards(today, args.merge)
+        raise SystemExit(0)
+
+    teams = TEAMS
+    shard = None
+    if args.shard:
+        try:
+            shard_index, shard_count = sharding.parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+        shard = sharding.shard_label(shard_index, shard_count)
+        teams = sharding.partition_teams(TEAMS, shard_count, sharding.load_team_costs())[shard_index - 1]
+        print(f"Shard {shard_index}/{shard_count}: {', '.join(team['name'] for team in teams) or '(no teams)'}")
+
+    tracer.start_run(f"collect_news_shard-{shard}" if shard else "collect_news")
+    results = {}
+    try:
+        # 실행 전체의 시간 예산: 느린 소스가 있어도 남은 팀은 빠르게 실패 처리
+        with deadline(RUN_BUDGET_SECONDS):
+            # RSS는 모든 팀을 한 번에 동시 요청하고, 이전 날짜에 수집한 기사는 제외
+            with tracer.span("collect.news_rss_batch", teams=len(teams)):
+                news_by_team = news_rss.get_transfer_news_rss_batch([team['name'] for team in teams], dedup=True, today=today, shard=shard)
+
+            resolver = match_resolver
+            transfers_by_team = {}
+            if args.league:
+                resolver = MatchResolver(sources=LEAGUE_MODE_SOURCES)
+                try:
+                    transfers_by_team = get_league_transfers(teams, start_date, today)
+                except Exception as e:
+                    print(f"League transfers failed: {e}")
+                # 리그 이적 페이지를 못 불러온 팀(예외 또는 캡처 실패)은 팀별 이적 페이지로 대체
+                fallback = [team['name'] for team in teams if team['name'] not in transfers_by_team]
+                if fallback:
+                    print(f"League transfers unavailable for {', '.join(fallback)}, falling back to team pages")
+
+            for team in teams:
+                started = time.perf_counter()
+                try:
+                    with tracer.team(team['name']):
+                        collect_team(team, start_date, today, news_by_team.get(team['name'], []), resolver, transfers_by_team.get(team['name']))
+                    status = "done"
+                except Exception as e:
+                    print(f"[{team['name']}] collection failed: {e}")
+                    status = "failed"
+                results[team['name']] = {
+                    "status": status,
+                    "duration_s": round(time.perf_counter() - started, 1),
+                    "outputs": [path for path in collected_paths(team, today) if os.path.exists(path)],
+                }
+    finally:
+        tracer.write()
+
+    if shard:
+        print(f"Manifest written: {sharding.write_manifest(today, shard_index, shard_count, results)}")
+    else:
+        # 샤드 실행은 merge 단계에서 한 번에 묶음
+        path, count = write_bundle(today)
+        print(f"Bundle written: {path} ({count} file(s))")
+    if any(result["status"] != "done" for result in results.values()):
+        raise SystemExit(1)
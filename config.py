@@ -1,14 +1,102 @@
+import hashlib
 import os
-from yaml import load, Loader
+import pickle
+
+### LOADER ###
+CONFIG_CACHE_DIR = os.environ.get("CONFIG_CACHE_DIR", ".cache/config")
+CONFIG_CACHE_VERSION = 1
+
+# Top-level keys (and their types) every config file must provide.
+CONFIG_SCHEMAS = {
+    "api.yml": {"API_KEY": dict, "URL": dict, "GOOGLE_CLOUD": dict, "SMTP": dict},
+    "example.yml": {"matches_report": list, "transfers_and_news_report": list},
+    "prompt.yml": {"system_prompt": dict, "matches_report": dict, "transfers_and_news_report": dict},
+    "teams.yml": {"fbref": dict, "FPL": dict, "fotmob": dict},
+    "setting.yml": {"teams": list, "model": str},
+}
+
+
+def _safe_load_yaml(raw: bytes):
+    # PyYAML is only imported on a snapshot miss.
+    from yaml import load
+    try:
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:
+        from yaml import SafeLoader
+    return load(raw, Loader=SafeLoader)
+
+
+def validate_config(path: str, data) -> None:
+    """Check the parsed file against its schema in CONFIG_SCHEMAS"""
+    schema = CONFIG_SCHEMAS.get(os.path.basename(path), {})
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected a mapping at the top level, got {type(data).__name__}")
+    for key, expected_type in schema.items():
+        if key not in data:
+            raise ValueError(f"{path}: missing required key '{key}'")
+        if not isinstance(data[key], expected_type):
+            raise ValueError(
+                f"{path}: '{key}' must be {expected_type.__name__}, got {type(data[key]).__name__}"
+            )
+
+
+def load_config(path: str, cache: bool = True):
+    """
+    Load a YAML config file with the safe (C-accelerated when available) loader.
+
+    The validated result is pickled under CONFIG_CACHE_DIR, keyed by the file's
+    mtime and size, so later imports skip YAML parsing and validation entirely.
+    The content hash is checked only when the stat key changes (e.g. after a
+    fresh checkout) so an untouched file never has to be re-parsed.
+    """
+    stat = os.stat(path)
+    stat_key = (stat.st_mtime_ns, stat.st_size)
+    cache_path = os.path.join(CONFIG_CACHE_DIR, os.path.basename(path) + ".pickle")
+
+    cached = None
+    if cache and os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as f:
+                cached = pickle.load(f)
+        except Exception:
+            cached = None
+        if cached and cached.get("version") == CONFIG_CACHE_VERSION and cached.get("stat_key") == stat_key:
+            return cached["data"]
+
+    with open(path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+
+    if cached and cached.get("version") == CONFIG_CACHE_VERSION and cached.get("sha256") == digest:
+        data = cached["data"]
+    else:
+        data = _safe_load_yaml(raw)
+        validate_config(path, data)
+
+    if cache:
+        try:
+            os.makedirs(CONFIG_CACHE_DIR, exist_ok=True)
+            tmp_path = cache_path + f".{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(
+                    {"version": CONFIG_CACHE_VERSION, "stat_key": stat_key, "sha256": digest, "data": data},
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+    return data
+
 
 ### API KEYS, URLS ###
 if os.path.exists("api.yml"):
-    with open("api.yml", "r") as f:
-        data = load(f, Loader=Loader)
-        API_KEY = data["API_KEY"]
-        URL = data["URL"]
-        GOOGLE_CLOUD = data["GOOGLE_CLOUD"]
-        SMTP = data["SMTP"]
+    # Secrets are never written to the snapshot cache.
+    data = load_config("api.yml", cache=False)
+    API_KEY = data["API_KEY"]
+    URL = data["URL"]
+    GOOGLE_CLOUD = data["GOOGLE_CLOUD"]
+    SMTP = data["SMTP"]
 else:
     API_KEY = {"OPENAI": os.environ["OPENAI_API_KEY"]}
     URL = {
@@ -26,25 +114,33 @@ else:
         "PASSWORD": os.environ["SMTP_PASSWORD"],
     }
 
+# Endpoints with a public default; the env vars point them at stand-in
+# services (see benchmarks/loadtest.py)
+URL.setdefault("FOTMOB", os.environ.get("URL_FOTMOB", "https://www.fotmob.com/"))
+URL.setdefault("NEWS_RSS", os.environ.get("URL_NEWS_RSS", "https://news.google.com/rss/"))
+URL.setdefault("OPENAI", os.environ.get("URL_OPENAI"))
+# JSON list of sheet rows served over HTTP, used instead of the Sheets API when set
+GOOGLE_CLOUD.setdefault("RECORDS_URL", os.environ.get("GOOGLE_SHEET_RECORDS_URL"))
+SMTP.setdefault("STARTTLS", os.environ.get("SMTP_STARTTLS", "1") != "0")
+
 ### EXAMPLE ###
-with open("example.yml", "r") as f:
-    data = load(f, Loader=Loader)
-    EXAMPLE = data
+EXAMPLE = load_config("example.yml")
 
 ### PROMPT ###
-with open("prompt.yml", "r") as f:
-    data = load(f, Loader=Loader)
-    PROMPT = data
+PROMPT = load_config("prompt.yml")
 
 ### TEAMS ###
-with open("teams.yml", "r") as f:
-    data = load(f, Loader=Loader)
-    FBREF_TEAMS = data["fbref"]["teams"]
-    FPL_TEAMS = data["FPL"]["teams"]
-    FOTMOB_TEAMS = data["fotmob"]["teams"]
+data = load_config("teams.yml")
+FBREF_TEAMS = data["fbref"]["teams"]
+FPL_TEAMS = data["FPL"]["teams"]
+FOTMOB_TEAMS = data["fotmob"]["teams"]
+FOTMOB_LEAGUES = data["fotmob"].get("leagues", [])
 
 ### SETTING ###
-with open("setting.yml", "r") as f:
-    data = load(f, Loader=Loader)
-    TEAMS = data["teams"]
-    MODEL = data["model"]
+data = load_config("setting.yml")
+TEAMS = data["teams"]
+MODEL = data["model"]
+MODEL_ROUTING = data.get("model_routing") or {}
+MODEL_PRICES = data.get("model_prices") or {}
+PROMPT_TOKEN_LIMITS = data.get("prompt_token_limits") or {}
+FEW_SHOT = data.get("few_shot") or {}
@@ -2,9 +2,12 @@ import argparse
 import os
 from datetime import datetime, timedelta, timezone
 
+from google.auth.credentials import AnonymousCredentials
 from google.cloud import storage
 from google.oauth2 import service_account
 
+from bundles import BUNDLE_DATA_TYPES, Bundle, bundle_path
+
 BUCKET_NAME = "my-football-news"
 GCS_PREFIX = "football-news/datas"
 SERVICE_ACCOUNT_FILE = "gen-lang-client.json"
@@ -12,6 +15,9 @@ DATA_TYPES = ["fotmob", "news_rss", "newsletter"]
 
 
 def get_client():
+    if os.environ.get("STORAGE_EMULATOR_HOST"):
+        # Stand-in GCS server (see benchmarks/loadtest.py); the client sends its requests there
+        return storage.Client(project="emulator", credentials=AnonymousCredentials())
     credentials = service_account.Credentials.from_service_account_file(
         SERVICE_ACCOUNT_FILE,
         scopes=["https://www.googleapis.com/auth/cloud-platform"],
@@ -37,6 +43,30 @@ def download_prefix(bucket, gcs_prefix: str, local_dir: str):
     return count
 
 
+def download_bundle(bucket, date_str: str, types, extract=False):
+    """
+    Fetch the day's bundle as a single object.
+
+    Returns:
+        number of members for the requested types, or None when the day has no bundle
+    """
+    local_path = bundle_path(date_str)
+    blob = bucket.blob(f"{GCS_PREFIX}/bundles/{os.path.basename(local_path)}")
+    if not blob.exists():
+        return None
+
+    os.makedirs(os.path.dirname(local_path), exist_ok=True)
+    blob.download_to_filename(local_path)
+    prefixes = [f"{data_type}/{date_str}/" for data_type in types]
+    with Bundle(local_path) as bundle:
+        if extract:
+            count = len(bundle.extract(prefixes=prefixes))
+        else:
+            count = sum(1 for name in bundle.names() if name.startswith(tuple(prefixes)))
+    print(f"  Downloaded bundle: {local_path} ({count} file(s){', extracted' if extract else ''})")
+    return count
+
+
 def main():
     parser = argparse.ArgumentParser(description="Download football data from GCS")
     parser.add_argument(
@@ -56,6 +86,16 @@ def main():
         default=",".join(DATA_TYPES),
         help=f"Comma-separated data types to download (default: {','.join(DATA_TYPES)})",
     )
+    parser.add_argument(
+        "--no-bundles",
+        action="store_true",
+        help="Download fotmob/news_rss file by file instead of the daily bundle",
+    )
+    parser.add_argument(
+        "--extract",
+        action="store_true",
+        help="Also unpack downloaded bundles into loose files",
+    )
     args = parser.parse_args()
 
     types = [t.strip() for t in args.types.split(",")]
@@ -76,7 +116,26 @@ def main():
     bucket = client.bucket(BUCKET_NAME)
 
     total = 0
+    bundled_types = [t for t in types if t in BUNDLE_DATA_TYPES and not args.no_bundles]
+    for date_str in dates:
+        if not bundled_types:
+            break
+        print(f"[bundle/{date_str}]")
+        count = download_bundle(bucket, date_str, bundled_types, args.extract)
+        if count is None:
+            # Days collected before bundles existed only have loose files
+            print("  No bundle found, falling back to file-by-file download")
+            for data_type in bundled_types:
+                gcs_prefix = f"{GCS_PREFIX}/{data_type}/{date_str}"
+                local_dir = f"datas/{data_type}/{date_str}"
+                os.makedirs(local_dir, exist_ok=True)
+                total += download_prefix(bucket, gcs_prefix, local_dir)
+        else:
+            total += count
+
     for data_type in types:
+        if data_type in bundled_types:
+            continue
         for date_str in dates:
             gcs_prefix = f"{GCS_PREFIX}/{data_type}/{date_str}"
             local_dir = f"datas/{data_type}/{date_str}"
@@ -0,0 +1,78 @@
+import os
+
+from email_sender.smtp_sender import smtp_sender
+
+SECTION_SEPARATOR_MD = "\n\n---\n\n"
+SECTION_SEPARATOR_HTML = "<hr>\n"
+
+
+def newsletter_path(date_str: str, team_name: str, ext: str = "md") -> str:
+    return f"datas/newsletter/{date_str}/newsletter_{team_name.replace(' ', '_')}.{ext}"
+
+
+class DigestBuilder:
+    """
+    Assemble each subscriber's email from the team sections generate_newsletter.py
+    already rendered (newsletter_<team>.md and its .fragment.html).
+
+    Subscribers are grouped by their exact team set, and every distinct set is
+    assembled once, so a digest costs string joins, not LLM calls or markdown
+    renders per recipient.
+    """
+
+    def __init__(self, date_str: str, start_date_str: str):
+        self.date_str = date_str
+        self.start_date_str = start_date_str
+        self._sections = {}
+        self._digests = {}
+
+    def load_section(self, team_name: str):
+        """(markdown, html fragment) for the team, or None when no newsletter was generated"""
+        if team_name not in self._sections:
+            section = None
+            md_path = newsletter_path(self.date_str, team_name)
+            if os.path.exists(md_path):
+                with open(md_path, "r") as f:
+                    markdown = f.read().strip()
+                html_path = newsletter_path(self.date_str, team_name, "fragment.html")
+                if os.path.exists(html_path):
+                    with open(html_path, "r") as f:
+                        html = f.read()
+                else:
+                    html = smtp_sender.render_html_fragment(markdown)
+                section = (markdown, html)
+            self._sections[team_name] = section
+        return self._sections[team_name]
+
+    def group_subscribers(self, subscriptions: dict):
+        """email -> teams  =>  teams -> [emails], in first-seen order"""
+        groups = {}
+        for email, teams in subscriptions.items():
+            groups.setdefault(tuple(teams), []).append(email)
+        return groups
+
+    def subject(self, teams) -> str:
+        return f"[FootballNews] {' · '.join(teams)} 주간 뉴스레터 ({self.start_date_str}~{self.date_str})"
+
+    def build(self, teams):
+        """
+        Returns:
+            {"teams", "subject", "markdown", "html"} for the team set, or None when
+            none of its teams has a newsletter
+        """
+        teams = tuple(teams)
+        if teams not in self._digests:
+            sections = [(team, self.load_section(team)) for team in teams]
+            sections = [(team, section) for team, section in sections if section]
+            digest = None
+            if sections:
+                included = tuple(team for team, _ in sections)
+                subject = self.subject(included)
+                digest = {
+                    "teams": included,
+                    "subject": subject,
+                    "markdown": SECTION_SEPARATOR_MD.join(markdown for _, (markdown, _) in sections) + "\n",
+                    "html": smtp_sender.wrap_html(SECTION_SEPARATOR_HTML.join(html for _, (_, html) in sections), subject),
+                }
+            self._digests[teams] = digest
+        return self._digests[teams]
@@ -6,6 +6,7 @@ import smtplib
 from markdown_it import MarkdownIt
 
 from config import SMTP
+from metrics import tracer
 from email_sender.email_sender import EmailSender
 
 
@@ -33,6 +34,8 @@ EMAIL_STYLES = """
   .wrap th { background: #f9fafb; font-weight: 600; }
 """
 
+MARKDOWN = MarkdownIt("commonmark").enable("table")
+
 
 class SMTPSender(EmailSender):
     def __init__(self):
@@ -40,24 +43,34 @@ class SMTPSender(EmailSender):
         self.smtp_port = SMTP['PORT']
         self.smtp_username = SMTP['USERNAME']
         self.smtp_password = SMTP['PASSWORD']
+        self.smtp_starttls = SMTP.get('STARTTLS', True)
 
-    def send_email(self, to: str, subject: str, body: str):
+    def send_email(self, to: str, subject: str, body: str, html_body: str = None):
+        """body is markdown; pass html_body to send an already rendered document as is"""
         message = MIMEMultipart()
         message['From'] = self.smtp_username
         message['To'] = to
         message['Subject'] = subject
-        html_body = self.convert_markdown_to_html(body, subject)
+        if html_body is None:
+            html_body = self.convert_markdown_to_html(body, subject)
         message.attach(MIMEText(html_body, 'html'))
         text = message.as_string()
-        server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-        server.starttls()
-        server.login(self.smtp_username, self.smtp_password)
-        server.sendmail(self.smtp_username, to, text)
-        server.quit()
+        with tracer.span("smtp.send", bytes=len(text)):
+            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+            if self.smtp_starttls:
+                server.starttls()
+            server.login(self.smtp_username, self.smtp_password)
+            server.sendmail(self.smtp_username, to, text)
+            server.quit()
 
     def convert_markdown_to_html(self, markdown_text: str, title: str = "FootballNews"):
-        md = MarkdownIt("commonmark").enable("table")
-        body_html = md.render(markdown_text)
+        return self.wrap_html(self.render_html_fragment(markdown_text), title)
+
+    def render_html_fragment(self, markdown_text: str) -> str:
+        """Markdown -> the HTML that goes inside the email's content wrapper"""
+        return MARKDOWN.render(markdown_text)
+
+    def wrap_html(self, body_html: str, title: str = "FootballNews") -> str:
         return (
             "<!doctype html>\n"
             "<html lang=\"ko\">\n"
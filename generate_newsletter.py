@@ -1,60 +1,86 @@
 import os
 from datetime import datetime, timedelta, timezone
 
+from bundles import read_data_file
 from config import TEAMS
+from metrics import tracer
+from email_sender.digest import newsletter_path
+from email_sender.smtp_sender import smtp_sender
 from summarizers.llm import llmSummarizer
 
 
-def load_weekly_data(team_name: str, start_date: datetime, end_date: datetime):
-    matches_data = ""
-    transfers_data = ""
-    news_rss_data = ""
-
+def weekly_data_paths(team_name: str, start_date: datetime, end_date: datetime):
+    """Daily report paths (matches, transfers, news_rss) for every day in [start_date, end_date)"""
     team_name_normalized = team_name.replace(" ", "_")
+    paths = []
     current = start_date
     while current < end_date:
         date_str = current.strftime('%Y%m%d')
+        paths.append((
+            f"datas/fotmob/{date_str}/team_daily_report_{team_name_normalized}_matches.md",
+            f"datas/fotmob/{date_str}/team_daily_report_{team_name_normalized}_transfers.md",
+            f"datas/news_rss/{date_str}/team_daily_report_{team_name_normalized}.md",
+        ))
+        current += timedelta(days=1)
+    return paths
 
-        matches_path = f"datas/fotmob/{date_str}/team_daily_report_{team_name_normalized}_matches.md"
-        transfers_path = f"datas/fotmob/{date_str}/team_daily_report_{team_name_normalized}_transfers.md"
-        news_rss_path = f"datas/news_rss/{date_str}/team_daily_report_{team_name_normalized}.md"
 
-        if os.path.exists(matches_path):
-            with open(matches_path, "r") as f:
-                matches_data += f.read() + "\n"
+def load_weekly_data(team_name: str, start_date: datetime, end_date: datetime):
+    """Loose files take precedence; days downloaded as a bundle are read from the bundle"""
+    matches_data = ""
+    transfers_data = ""
+    news_rss_data = ""
 
-        if os.path.exists(transfers_path):
-            with open(transfers_path, "r") as f:
-                transfers_data += f.read() + "\n"
+    for matches_path, transfers_path, news_rss_path in weekly_data_paths(team_name, start_date, end_date):
+        matches = read_data_file(matches_path)
+        if matches is not None:
+            matches_data += matches + "\n"
 
-        if os.path.exists(news_rss_path):
-            with open(news_rss_path, "r") as f:
-                news_rss_data += f.read() + "\n"
+        transfers = read_data_file(transfers_path)
+        if transfers is not None:
+            transfers_data += transfers + "\n"
 
-        current += timedelta(days=1)
+        news = read_data_file(news_rss_path)
+        if news is not None:
+            news_rss_data += news + "\n"
 
     return matches_data.strip(), transfers_data.strip(), news_rss_data.strip()
 
 
-if __name__ == "__main__":
-    today = datetime.now(timezone.utc)
-    end_date = today
-    start_date = today - timedelta(days=7)
-    today_str = today.strftime('%Y%m%d')
-    masthead_start = start_date.strftime('%Y-%m-%d')
-    masthead_end = end_date.strftime('%Y-%m-%d')
-
-    for team in TEAMS:
-        team_name = team['name']
+def generate_team_newsletter(team_name: str, start_date: datetime, end_date: datetime) -> str:
+    """
+    Summarize the team's week into datas/newsletter/<end_date>/ and return the output path.
+    The HTML fragment written next to it lets digests be assembled without re-rendering.
+    """
+    with tracer.span("newsletter.load_weekly_data") as span:
         matches_data, transfers_data, news_rss_data = load_weekly_data(team_name, start_date, end_date)
+        span.add(bytes=len(matches_data) + len(transfers_data) + len(news_rss_data))
 
+    with tracer.span("newsletter.generate"):
         body = llmSummarizer.generate_newsletter(matches_data, transfers_data, news_rss_data)
-        masthead = f"# {team_name} · 주간 뉴스레터 ({masthead_start} ~ {masthead_end})\n\n"
-        newsletter = masthead + body
+    masthead = f"# {team_name} · 주간 뉴스레터 ({start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m-%d')})\n\n"
+    newsletter = masthead + body
 
-        os.makedirs(f"datas/newsletter/{today_str}", exist_ok=True)
-        output_path = f"datas/newsletter/{today_str}/newsletter_{team_name.replace(' ', '_')}.md"
-        with open(output_path, "w") as f:
-            f.write(newsletter)
+    today_str = end_date.strftime('%Y%m%d')
+    os.makedirs(f"datas/newsletter/{today_str}", exist_ok=True)
+    output_path = newsletter_path(today_str, team_name)
+    with open(output_path, "w") as f:
+        f.write(newsletter)
+    with open(newsletter_path(today_str, team_name, "fragment.html"), "w") as f:
+        f.write(smtp_sender.render_html_fragment(newsletter.strip()))
+    return output_path
 
-        print(f"Generated: {output_path}")
+
+if __name__ == "__main__":
+    today = datetime.now(timezone.utc)
+    end_date = today
+    start_date = today - timedelta(days=7)
+    tracer.start_run("generate_newsletter")
+
+    try:
+        for team in TEAMS:
+            with tracer.team(team['name']):
+                output_path = generate_team_newsletter(team['name'], start_date, end_date)
+            print(f"Generated: {output_path}")
+    finally:
+        tracer.write()
@@ -1,14 +1,31 @@
 import os
 
+import requests
 from google.oauth2.service_account import Credentials
 import google.auth
 import gspread
 
 from config import GOOGLE_CLOUD, TEAMS
+from metrics import tracer
+
+TEAM_COLUMN = "어떤 팀의 소식을 받아보고 싶나요?"
+EMAIL_COLUMN = "뉴스 레터를 수신할 이메일을 입력해주세요."
+TEAM_ORDER = {team["name"]: i for i, team in enumerate(TEAMS)}
+
+
+def parse_teams(value) -> tuple:
+    """'Arsenal, Chelsea' (a checkbox answer) -> ('Arsenal', 'Chelsea') in setting.yml order; unknown names are dropped"""
+    names = {name.strip() for name in str(value or "").split(",")}
+    return tuple(sorted((name for name in names if name in TEAM_ORDER), key=TEAM_ORDER.get))
 
 
 class GoogleSheetParser:
-    def __init__(self, spreadsheet_url: str, worksheet_name: str):
+    def __init__(self, spreadsheet_url: str, worksheet_name: str, records_url: str = None):
+        # Rows come from records_url (a JSON list of row dicts) when it is set, e.g. a stand-in service
+        self.records_url = records_url
+        self.spreadsheet_url = GOOGLE_CLOUD["SPREADSHEET_URL"]
+        if records_url:
+            return
         self.SCOPES = [
             "https://www.googleapis.com/auth/spreadsheets",
             "https://www.googleapis.com/auth/drive"
@@ -19,19 +36,43 @@ class GoogleSheetParser:
         else:
             self.credentials, _ = google.auth.default(scopes=self.SCOPES)
         self.gc = gspread.authorize(self.credentials)
-        self.spreadsheet_url = GOOGLE_CLOUD["SPREADSHEET_URL"]
         self.doc = self.gc.open_by_url(spreadsheet_url)
         self.worksheet = self.doc.worksheet(worksheet_name)
 
     def get_all_records(self):
-        return self.worksheet.get_all_records()
+        with tracer.span("sheets.get_all_records"):
+            if self.records_url:
+                response = requests.get(self.records_url, timeout=30)
+                response.raise_for_status()
+                return response.json()
+            return self.worksheet.get_all_records()
 
-    def get_team_subscribers(self, team_name: str):
+    def get_team_subscribers(self, team_name: str, records=None):
         subscribers = []
-        records = self.get_all_records()
+        if records is None:
+            records = self.get_all_records()
         for record in records:
-            if record["어떤 팀의 소식을 받아보고 싶나요?"] == team_name:
-                subscribers.append(record["뉴스 레터를 수신할 이메일을 입력해주세요."])
+            if team_name in parse_teams(record[TEAM_COLUMN]):
+                subscribers.append(record[EMAIL_COLUMN])
         return subscribers
 
-google_sheet_parser = GoogleSheetParser(GOOGLE_CLOUD["SPREADSHEET_URL"], "신청자 목록")
\ No newline at end of file
+    def get_subscriptions(self, records=None):
+        """
+        Every subscriber's followed teams, merged across their sheet rows.
+
+        Returns:
+            dict of email -> tuple of team names in setting.yml order
+        """
+        if records is None:
+            records = self.get_all_records()
+        teams_by_email = {}
+        for record in records:
+            email = str(record[EMAIL_COLUMN]).strip()
+            if email:
+                teams_by_email.setdefault(email, set()).update(parse_teams(record[TEAM_COLUMN]))
+        return {
+            email: tuple(sorted(teams, key=TEAM_ORDER.get))
+            for email, teams in teams_by_email.items() if teams
+        }
+
+google_sheet_parser = GoogleSheetParser(GOOGLE_CLOUD["SPREADSHEET_URL"], "신청자 목록", GOOGLE_CLOUD.get("RECORDS_URL"))
\ No newline at end of file
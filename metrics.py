@@ -0,0 +1,176 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+import json
+import os
+import resource
+import threading
+import time
+
+METRICS_DIR = os.environ.get("METRICS_DIR", "datas/metrics")
+METRIC_PREFIX = "footballnews"
+
+# Counters every span may carry; summed per (stage, team) in the Prometheus summary.
+SPAN_COUNTERS = ("bytes", "retries", "cache_hits")
+
+_current_team = ContextVar("current_team", default=None)
+
+
+class Span:
+    __slots__ = ("stage", "team", "attrs", "started_at", "duration", "error")
+
+    def __init__(self, stage, team=None, **attrs):
+        self.stage = stage
+        self.team = team
+        self.attrs = attrs
+        self.started_at = time.time()
+        self.duration = None
+        self.error = None
+
+    def add(self, **counters):
+        """Increment numeric attributes, e.g. span.add(bytes=len(body), retries=1)"""
+        for key, value in counters.items():
+            self.attrs[key] = self.attrs.get(key, 0) + value
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def to_record(self, run):
+        record = {
+            "run": run,
+            "stage": self.stage,
+            "team": self.team,
+            "ts": datetime.fromtimestamp(self.started_at, timezone.utc).isoformat(),
+            "duration_s": round(self.duration, 6),
+        }
+        if self.error:
+            record["error"] = self.error
+        record.update(self.attrs)
+        return record
+
+
+class Tracer:
+    """
+    Collects per-stage spans for one process run.
+
+    Spans are kept in memory and written once at the end of the run as a
+    JSON-lines trace plus a Prometheus textfile summary, so instrumentation
+    costs a perf_counter call and a list append per span.
+    """
+
+    def __init__(self):
+        self.run = None
+        self.run_started_at = time.time()
+        self.spans = []
+        self.lock = threading.Lock()
+
+    def start_run(self, run):
+        self.run = run
+        self.run_started_at = time.time()
+        self.spans = []
+
+    @contextmanager
+    def team(self, team_name):
+        """Attribute every span opened in this block (on this thread) to the team"""
+        token = _current_team.set(team_name)
+        try:
+            yield
+        finally:
+            _current_team.reset(token)
+
+    @contextmanager
+    def span(self, stage, team=None, **attrs):
+        span = Span(stage, team or _current_team.get(), **attrs)
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            span.duration = time.perf_counter() - started
+            with self.lock:
+                self.spans.append(span)
+
+    def record(self, stage, duration, team=None, **attrs):
+        """Add a span whose duration was measured elsewhere (e.g. a rate limiter wait)"""
+        span = Span(stage, team or _current_team.get(), **attrs)
+        span.duration = duration
+        with self.lock:
+            self.spans.append(span)
+
+    def summarize(self):
+        summary = {}
+        for span in self.spans:
+            key = (span.stage, span.team or "")
+            entry = summary.setdefault(key, {"calls": 0, "errors": 0, "duration_s": 0.0, **{c: 0 for c in SPAN_COUNTERS}})
+            entry["calls"] += 1
+            entry["errors"] += 1 if span.error else 0
+            entry["duration_s"] += span.duration
+            for counter in SPAN_COUNTERS:
+                value = span.attrs.get(counter)
+                if isinstance(value, bool):
+                    value = int(value)
+                if isinstance(value, (int, float)):
+                    entry[counter] += value
+        return summary
+
+    def write(self, run=None):
+        """Write datas/metrics/<date>/<run>_<time>.jsonl and datas/metrics/<run>.prom"""
+        run = run or self.run or "run"
+        now = datetime.now()
+        trace_dir = os.path.join(METRICS_DIR, now.strftime("%Y%m%d"))
+        os.makedirs(trace_dir, exist_ok=True)
+
+        trace_path = os.path.join(trace_dir, f"{run}_{now.strftime('%H%M%S')}.jsonl")
+        with self.lock:
+            spans = list(self.spans)
+        with open(trace_path, "w") as f:
+            for span in spans:
+                f.write(json.dumps(span.to_record(run), ensure_ascii=False) + "\n")
+
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+            for labels, value in samples:
+                label_str = ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels.items())
+                lines.append(f"{METRIC_PREFIX}_{name}{{{label_str}}} {value}")
+
+        summary = self.summarize()
+        stage_labels = [({"run": run, "stage": stage, "team": team}, entry) for (stage, team), entry in sorted(summary.items())]
+        metric("stage_duration_seconds", "gauge", "Total time spent in the stage during the last run.",
+               [(labels, round(entry["duration_s"], 6)) for labels, entry in stage_labels])
+        metric("stage_calls", "gauge", "Spans recorded for the stage during the last run.",
+               [(labels, entry["calls"]) for labels, entry in stage_labels])
+        metric("stage_errors", "gauge", "Spans that raised during the last run.",
+               [(labels, entry["errors"]) for labels, entry in stage_labels])
+        for counter in SPAN_COUNTERS:
+            metric(f"stage_{counter}", "gauge", f"Sum of {counter} reported by the stage during the last run.",
+                   [(labels, entry[counter]) for labels, entry in stage_labels])
+        metric("run_duration_seconds", "gauge", "Wall time of the last run.",
+               [({"run": run}, round(time.time() - self.run_started_at, 3))])
+        metric("run_cpu_seconds", "gauge", "User plus system CPU time of the last run.",
+               [({"run": run}, round(usage.ru_utime + usage.ru_stime, 3))])
+        # ru_maxrss is reported in KiB on Linux
+        metric("run_max_rss_bytes", "gauge", "Peak resident set size of the last run.",
+               [({"run": run}, usage.ru_maxrss * 1024)])
+        metric("run_last_completed_timestamp_seconds", "gauge", "Unix time the last run finished.",
+               [({"run": run}, int(time.time()))])
+
+        prom_path = os.path.join(METRICS_DIR, f"{run}.prom")
+        with open(prom_path + ".tmp", "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(prom_path + ".tmp", prom_path)
+
+        print(f"Metrics written: {trace_path}, {prom_path}")
+        return trace_path, prom_path
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+tracer = Tracer()
@@ -0,0 +1,289 @@
+"""
+Run collect_news -> generate_newsletter -> send_mail in one process.
+
+Every stage works team by team. Before running a team, the stage hashes the
+team's declared inputs. If the hash matches that team's last successful run and
+the outputs recorded then still exist, the team is skipped. Results are
+stored in datas/pipeline/state.json after each team, so re-running after a
+partial failure only redoes the teams (and, for send_mail, the addresses)
+that did not finish.
+
+    python pipeline.py                            # every stage
+    python pipeline.py --from generate_newsletter # generate_newsletter, send_mail
+    python pipeline.py --only collect_news        # a single stage
+    python pipeline.py --force                    # ignore the recorded hashes
+"""
+from datetime import datetime, timedelta, timezone
+import argparse
+import hashlib
+import json
+import os
+
+from config import FBREF_TEAMS, FOTMOB_TEAMS, FPL_TEAMS, TEAMS
+from metrics import tracer
+
+STATE_PATH = "datas/pipeline/state.json"
+STAGES = ("collect_news", "generate_newsletter", "send_mail")
+# Config files every generated newsletter depends on
+GENERATE_CONFIG_FILES = ("prompt.yml", "example.yml", "setting.yml")
+# Save a digest's sent addresses to the state file every this many sends
+SENT_SAVE_EVERY = 10
+
+
+def hash_inputs(*parts) -> str:
+    """sha256 over a sequence of bytes/str/JSON-serializable parts"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        elif not isinstance(part, bytes):
+            part = json.dumps(part, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def hash_files(paths) -> str:
+    """Hash file contents; a missing file hashes differently from an empty one"""
+    parts = []
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                parts.extend([path, f.read()])
+        else:
+            parts.extend([path, None])
+    return hash_inputs(*parts)
+
+
+def hash_data_files(paths) -> str:
+    """
+    Hash collected data files as generation reads them: from the loose file, or
+    from that day's bundle when only the bundle was downloaded
+    """
+    from bundles import read_data_file
+
+    parts = []
+    for path in paths:
+        parts.extend([path, read_data_file(path)])
+    return hash_inputs(*parts)
+
+
+class PipelineState:
+    """Last successful input hash and outputs per (stage, team)"""
+
+    def __init__(self, path=STATE_PATH):
+        self.path = path
+        self.data = {}
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                self.data = json.load(f)
+
+    def get(self, stage, team_name):
+        return self.data.get(stage, {}).get(team_name) or {}
+
+    def is_fresh(self, stage, team_name, input_hash):
+        entry = self.get(stage, team_name)
+        return (
+            entry.get("status") == "done"
+            and entry.get("input_hash") == input_hash
+            and all(os.path.exists(path) for path in entry.get("outputs", []))
+        )
+
+    def update(self, stage, team_name, **fields):
+        entry = self.data.setdefault(stage, {}).setdefault(team_name, {})
+        entry.update(fields, updated_at=datetime.now(timezone.utc).isoformat())
+        self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path + ".tmp", "w") as f:
+            json.dump(self.data, f, indent=2, ensure_ascii=False)
+        os.replace(self.path + ".tmp", self.path)
+
+
+class Pipeline:
+    def __init__(self, teams=TEAMS, state=None, force=False):
+        self.teams = teams
+        self.state = state or PipelineState()
+        self.force = force
+        self.failed = {}  # team name -> stage that failed in this run
+        self.now_local = datetime.now()
+        self.now_utc = datetime.now(timezone.utc)
+
+    def _pending(self, stage, input_hashes, units=None):
+        """
+        Teams (or other units of work, e.g. a digest's team set) whose inputs
+        changed since their last successful run of the stage
+        """
+        pending = []
+        for team in units or self.teams:
+            team_name = team["name"]
+            failed = [name for name in team.get("teams", (team_name,)) if name in self.failed]
+            if failed:
+                print(f"[{team_name}] {stage}: skipped, {self.failed[failed[0]]} failed for {failed[0]}")
+                continue
+            if not self.force and self.state.is_fresh(stage, team_name, input_hashes[team_name]):
+                print(f"[{team_name}] {stage}: inputs unchanged, skipped")
+                tracer.record(f"pipeline.{stage}", 0.0, team=team_name, cache_hits=1)
+                continue
+            pending.append(team)
+        return pending
+
+    def _run_team(self, stage, team, input_hash, fn):
+        team_name = team["name"]
+        self.state.update(stage, team_name, status="running", input_hash=input_hash)
+        try:
+            with tracer.team(team_name), tracer.span(f"pipeline.{stage}"):
+                fields = fn(team) or {}
+        except Exception as e:
+            print(f"[{team_name}] {stage} failed: {e}")
+            self.failed[team_name] = stage
+            self.state.update(stage, team_name, status="failed", error=f"{type(e).__name__}: {e}")
+            return
+        self.state.update(stage, team_name, status="done", error=None, **fields)
+
+    ### STAGES ###
+    def collect_news(self):
+        from bundles import write_bundle
+        from collect_news import collect_team, collected_paths
+        from scrappers.news_rss import news_rss
+        from scrappers.resilience import RUN_BUDGET_SECONDS, deadline
+
+        today = self.now_local.strftime("%Y%m%d")
+        start_date = (self.now_local - timedelta(days=1)).strftime("%Y%m%d")
+        input_hashes = {}
+        for team in self.teams:
+            source_entries = [
+                [t for t in source_teams if t["name"] == team["name"]]
+                for source_teams in (FOTMOB_TEAMS, FPL_TEAMS, FBREF_TEAMS)
+            ]
+            input_hashes[team["name"]] = hash_inputs(team, source_entries, start_date, today)
+
+        pending = self._pending("collect_news", input_hashes)
+        if not pending:
+            return
+        with deadline(RUN_BUDGET_SECONDS):
+            with tracer.span("collect.news_rss_batch", teams=len(pending)):
+                news_by_team = news_rss.get_transfer_news_rss_batch([team["name"] for team in pending], dedup=True, today=today)
+
+            def run(team):
+                collect_team(team, start_date, today, news_by_team.get(team["name"], []))
+                return {"outputs": [path for path in collected_paths(team, today) if os.path.exists(path)]}
+
+            for team in pending:
+                self._run_team("collect_news", team, input_hashes[team["name"]], run)
+        write_bundle(today)
+
+    def generate_newsletter(self):
+        from generate_newsletter import generate_team_newsletter, weekly_data_paths
+
+        end_date = self.now_utc
+        start_date = end_date - timedelta(days=7)
+        config_hash = hash_files(GENERATE_CONFIG_FILES)
+        input_hashes = {
+            team["name"]: hash_inputs(
+                config_hash,
+                hash_data_files(path for day in weekly_data_paths(team["name"], start_date, end_date) for path in day),
+                start_date.strftime("%Y%m%d"),
+                end_date.strftime("%Y%m%d"),
+            )
+            for team in self.teams
+        }
+
+        def run(team):
+            output_path = generate_team_newsletter(team["name"], start_date, end_date)
+            print(f"Generated: {output_path}")
+            return {"outputs": [output_path]}
+
+        for team in self._pending("generate_newsletter", input_hashes):
+            self._run_team("generate_newsletter", team, input_hashes[team["name"]], run)
+
+    def send_mail(self):
+        from email_sender.digest import DigestBuilder, newsletter_path
+        from google_sheet_parser import google_sheet_parser
+        from send_mail import send_digest
+
+        today_str = self.now_utc.strftime("%Y%m%d")
+        start_date_str = (self.now_utc - timedelta(days=7)).strftime("%Y%m%d")
+        builder = DigestBuilder(today_str, start_date_str)
+        # Send work is per distinct team set: everyone following the same teams gets the same digest
+        groups = builder.group_subscribers(google_sheet_parser.get_subscriptions())
+        units = [{"name": " + ".join(teams), "teams": teams} for teams in groups]
+        section_hashes = {team["name"]: hash_files([newsletter_path(today_str, team["name"])]) for team in self.teams}
+        input_hashes = {
+            unit["name"]: hash_inputs([section_hashes.get(name) for name in unit["teams"]], sorted(groups[unit["teams"]]))
+            for unit in units
+        }
+
+        def run(unit):
+            label = unit["name"]
+            digest = builder.build(unit["teams"])
+            if not digest:
+                print(f"[{label}] No newsletter found, skipping.")
+                return {"sent": []}
+            entry = self.state.get("send_mail", label)
+            # Addresses that already received this exact digest in an earlier, interrupted run
+            already_sent = entry.get("sent", []) if entry.get("sent_hash") == input_hashes[label] else []
+            sent = list(already_sent)
+
+            def save_progress(sent):
+                # A hard kill skips the finally below; lose at most SENT_SAVE_EVERY addresses
+                if len(sent) % SENT_SAVE_EVERY == 0:
+                    self.state.update("send_mail", label, sent=sent, sent_hash=input_hashes[label])
+
+            try:
+                send_digest(digest, groups[unit["teams"]], sent, on_sent=save_progress)
+            finally:
+                self.state.update("send_mail", label, sent=sent, sent_hash=input_hashes[label])
+            print(f"[{label}] Done — {len(groups[unit['teams']])} subscriber(s) notified.")
+            return {"sent": sent}
+
+        for unit in self._pending("send_mail", input_hashes, units):
+            self._run_team("send_mail", unit, input_hashes[unit["name"]], run)
+
+    def run(self, stages):
+        for stage in stages:
+            print(f"=== {stage} ===")
+            with tracer.span(f"pipeline.stage.{stage}"):
+                getattr(self, stage)()
+        return not self.failed
+
+
+def select_stages(only=None, start_from=None):
+    if only:
+        stages = [stage.strip() for stage in only.split(",")]
+        unknown = [stage for stage in stages if stage not in STAGES]
+        if unknown:
+            raise ValueError(f"Unknown stage(s): {', '.join(unknown)} (choose from {', '.join(STAGES)})")
+        return [stage for stage in STAGES if stage in stages]
+    if start_from:
+        if start_from not in STAGES:
+            raise ValueError(f"Unknown stage: {start_from} (choose from {', '.join(STAGES)})")
+        return list(STAGES[STAGES.index(start_from):])
+    return list(STAGES)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the FootballNews pipeline in one process")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--only", type=str, help=f"Comma-separated stages to run ({', '.join(STAGES)})")
+    group.add_argument("--from", dest="start_from", type=str, help="Run this stage and every stage after it")
+    parser.add_argument("--force", action="store_true", help="Re-run teams even if their inputs are unchanged")
+    args = parser.parse_args()
+
+    try:
+        stages = select_stages(args.only, args.start_from)
+    except ValueError as e:
+        parser.error(str(e))
+
+    tracer.start_run("pipeline")
+    try:
+        ok = Pipeline(force=args.force).run(stages)
+    finally:
+        tracer.write()
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
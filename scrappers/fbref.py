@@ -1,21 +1,40 @@
 from datetime import datetime
 import requests
 import time
+import re
 import os
 
 
-from bs4 import BeautifulSoup
+from lxml import etree
 import pandas as pd
 
 import config
+from metrics import tracer
+from scrappers.rate_limiter import get_host_limiter
+from scrappers.resilience import resilient_get
 
 BASE_URL = config.URL["fbref"]
 teams = config.FBREF_TEAMS
 
+MATCHLOG_TABLE_ID = b'id="matchlogs_all"'
+
+# data-stat 속성 -> 뉴스레터용 컬럼 이름
+MATCHLOG_COLUMNS = {
+    "date": "date",
+    "comp": "competition",
+    "opponent": "opponent",
+    "venue": "venue",
+    "result": "result",
+    "goals_for": "goals_for",
+    "goals_against": "goals_against",
+    "possession": "possession",
+}
+
 
 class FBrefScraper:
-    def __init__(self):
-        self.base_url = BASE_URL
+    def __init__(self, cache_ttl: int = 24 * 60 * 60):
+        self.base_url = BASE_URL.rstrip("/")
+        self.cache_ttl = cache_ttl
         self.HEADERS = {
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
@@ -29,104 +48,103 @@ class FBrefScraper:
             "Sec-Fetch-Site": "same-origin",
             "Sec-Fetch-User": "?1"
         }
+        # 세션을 재사용하여 쿠키와 keep-alive 연결 유지
+        self.session = requests.Session()
+        self.session.headers.update(self.HEADERS)
+        self.rate_limiter = get_host_limiter(self.base_url)
 
 
-    def get_match_logs(self, team_id: str, season: str) -> pd.DataFrame:
+    def _is_fresh(self, path: str) -> bool:
+        """
+        캐시 파일이 존재하고 cache_ttl 이내에 저장되었는지 확인한다.
         """
-        FBref에서 특정 팀의 시즌별 경기 로그를 가져온다.
+        return os.path.exists(path) and time.time() - os.path.getmtime(path) < self.cache_ttl
+
+
+    def get_match_logs(self, team_id: str, season: str) -> bytes:
+        """
+        FBref에서 특정 팀의 시즌별 경기 로그 페이지 원본(bytes)을 가져온다.
         """
         url = f"{self.base_url}/en/squads/{team_id}/{season}/matchlogs/all_comps"
-        
-        # 세션을 사용하여 쿠키 유지
-        session = requests.Session()
-        session.headers.update(self.HEADERS)
-        
-        # 요청 전 짧은 딜레이 추가
-        time.sleep(5)
-        
-        resp = session.get(url)
-        resp.raise_for_status()
-
-        if not os.path.exists(f"datas/fbref/{datetime.now().strftime('%Y%m%d')}/match_logs_{team_id}_{season}.html"):
-            soup = BeautifulSoup(resp.text, "lxml")
-            os.makedirs(f"datas/fbref/{datetime.now().strftime('%Y%m%d')}", exist_ok=True)
-            with open(f"datas/fbref/{datetime.now().strftime('%Y%m%d')}/match_logs_{team_id}_{season}.html", "w") as f:
-                f.write(soup.prettify())
-        else:
-            with open(f"datas/fbref/{datetime.now().strftime('%Y%m%d')}/match_logs_{team_id}_{season}.html", "r") as f:
-                soup = BeautifulSoup(f.read(), "lxml")
-
-        return soup
-
-
-    def parse_match_logs(self, soup: BeautifulSoup) -> pd.DataFrame:
-        # 먼저 직접 테이블을 찾아본다
-        table = soup.find("table", id="matchlogs_all")
-        
-        if table:
-            # 테이블을 직접 찾은 경우
-            df = pd.read_html(str(table))[0]
-            return df
-        
-        # 테이블이 주석 안에 있는 경우
-        comments = soup.find_all(string=lambda text: isinstance(text, str) and "<table" in text)
-        
-        for c in comments:
-            if 'id="matchlogs_all"' in c:
-                df = pd.read_html(c)[0]
-                return df
-        
-        # 두 방법 모두 실패한 경우, 페이지의 모든 테이블을 시도
-        all_tables = soup.find_all("table")
-        if all_tables:
-            # matchlogs 관련 테이블 찾기
-            for table in all_tables:
-                if "matchlogs" in str(table.get("id", "")).lower():
-                    df = pd.read_html(str(table))[0]
-                    return df
-        
-        # 마지막으로 pandas가 직접 HTML에서 읽기 시도
-        try:
-            dfs = pd.read_html(resp.text, attrs={"id": "matchlogs_all"})
-            if dfs:
-                return dfs[0]
-        except Exception as e:
-            print(f"Failed to read table with pandas: {e}")
-        
-        # 디버깅: 페이지에 어떤 테이블이 있는지 확인
-        all_table_ids = [t.get("id", "no-id") for t in soup.find_all("table")]
-        print(f"Found tables with IDs: {all_table_ids}")
-        
-        raise RuntimeError("Match log table not found")
-
-
-    def clean_match_logs(self, df: pd.DataFrame) -> pd.DataFrame:
+        cache_path = f"datas/fbref/{datetime.now().strftime('%Y%m%d')}/match_logs_{team_id}_{season}.html"
+
+        with tracer.span("fbref.match_logs", team_id=team_id) as span:
+            # 캐시가 유효하면 네트워크 요청 없이 바로 사용
+            if self._is_fresh(cache_path):
+                with open(cache_path, "rb") as f:
+                    span.add(cache_hits=1)
+                    return f.read()
+
+            # FBref 요청 제한(분당 10회)에 맞춰 재시도를 포함한 매 요청 전에 필요한 만큼만 대기
+            def wait_for_rate_limit():
+                if self.rate_limiter:
+                    span.add(rate_limit_wait_s=round(self.rate_limiter.acquire(), 3))
+
+            resp = resilient_get(self.session, url, before_attempt=wait_for_rate_limit)
+            resp.raise_for_status()
+            span.add(bytes=len(resp.content))
+
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path, "wb") as f:
+                f.write(resp.content)
+
+            return resp.content
+
+
+    def extract_match_logs_table(self, html: bytes) -> bytes:
+        """
+        페이지에서 matchlogs_all 테이블 부분만 잘라낸다.
+
+        FBref는 일부 테이블을 HTML 주석 안에 넣어 두지만, 바이트 단위로 잘라내므로
+        주석 안/밖 여부와 관계없이 같은 방식으로 찾을 수 있다.
+        """
+        id_pos = html.find(MATCHLOG_TABLE_ID)
+        if id_pos == -1:
+            return None
+        start = html.rfind(b"<table", 0, id_pos)
+        end = html.find(b"</table>", id_pos)
+        if start == -1 or end == -1:
+            return None
+        return html[start:end + len(b"</table>")]
+
+
+    def parse_match_logs(self, html: bytes) -> pd.DataFrame:
         """
-        뉴스레터에 필요한 컬럼만 추출
+        matchlogs_all 테이블만 lxml로 파싱하여 타입이 지정된 DataFrame으로 변환한다.
         """
-        df = df.rename(columns={
-            "Date": "date",
-            "Comp": "competition",
-            "Opponent": "opponent",
-            "Venue": "venue",
-            "Result": "result",
-            "GF": "goals_for",
-            "GA": "goals_against",
-            "Poss": "possession"
-        })
-
-        keep_cols = [
-            "date",
-            "competition",
-            "opponent",
-            "venue",
-            "result",
-            "goals_for",
-            "goals_against",
-            "possession"
-        ]
-
-        return df[keep_cols]
+        with tracer.span("fbref.parse", bytes=len(html)):
+            return self._parse_match_logs(html)
+
+
+    def _parse_match_logs(self, html: bytes) -> pd.DataFrame:
+        table_html = self.extract_match_logs_table(html)
+        if table_html is None:
+            # 디버깅: 페이지에 어떤 테이블이 있는지 확인
+            all_table_ids = [m.decode() for m in re.findall(rb'<table[^>]*\bid="([^"]+)"', html)]
+            print(f"Found tables with IDs: {all_table_ids}")
+            raise RuntimeError("Match log table not found")
+
+        table = etree.fromstring(table_html, etree.HTMLParser(encoding="utf-8")).find(".//table")
+
+        columns = {column: [] for column in MATCHLOG_COLUMNS.values()}
+        for row in table.iterfind(".//tbody/tr"):
+            # 중간 헤더/구분선 행은 건너뛴다
+            if "thead" in (row.get("class") or "") or "spacer" in (row.get("class") or ""):
+                continue
+            cells = {cell.get("data-stat"): cell for cell in row if cell.get("data-stat") in MATCHLOG_COLUMNS}
+            if "date" not in cells:
+                continue
+            for data_stat, column in MATCHLOG_COLUMNS.items():
+                cell = cells.get(data_stat)
+                columns[column].append(cell.xpath("string()").strip() if cell is not None else "")
+
+        df = pd.DataFrame(columns)
+        df["date"] = pd.to_datetime(df["date"], errors="coerce")
+        # 승부차기 스코어("1 (4)")는 정규 시간 스코어만 사용
+        for column in ("goals_for", "goals_against"):
+            df[column] = pd.to_numeric(df[column].str.extract(r"^(\d+)", expand=False), errors="coerce").astype("Int64")
+        df["possession"] = pd.to_numeric(df["possession"], errors="coerce")
+        return df
 
 
     def get_recent_matches(self, team_id: str, season: str, n: int = 2) -> pd.DataFrame:
@@ -134,9 +152,8 @@ class FBrefScraper:
         최근 경기 결과 조회
         """
 
-        soup = self.get_match_logs(team_id, season)
-        df = self.parse_match_logs(soup)
-        df = self.clean_match_logs(df)
+        html = self.get_match_logs(team_id, season)
+        df = self.parse_match_logs(html)
         return df.sort_values("date", ascending=False).head(n).reset_index(drop=True)
 
 
@@ -149,6 +166,5 @@ if __name__ == "__main__":
         recent = fbref_scraper.get_recent_matches(TEAM_ID, SEASON, n=2)
 
         print(recent)
-        time.sleep(30)  # 요청 간 딜레이
 
 
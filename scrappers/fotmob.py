@@ -1,26 +1,124 @@
+from contextlib import contextmanager
 from datetime import datetime, timezone, timedelta
+import argparse
 import requests
 import re
+import os
 import time
+from urllib.parse import urlparse
 
-from playwright.sync_api import sync_playwright
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError, sync_playwright
+
+from config import URL
+from metrics import tracer
+from scrappers.records import Match, MatchEvent, MatchStats, StatPair, Transfer
+from scrappers.resilience import CircuitOpenError, DeadlineExceeded, bounded_timeout, guarded, remaining_budget, resilient_get
+
+TRAFFIC_MODES = ("record", "replay")
+STAT_LABELS = {
+    "possesion": "Ball Possesion",
+    "xg_point": "Expected goals (xG)",
+    "total_shots": "Total Shots",
+}
 
 
 class FotMobCrawler:
-    def __init__(self):
-        self.base_url = "https://www.fotmob.com/api"
+    def __init__(self, traffic_mode=None, traffic_dir=None):
+        self.site_url = URL["FOTMOB"].rstrip("/")
+        self.host = urlparse(self.site_url).netloc
+        self.base_url = f"{self.site_url}/api"
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            "Referer": "https://www.fotmob.com/"
+            "Referer": f"{self.site_url}/"
         }
-        
+        # record: save each page's traffic as a HAR archive
+        # replay: serve page traffic from those archives, never touching the network
+        self.traffic_mode = traffic_mode or os.environ.get("FOTMOB_TRAFFIC_MODE") or None
+        if self.traffic_mode and self.traffic_mode not in TRAFFIC_MODES:
+            raise ValueError(f"Unknown traffic mode: {self.traffic_mode}. Valid: {TRAFFIC_MODES}")
+        self.traffic_dir = traffic_dir or os.environ.get("FOTMOB_TRAFFIC_DIR", "datas/fotmob_traffic")
+        # seconds; each navigation is further capped by the caller's remaining deadline
+        self.navigation_timeout = float(os.environ.get("FOTMOB_NAVIGATION_TIMEOUT", 20))
+        # ms; upper bound on the fixed wait after each page load (unset: the page's own wait)
+        self.max_settle_ms = int(os.environ["FOTMOB_MAX_SETTLE_MS"]) if os.environ.get("FOTMOB_MAX_SETTLE_MS") else None
+
+
+    @contextmanager
+    def _open_page(self, traffic_name, default_timeout=30000):
+        """Launch Chromium and yield a page, recording or replaying its traffic when enabled"""
+        har_path = os.path.join(self.traffic_dir, f"{traffic_name}.har.zip")
+        with sync_playwright() as p:
+            # The span covers launch and context setup only, not the page session
+            with tracer.span("fotmob.browser_launch", page=traffic_name):
+                browser = p.chromium.launch(headless=True)
+                try:
+                    if self.traffic_mode == "record":
+                        os.makedirs(self.traffic_dir, exist_ok=True)
+                        context = browser.new_context(record_har_path=har_path)
+                    else:
+                        context = browser.new_context()
+                    if self.traffic_mode == "replay":
+                        if not os.path.exists(har_path):
+                            raise FileNotFoundError(f"No recorded traffic for {traffic_name}: {har_path}")
+                        context.route_from_har(har_path, not_found="abort")
+
+                    page = context.new_page()
+                    page.set_default_timeout(default_timeout)
+                    page.set_default_navigation_timeout(self.navigation_timeout * 1000)
+                except Exception:
+                    browser.close()
+                    raise
+            try:
+                yield page
+            finally:
+                # Closing the context flushes the HAR archive in record mode
+                context.close()
+                browser.close()
+
+
+    def _goto(self, page, url):
+        # Repeated navigation failures open the FotMob host's breaker so later pages fail fast
+        timeout = bounded_timeout(self.navigation_timeout)
+        with tracer.span("fotmob.goto", url=url), guarded(self.host, url):
+            try:
+                page.goto(url, timeout=timeout * 1000)
+            except PlaywrightTimeoutError as e:
+                # A navigation cut short by our own deadline says nothing about the host
+                if timeout < self.navigation_timeout:
+                    raise DeadlineExceeded(f"deadline exceeded loading {url}") from e
+                raise
+
+
+    def _settle(self, page, timeout_ms):
+        """Give the page time to fire its API requests and render"""
+        if self.max_settle_ms is not None:
+            timeout_ms = min(timeout_ms, self.max_settle_ms)
+        remaining = remaining_budget()
+        if remaining is not None:
+            timeout_ms = max(0, min(timeout_ms, int(remaining * 1000)))
+        with tracer.span("fotmob.settle", timeout_ms=timeout_ms):
+            if self.traffic_mode == "replay":
+                # Replayed responses are served locally; waiting for the network to go idle is enough
+                page.wait_for_load_state("networkidle")
+            else:
+                page.wait_for_timeout(timeout_ms)
+
+
+    def _pause(self, seconds):
+        if self.traffic_mode != "replay":
+            time.sleep(seconds)
+
+
+    def _traffic_name(self, url_path):
+        return re.sub(r"[^\w-]+", "_", url_path).strip("_")
+
 
     def _get_json(self, endpoint, params=None):
         try:
-            response = requests.get(f"{self.base_url}/{endpoint}", headers=self.headers, params=params)
+            response = resilient_get(requests, f"{self.base_url}/{endpoint}", headers=self.headers, params=params)
             response.raise_for_status()
             return response.json()
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, CircuitOpenError, DeadlineExceeded) as e:
             print(f"Error fetching {endpoint}: {e}")
             return None
 
@@ -29,17 +127,12 @@ class FotMobCrawler:
         """Collect raw data for the team by intercepting the browser's API request"""
         team_data = None
 
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            page.set_default_timeout(30000)
-            page.set_default_navigation_timeout(30000)
-
+        with self._open_page(f"team_{team_id}_overview") as page:
             def handle_response(response):
                 nonlocal team_data
                 if team_data:
                     return
-                if "fotmob.com" not in response.url:
+                if self.host not in response.url:
                     return
                 try:
                     data = response.json()
@@ -50,8 +143,8 @@ class FotMobCrawler:
                     pass
 
             page.on("response", handle_response)
-            page.goto(f"https://www.fotmob.com/teams/{team_id}/overview")
-            page.wait_for_timeout(8000)
+            self._goto(page, f"{self.site_url}/teams/{team_id}/overview")
+            self._settle(page, 8000)
 
             # Fallback: extract from Next.js __NEXT_DATA__ embedded in the page
             if not team_data:
@@ -69,19 +162,14 @@ class FotMobCrawler:
                 except Exception as e:
                     print(f"__NEXT_DATA__ extraction failed: {e}")
 
-            browser.close()
-
         if not team_data:
             print(f"Error fetching teams: could not capture data for team_id={team_id}")
         return team_data
 
 
-    def get_team_matches(self, start_date, end_date, team_data, team_id):
-        """Collect raw data for the team's recent matches"""
-        team_name = team_data.get('details', {}).get('name', 'Unknown')
-        team_name = self._transform_team_name(team_name)
-
-        matches = []
+    def get_fixtures(self, start_date, end_date, team_data):
+        """Return (fixture, kickoff datetime) pairs for every fixture kicking off within the given date range"""
+        fixtures = []
 
         all_fixtures = team_data.get('fixtures', {}).get('allFixtures', {}).get('fixtures', [])
 
@@ -96,53 +184,82 @@ class FotMobCrawler:
                 continue 
             
             if start_date <= match_date <= end_date:
-                finished = match.get('status', {}).get('finished')
-                
-                if not finished:
-                    continue
-                
-                match_url = match.get('pageUrl')
-                opponent = match.get('opponent', {}).get('name')
-                score = match.get('status', {}).get('scoreStr')
-
-                home_team = match.get('home', {}).get('name')
-                away_team = match.get('away', {}).get('name')
-                
-                details = self._analyze_match_details(match_url)
-                
-                match_summary = {
-                    "utc_date": match_time_str,
-                    "local_date_str": match_date.strftime("%Y-%m-%d %H:%M"),
-                    "opponent": opponent,
-                    "score": score,
-                    "home_team": home_team, 
-                    "away_team": away_team,
-                    "competition": details['competition'],
-                    "venue": "Home" if home_team == team_name else "Away",
-                    "stats": details['stats'],
-                    "events": details['events']
-                }
-                matches.append(match_summary)
-                time.sleep(0.5)
+                fixtures.append((match, match_date))
+
+        return fixtures
+
+
+    def get_finished_fixtures(self, start_date, end_date, team_data):
+        """Return (fixture, kickoff datetime) pairs for finished fixtures within the given date range"""
+        return [
+            (match, match_date)
+            for match, match_date in self.get_fixtures(start_date, end_date, team_data)
+            if match.get('status', {}).get('finished')
+        ]
+
+
+    def get_match_status(self, match_id):
+        """One match's status (utcTime, started, finished, cancelled, scoreStr) from the matchDetails API, or None"""
+        data = self._get_json("matchDetails", {"matchId": match_id})
+        if not isinstance(data, dict):
+            return None
+        status = dict(data.get('header', {}).get('status') or {})
+        general = data.get('general') or {}
+        for key in ('started', 'finished'):
+            if key not in status and key in general:
+                status[key] = general[key]
+        return status if 'finished' in status else None
+
+
+    def get_team_matches(self, start_date, end_date, team_data, team_id):
+        """Collect raw data for the team's recent matches"""
+        team_name = team_data.get('details', {}).get('name', 'Unknown')
+        team_name = self._transform_team_name(team_name)
+
+        matches = []
+
+        for match, match_date in self.get_finished_fixtures(start_date, end_date, team_data):
+            details = self._analyze_match_details(match.get('pageUrl'))
+            matches.append(self.build_match(match, match_date, team_name, details))
+            self._pause(0.5)
 
         return matches
 
 
+    def build_match(self, fixture, match_date, team_name, details):
+        """Match record from a team-page fixture and its match page details"""
+        home_team = fixture.get('home', {}).get('name')
+        return Match(
+            utc_date=fixture.get('status', {}).get('utcTime'),
+            local_date_str=match_date.strftime("%Y-%m-%d %H:%M"),
+            opponent=fixture.get('opponent', {}).get('name'),
+            score=fixture.get('status', {}).get('scoreStr'),
+            home_team=home_team,
+            away_team=fixture.get('away', {}).get('name'),
+            competition=details['competition'],
+            venue="Home" if home_team == team_name else "Away",
+            stats=details['stats'],
+            events=details['events'],
+        )
+
+
     def _get_transfers_data(self, team_id):
         """Fetch raw transfers data by intercepting the browser's API request"""
-        transfers_data = None
+        transfers_data = self._capture_transfers_data(f"{self.site_url}/teams/{team_id}/transfers", f"team_{team_id}_transfers")
+        if not transfers_data:
+            print(f"Error fetching transfers: could not capture data for team_id={team_id}")
+        return transfers_data
 
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            page.set_default_timeout(30000)
-            page.set_default_navigation_timeout(30000)
 
+    def _capture_transfers_data(self, url, traffic_name):
+        transfers_data = None
+
+        with self._open_page(traffic_name) as page:
             def handle_response(response):
                 nonlocal transfers_data
                 if transfers_data:
                     return
-                if "fotmob.com" not in response.url:
+                if self.host not in response.url:
                     return
                 try:
                     data = response.json()
@@ -156,47 +273,150 @@ class FotMobCrawler:
                     pass
 
             page.on("response", handle_response)
-            page.goto(f"https://www.fotmob.com/teams/{team_id}/transfers")
-            page.wait_for_timeout(8000)
-            browser.close()
+            self._goto(page, url)
+            self._settle(page, 8000)
 
-        if not transfers_data:
-            print(f"Error fetching transfers: could not capture data for team_id={team_id}")
         return transfers_data
 
+
+    def _filter_transfers(self, start_date, end_date, transfers_data):
+        """Raw transfer entries dated within the given range"""
+        raw = transfers_data.get('transfers', []) if transfers_data else []
+        t_list = raw if isinstance(raw, list) else []
+        filtered = []
+        for t in t_list:
+            if not isinstance(t, dict):
+                continue
+            t_date_str = t.get('transferDate')
+            if t_date_str:
+                try:
+                    t_date = datetime.strptime(t_date_str, "%Y-%m-%dT%H:%M:%S.%fZ").replace(tzinfo=timezone.utc)
+                    if start_date <= t_date <= end_date:
+                        filtered.append(t)
+                except Exception:
+                    pass
+        return filtered
+
+
+    def _format_transfer(self, t):
+        return Transfer(
+            player=t.get('name'),
+            type=f"{t.get('fromClub')} -> {t.get('toClub')}",
+            date=t.get('transferDate'),
+        )
+
+
     def get_team_transfers(self, start_date, end_date, team_data, team_id):
         """Collect raw data for the team's recent transfers"""
-        print(f"🔄 Collecting data for Team {team_data['details']['name']}... ({start_date.date()} ~ {end_date.date()})")
-        transfers = []
-
+        team_name = team_data['details']['name'] if team_data else team_id
+        print(f"🔄 Collecting data for Team {team_name}... ({start_date.date()} ~ {end_date.date()})")
         transfers_data = self._get_transfers_data(team_id)
-        if transfers_data:
-            raw = transfers_data.get('transfers', [])
-            t_list = raw if isinstance(raw, list) else []
-            for t in t_list:
-                if not isinstance(t, dict):
-                    continue
-                t_date_str = t.get('transferDate')
-                if t_date_str:
-                    try:
-                        t_date = datetime.strptime(t_date_str, "%Y-%m-%dT%H:%M:%S.%fZ").replace(tzinfo=timezone.utc)
-                        if start_date <= t_date <= end_date:
-                            transfers.append({
-                                "player": t.get('name'),
-                                "type": f"{t.get('fromClub')} -> {t.get('toClub')}",
-                                "date": t_date_str
-                            })
-                    except Exception:
-                        pass
-        return transfers
+        return [self._format_transfer(t) for t in self._filter_transfers(start_date, end_date, transfers_data)]
 
 
-    def get_team_data(self, start_date, end_date, team_id):
-        """Collect match and transfer data for the team within the given date range"""
+    ### LEAGUE ###
+    def _get_league_data(self, league_id):
+        """Collect a competition's full fixture list by intercepting the browser's API request"""
+        league_data = None
+
+        with self._open_page(f"league_{league_id}_fixtures") as page:
+            def handle_response(response):
+                nonlocal league_data
+                if league_data:
+                    return
+                if self.host not in response.url:
+                    return
+                try:
+                    data = response.json()
+                    if isinstance(data, dict) and "details" in data and ("fixtures" in data or "matches" in data):
+                        print(f"Captured league data from: {response.url}")
+                        league_data = data
+                except Exception:
+                    pass
+
+            page.on("response", handle_response)
+            self._goto(page, f"{self.site_url}/leagues/{league_id}/fixtures")
+            self._settle(page, 8000)
+
+            # Fallback: extract from Next.js __NEXT_DATA__ embedded in the page
+            if not league_data:
+                try:
+                    next_data = page.evaluate(
+                        "() => JSON.parse(document.getElementById('__NEXT_DATA__').textContent)"
+                    )
+                    page_props = next_data.get("props", {}).get("pageProps", {})
+                    if "details" in page_props and ("fixtures" in page_props or "matches" in page_props):
+                        league_data = page_props
+                        print("Captured league data from __NEXT_DATA__")
+                except Exception as e:
+                    print(f"__NEXT_DATA__ extraction failed: {e}")
+
+        if not league_data:
+            print(f"Error fetching league: could not capture data for league_id={league_id}")
+        return league_data
+
+
+    def get_league_finished_fixtures(self, start_date, end_date, league_data):
+        """Return (fixture, kickoff datetime) pairs for the competition's finished fixtures within the given date range"""
+        fixtures = league_data.get('fixtures') or league_data.get('matches') or {}
+        all_matches = fixtures.get('allMatches', []) if isinstance(fixtures, dict) else fixtures
+
+        finished_fixtures = []
+        for match in all_matches:
+            match_time_str = match.get('status', {}).get('utcTime')
+            if not match_time_str:
+                continue
+            try:
+                match_date = datetime.fromisoformat(match_time_str.replace("Z", "+00:00"))
+            except ValueError:
+                continue
+            if start_date <= match_date <= end_date and match.get('status', {}).get('finished'):
+                finished_fixtures.append((match, match_date))
+        return finished_fixtures
+
+
+    def get_league_transfers(self, start_date, end_date, league_id):
+        """
+        Collect a competition's transfers from one page load.
+
+        Returns:
+            dict of FotMob team id -> list of Transfer (as get_team_transfers returns),
+            or None when the page's transfers could not be captured
+        """
+        print(f"🔄 Collecting transfers for league {league_id}... ({start_date.date()} ~ {end_date.date()})")
+        transfers_data = self._capture_transfers_data(f"{self.site_url}/leagues/{league_id}/transfers", f"league_{league_id}_transfers")
+        if not transfers_data:
+            print(f"Error fetching transfers: could not capture data for league_id={league_id}")
+            return None
+
+        transfers_by_team = {}
+        for t in self._filter_transfers(start_date, end_date, transfers_data):
+            for club_id in {t.get('fromClubId'), t.get('toClubId')} - {None}:
+                transfers_by_team.setdefault(club_id, []).append(self._format_transfer(t))
+        return transfers_by_team
+
+
+    def parse_date_range(self, start_date, end_date):
+        """Convert YYYYMMDD strings into an inclusive UTC datetime range"""
         if isinstance(start_date, str):
             start_date = datetime.strptime(start_date, '%Y%m%d').replace(tzinfo=timezone.utc)
         if isinstance(end_date, str):
             end_date = datetime.strptime(end_date, '%Y%m%d').replace(tzinfo=timezone.utc) + timedelta(days=1) - timedelta(seconds=1)
+        return start_date, end_date
+
+
+    def build_report_data(self, team_name, start_date, end_date, matches, transfers):
+        return {
+            "team_name": team_name,
+            "period": f"{start_date.date()} ~ {end_date.date()}",
+            "matches": matches,
+            "transfers": transfers
+        }
+
+
+    def get_team_data(self, start_date, end_date, team_id):
+        """Collect match and transfer data for the team within the given date range"""
+        start_date, end_date = self.parse_date_range(start_date, end_date)
 
         team_data = self._get_team_data(team_id)
         if not team_data:
@@ -205,13 +425,7 @@ class FotMobCrawler:
         matches_data = self.get_team_matches(start_date, end_date, team_data, team_id)
         transfers_data = self.get_team_transfers(start_date, end_date, team_data, team_id)
 
-        report_data = {
-            "team_name": team_data['details']['name'],
-            "period": f"{start_date.date()} ~ {end_date.date()}",
-            "matches": matches_data,
-            "transfers": transfers_data
-        }
-        return report_data
+        return self.build_report_data(team_data['details']['name'], start_date, end_date, matches_data, transfers_data)
 
     
     def _transform_team_name(self, team_name):
@@ -274,40 +488,26 @@ class FotMobCrawler:
 
 
     def _analyze_match_details(self, match_url):
-        url = "https://www.fotmob.com" + match_url
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            page.set_default_timeout(10000)
-            page.set_default_navigation_timeout(30000)
-
-            page.goto(url)
-            time.sleep(10)
-
-            competition = self._get_competition(page)
-            home_possesion, away_possesion = self._get_possesion(page)
-            home_xg, away_xg = self._get_xg_point(page)
-            home_total_shots, away_total_shots = self._get_total_shots(page)
-            events = self._parse_match_events(page)
-
-            browser.close() 
+        url = self.site_url + match_url
+        with self._open_page(f"match_{self._traffic_name(match_url)}", default_timeout=10000) as page:
+            self._goto(page, url)
+            self._settle(page, 10000)
+
+            with tracer.span("fotmob.parse_match_page") as span:
+                competition = self._get_competition(page)
+                home_possesion, away_possesion = self._get_possesion(page)
+                home_xg, away_xg = self._get_xg_point(page)
+                home_total_shots, away_total_shots = self._get_total_shots(page)
+                events = self._parse_match_events(page)
+                span.set(events=len(events))
 
             match_details = {
                 "competition": competition,
-                "stats": {
-                    "possesion": {
-                        "home": home_possesion,
-                        "away": away_possesion
-                    },
-                    "xg_point": {
-                        "home": home_xg,
-                        "away": away_xg
-                    },
-                    "total_shots": {
-                        "home": home_total_shots,
-                        "away": away_total_shots
-                    }
-                },
+                "stats": MatchStats(
+                    possesion=StatPair(home_possesion, away_possesion),
+                    xg_point=StatPair(home_xg, away_xg),
+                    total_shots=StatPair(home_total_shots, away_total_shots),
+                ),
                 "events": events
             }
             return match_details
@@ -417,25 +617,25 @@ class FotMobCrawler:
         for i in range(count):
             item = items.nth(i)
             event_type = self._detect_event_type(item)
-            data = {
-                "time": self._parse_extract_time(item),
-                "type": event_type,
-                "side": self._detect_side(item),
-            }
 
             # type-specific parsing
             if event_type == "substitution":
-                data.update(self._parse_substitution(item))
+                data = self._parse_substitution(item)
 
             elif event_type == "goal":
-                data.update(self._parse_goal(item))
+                data = self._parse_goal(item)
 
             elif event_type == "card":
-                data.update(self._parse_card(item))
+                data = self._parse_card(item)
             else:
                 continue
 
-            events.append(data)
+            events.append(MatchEvent(
+                time=self._parse_extract_time(item),
+                type=event_type,
+                side=self._detect_side(item),
+                **data,
+            ))
         return events
 
     def generate_matches_markdown_report(self, matches):
@@ -443,38 +643,34 @@ class FotMobCrawler:
             return None
         md = ""
         for match in matches:
-            md += f"## 🏟️ Match: vs {match['opponent']}\n"
-            md += f"- **Competition:** {match['competition']}\n"
-            md += f"- **Date:** {match['local_date_str']}\n"
-            md += f"- **Venue:** {match['venue']}\n"
-            md += f"- **Score:** {match['score']}\n"
+            md += f"## 🏟️ Match: vs {match.opponent}\n"
+            md += f"- **Competition:** {match.competition}\n"
+            md += f"- **Date:** {match.local_date_str}\n"
+            md += f"- **Venue:** {match.venue}\n"
+            md += f"- **Score:** {match.score}\n"
             
-            if not match['stats']:
+            stat_rows = match.stats.rows() if match.stats else []
+            if not stat_rows:
                 md += "- No match stats recorded.\n"
             else:
                 md += "\n**📊 Match Stats:**\n"
-                md += f"| Stat | {match['home_team']} | {match['away_team']} |\n"
+                md += f"| Stat | {match.home_team} | {match.away_team} |\n"
                 md += "|---|:-:|:-:|\n"
-                for s in match['stats'].keys():
-                    if s == 'possesion':
-                        md += f"| Ball Possesion | {match['stats'][s]['home']} | {match['stats'][s]['away']} |\n"
-                    elif s == 'xg_point':
-                        md += f"| Expected goals (xG) | {match['stats'][s]['home']} | {match['stats'][s]['away']} |\n"
-                    elif s == 'total_shots':
-                        md += f"| Total Shots | {match['stats'][s]['home']} | {match['stats'][s]['away']} |\n"
-
-            if not match['events']:
+                for s, pair in stat_rows:
+                    md += f"| {STAT_LABELS[s]} | {pair.home} | {pair.away} |\n"
+
+            if not match.events:
                 md += "- No match events recorded.\n"
             else:
                 md += "\n**⏱️ Match Events:**\n"
-                for e in match['events']:
-                    md += f"- `{e['time']}'` **{match['home_team'] if e['side'] == 'home' else match['away_team']}**:"
-                    if e['type'] == 'substitution':
-                        md += f"  - 🔄 Player Substitution: {e['player_out']} -> {e['player_in']}\n"
-                    elif e['type'] == 'goal':
-                        md += f"  - ⚽ Goal: {e['scorer']} {e['score']} (assist by {e['assist']})\n"
-                    elif e['type'] == 'card':
-                        md += f"  - {'🟨' if e['card_type'] == 'Yellow Card' else '🟥'} {e['card_type']}: {e['player']}\n"
+                for e in match.events:
+                    md += f"- `{e.time}'` **{match.home_team if e.side == 'home' else match.away_team}**:"
+                    if e.type == 'substitution':
+                        md += f"  - 🔄 Player Substitution: {e.player_out} -> {e.player_in}\n"
+                    elif e.type == 'goal':
+                        md += f"  - ⚽ Goal: {e.scorer} {e.score} (assist by {e.assist})\n"
+                    elif e.type == 'card':
+                        md += f"  - {'🟨' if e.card_type == 'Yellow Card' else '🟥'} {e.card_type}: {e.player}\n"
             md += "---\n"
         return md
 
@@ -484,7 +680,7 @@ class FotMobCrawler:
             return None
         md = "## 🔁 Transfer Updates\n"
         for t in transfers:
-            md += f"- **Player:** {t['player']} **Type:** {t['type']} **Date:** {t['date'].split('T')[0]}\n"
+            md += f"- **Player:** {t.player} **Type:** {t.type} **Date:** {t.date.split('T')[0]}\n"
         return md
 
 
@@ -509,4 +705,22 @@ class FotMobCrawler:
         return md
 
 
-fot_mob_crawler = FotMobCrawler()
\ No newline at end of file
+fot_mob_crawler = FotMobCrawler()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Collect a FotMob team report, optionally recording or replaying traffic")
+    parser.add_argument("--team-id", type=int, required=True, help="FotMob team ID (see teams.yml)")
+    parser.add_argument("--start", type=str, required=True, help="Start date in YYYYMMDD format")
+    parser.add_argument("--end", type=str, required=True, help="End date in YYYYMMDD format")
+    parser.add_argument("--traffic", choices=TRAFFIC_MODES, help="Record page traffic, or replay it without network access")
+    parser.add_argument("--traffic-dir", type=str, help="Directory for recorded traffic (default: datas/fotmob_traffic)")
+    args = parser.parse_args()
+
+    crawler = FotMobCrawler(traffic_mode=args.traffic, traffic_dir=args.traffic_dir)
+    started = time.perf_counter()
+    report_data = crawler.get_team_data(args.start, args.end, args.team_id)
+    if report_data:
+        print(crawler.generate_markdown_report(report_data, 'matches'))
+        print(crawler.generate_markdown_report(report_data, 'transfers'))
+    print(f"Finished in {time.perf_counter() - started:.1f}s")
\ No newline at end of file
@@ -3,32 +3,151 @@ import requests
 import json
 import os
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from config import FPL_TEAMS, URL
+from metrics import tracer
+from scrappers.resilience import resilient_get
 
 BASE_URL = URL["FPL"]
 
+# bootstrap-static 응답 중 실제로 사용하는 필드만 스냅샷에 저장
+BOOTSTRAP_FIELDS = {
+    "teams": ("id", "name", "short_name"),
+    "events": ("id", "deadline_time", "finished"),
+}
+
+
+def load_json_bytes(raw: bytes):
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+
+def dump_json_bytes(data) -> bytes:
+    if orjson:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def project_bootstrap(bootstrap: dict) -> dict:
+    '''
+    bootstrap-static 응답에서 사용하는 필드만 남긴 스냅샷 생성
+
+    Args:
+        bootstrap: bootstrap-static 전체 응답
+
+    Returns:
+        projected: teams, events의 필요한 필드만 담은 스냅샷
+    '''
+    return {
+        key: [{field: item.get(field) for field in fields} for item in bootstrap[key]]
+        for key, fields in BOOTSTRAP_FIELDS.items()
+    }
+
+
+def normalize_team_name(team_name: str) -> str:
+    return " ".join(team_name.lower().replace(".", "").split())
+
 
 class FPLScraper:
-    def __init__(self):
+    def __init__(self, keep_raw_bootstrap: bool = None):
         self.base_url = BASE_URL
+        # 원본 bootstrap-static 응답 보관 여부 (기본값: FPL_KEEP_RAW_BOOTSTRAP 환경 변수)
+        if keep_raw_bootstrap is None:
+            keep_raw_bootstrap = os.environ.get("FPL_KEEP_RAW_BOOTSTRAP", "") == "1"
+        self.keep_raw_bootstrap = keep_raw_bootstrap
+        self.session = requests.Session()
+        self._bootstrap = None
+        self._fixtures = None
+        # 조회용 인덱스 (원본 목록이 바뀔 때만 다시 생성)
+        self._indexed_teams = None
+        self.team_by_id = {}
+        self.team_id_by_name = {}
+        self._indexed_fixtures = None
+        self.fixtures_by_team = {}
+
+
+    def _get(self, url) -> bytes:
+        # 타임아웃/재시도/서킷 브레이커는 resilience 정책(fantasy.premierleague.com)을 따른다
+        resp = resilient_get(self.session, url)
+        resp.raise_for_status()
+        return resp.content
 
 
     def fetch_bootstrap(self):
         '''
-        전체 데이터 조회
+        전체 데이터 조회 (인스턴스당 한 번만 로드)
+
+        teams, events의 필요한 필드만 담은 bootstrap_projected.json을 저장/로드한다.
+        원본 응답(bootstrap.json)은 keep_raw_bootstrap일 때만 저장한다.
         '''
-        os.makedirs(f"datas/fpl/{datetime.now().strftime('%Y%m%d')}", exist_ok=True)
-        if os.path.exists(f"datas/fpl/{datetime.now().strftime('%Y%m%d')}/bootstrap.json"):
-            with open(f"datas/fpl/{datetime.now().strftime('%Y%m%d')}/bootstrap.json", "r") as f:
-                bootstrap = json.load(f)
-        else:
-            bootstrap = requests.get(self.base_url + "bootstrap-static/").json()
-            with open(f"datas/fpl/{datetime.now().strftime('%Y%m%d')}/bootstrap.json", "w") as f:
-                json.dump(bootstrap, f)
+        if self._bootstrap is not None:
+            return self._bootstrap
+
+        data_dir = f"datas/fpl/{datetime.now().strftime('%Y%m%d')}"
+        os.makedirs(data_dir, exist_ok=True)
+        with tracer.span("fpl.bootstrap") as span:
+            if os.path.exists(f"{data_dir}/bootstrap_projected.json"):
+                with open(f"{data_dir}/bootstrap_projected.json", "rb") as f:
+                    bootstrap = load_json_bytes(f.read())
+                span.add(cache_hits=1)
+            else:
+                if os.path.exists(f"{data_dir}/bootstrap.json"):
+                    with open(f"{data_dir}/bootstrap.json", "rb") as f:
+                        raw = f.read()
+                    span.add(cache_hits=1)
+                else:
+                    raw = self._get(self.base_url + "bootstrap-static/")
+                    span.add(bytes=len(raw))
+                    if self.keep_raw_bootstrap:
+                        with open(f"{data_dir}/bootstrap.json", "wb") as f:
+                            f.write(raw)
+                bootstrap = project_bootstrap(load_json_bytes(raw))
+                del raw
+                with open(f"{data_dir}/bootstrap_projected.json", "wb") as f:
+                    f.write(dump_json_bytes(bootstrap))
 
         teams = bootstrap["teams"]
         events = bootstrap["events"]
-        return teams, events
+        self._bootstrap = (teams, events)
+        self.build_team_index(teams)
+        return self._bootstrap
+
+
+    def build_team_index(self, teams: list):
+        '''
+        팀 ID -> 팀, 정규화된 팀 이름/약칭 -> 팀 ID 인덱스 생성
+
+        Args:
+            teams: 전체 팀 목록
+        '''
+        if teams is self._indexed_teams:
+            return
+        self.team_by_id = {team["id"]: team for team in teams}
+        self.team_id_by_name = {}
+        for team in teams:
+            for key in ("name", "short_name"):
+                if team.get(key):
+                    self.team_id_by_name.setdefault(normalize_team_name(team[key]), team["id"])
+        self._indexed_teams = teams
+
+
+    def build_fixture_index(self, fixtures: list):
+        '''
+        팀 ID -> 경기 목록 인덱스 생성
+
+        Args:
+            fixtures: 전체 경기 결과 목록
+        '''
+        if fixtures is self._indexed_fixtures:
+            return
+        self.fixtures_by_team = {}
+        for fixture in fixtures:
+            self.fixtures_by_team.setdefault(fixture["team_h"], []).append(fixture)
+            self.fixtures_by_team.setdefault(fixture["team_a"], []).append(fixture)
+        self._indexed_fixtures = fixtures
 
 
     def get_team_id(self, team_name: str, teams: list):
@@ -45,8 +164,16 @@ class FPLScraper:
         Raises:
             ValueError: 해당 팀의 ID를 찾을 수 없을 때
         '''
+        self.build_team_index(teams)
+        normalized = normalize_team_name(team_name)
+        team_id = self.team_id_by_name.get(normalized)
+        if team_id is not None:
+            return team_id
+
+        # 정확히 일치하지 않으면 부분 일치로 한 번 찾고 결과를 인덱스에 저장
         for team in teams:
-            if team_name.lower() in team["name"].lower():
+            if normalized in normalize_team_name(team["name"]):
+                self.team_id_by_name[normalized] = team["id"]
                 return team["id"]
         raise ValueError(f"해당 팀의 ID를 찾을 수 없습니다. {team_name}")
 
@@ -71,6 +198,33 @@ class FPLScraper:
         return recent_gameweek_ids
 
 
+    def fetch_all_fixtures(self):
+        '''
+        시즌 전체 경기 목록 조회 (필터 없는 fixtures/ 엔드포인트 1회 호출)
+
+        Returns:
+            fixtures: 시즌 전체 경기 목록
+        '''
+        if self._fixtures is not None:
+            return self._fixtures
+
+        os.makedirs(f"datas/fpl/{datetime.now().strftime('%Y%m%d')}", exist_ok=True)
+        with tracer.span("fpl.fixtures") as span:
+            if os.path.exists(f"datas/fpl/{datetime.now().strftime('%Y%m%d')}/fixtures.json"):
+                with open(f"datas/fpl/{datetime.now().strftime('%Y%m%d')}/fixtures.json", "rb") as f:
+                    fixtures = load_json_bytes(f.read())
+                span.add(cache_hits=1)
+            else:
+                raw = self._get(self.base_url + "fixtures/")
+                span.add(bytes=len(raw))
+                fixtures = load_json_bytes(raw)
+                with open(f"datas/fpl/{datetime.now().strftime('%Y%m%d')}/fixtures.json", "wb") as f:
+                    f.write(raw)
+
+        self._fixtures = fixtures
+        return self._fixtures
+
+
     def get_fixtures(self, gameweek_ids: list):
         '''
         경기 결과 조회
@@ -81,17 +235,8 @@ class FPLScraper:
         Returns:
             all_fixtures: 전체 경기 결과 목록
         '''
-        all_fixtures = []
-        for gw_id in gameweek_ids:
-            if os.path.exists(f"datas/fpl/{datetime.now().strftime('%Y%m%d')}/fixtures_{gw_id}.json"):
-                with open(f"datas/fpl/{datetime.now().strftime('%Y%m%d')}/fixtures_{gw_id}.json", "r") as f:
-                    fixtures = json.load(f)
-            else:
-                fixtures = requests.get(self.base_url + f"fixtures/?event={gw_id}").json()
-                with open(f"datas/fpl/{datetime.now().strftime('%Y%m%d')}/fixtures_{gw_id}.json", "w") as f:
-                    json.dump(fixtures, f)
-            all_fixtures.extend(fixtures)
-        return all_fixtures
+        gameweek_ids = set(gameweek_ids)
+        return [f for f in self.fetch_all_fixtures() if f.get("event") in gameweek_ids]
 
 
     def get_team_fixtures(self, team_id: int, fixtures: list):
@@ -105,7 +250,8 @@ class FPLScraper:
         Returns:
             team_fixtures: 팀 경기 결과 목록
         '''
-        return [f for f in fixtures if f["team_h"] == team_id or f["team_a"] == team_id]
+        self.build_fixture_index(fixtures)
+        return self.fixtures_by_team.get(team_id, [])
 
 
     def parse_fixture(self, team_fixtures: list, team_id: int, team_name: str, teams: list) -> list:
@@ -121,19 +267,20 @@ class FPLScraper:
         Returns:
             game_results: 경기 결과 목록
         '''
+        self.build_team_index(teams)
         game_results = []
         for match in team_fixtures:
             is_home = match["team_h"] == team_id
             opponent_id = match["team_a"] if is_home else match["team_h"]
 
-            opponent = next(t for t in teams if t["id"] == opponent_id)["name"]
+            opponent = self.team_by_id[opponent_id]["name"]
 
             team_score = match["team_h_score"] if is_home else match["team_a_score"]
             opp_score = match["team_a_score"] if is_home else match["team_h_score"]
 
             venue = "Home" if is_home else "Away"
 
-            result = '/n'.join([
+            result = '\n'.join([
                 f"Gameweek: {match.get('event', 'N/A')}",
                 f"Team: {team_name}",
                 f"Opponent: {opponent}",
@@ -166,8 +313,33 @@ class FPLScraper:
         return game_results
 
 
+    def get_game_results_for_teams(self, team_names: list, days: int = 14) -> dict:
+        '''
+        여러 팀의 경기 결과를 한 번에 조회
+
+        bootstrap과 fixtures는 한 번만 로드하고, 팀별로는 메모리 내 필터링만 수행한다.
+
+        Args:
+            team_names: 팀 이름 목록
+            days: 조회할 최근 일수
+
+        Returns:
+            results_by_team: 팀 이름 -> 경기 결과 목록
+        '''
+        teams, results = self.fetch_bootstrap()
+        recent_gameweek_ids = self.get_recent_gameweek_ids(results, days=days)
+        fixtures = self.get_fixtures(recent_gameweek_ids)
+
+        results_by_team = {}
+        for team_name in team_names:
+            team_id = self.get_team_id(team_name, teams)
+            team_fixtures = self.get_team_fixtures(team_id, fixtures)
+            results_by_team[team_name] = self.parse_fixture(team_fixtures, team_id, team_name, teams)
+        return results_by_team
+
+
 if __name__ == "__main__":
-    for team in FPL_TEAMS:
-        fpl_scraper = FPLScraper()
-        game_results = fpl_scraper.get_game_results(team["short_name"])
-        print(game_results)
\ No newline at end of file
+    fpl_scraper = FPLScraper()
+    results_by_team = fpl_scraper.get_game_results_for_teams([team["short_name"] for team in FPL_TEAMS])
+    for team_name, game_results in results_by_team.items():
+        print(game_results)
@@ -0,0 +1,366 @@
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+from scrappers.fotmob import fot_mob_crawler
+from scrappers.records import STAT_NAMES, Match, MatchStats, StatPair
+from scrappers.team_registry import normalize_team_name, team_registry
+
+# Fields every source can provide, and the fields only a FotMob match page has.
+BASIC_FIELDS = ("utc_date", "local_date_str", "home_team", "away_team", "score", "competition", "venue")
+DETAIL_FIELDS = ("possesion", "xg_point", "total_shots", "events")
+
+# Sources for basic facts, cheapest first.
+# A FotMob league page is loaded once and shared by every team in the league,
+# so per team it is cheaper than an FBref request.
+SOURCE_COSTS = {
+    "fpl": 1,
+    "fotmob_league": 2,
+    "fbref": 3,
+    "fotmob_team": 4,
+    "fotmob_match": 5,
+}
+# Sources that cover every competition; FPL and a league page only know their own competition.
+COMPLETE_SOURCES = {"fbref", "fotmob_team"}
+# Sources that provide FotMob match page URLs, preferred first
+PAGE_URL_SOURCES = ("fotmob_league", "fotmob_team")
+# Sources disagree on the date of a kickoff near midnight (FBref lists the local date)
+DATE_TOLERANCE = timedelta(days=1)
+
+
+def canonical_team_name(name):
+    return normalize_team_name(team_registry.canonical_name(name))
+
+
+def flip_score(score):
+    """The score with the away side first: 2 - 1 becomes 1 - 2"""
+    if not score or " - " not in score:
+        return score
+    home, away = score.split(" - ", 1)
+    return f"{away} - {home}"
+
+
+def flip_fields(fields):
+    """Fields of a record whose source lists the home and away teams the other way round"""
+    flipped = dict(fields)
+    flipped["home_team"], flipped["away_team"] = fields.get("away_team"), fields.get("home_team")
+    flipped["score"] = flip_score(fields.get("score"))
+    for stat in STAT_NAMES:
+        if fields.get(stat) is not None:
+            flipped[stat] = StatPair(fields[stat].away, fields[stat].home)
+    return flipped
+
+
+def flip_event(event):
+    side = {"home": "away", "away": "home"}.get(event.side, event.side)
+    return replace(event, side=side, score=flip_score(event.score))
+
+
+class CanonicalMatch:
+    """One real-world match merged from every source, with per-field provenance"""
+
+    __slots__ = ("date", "home", "away", "team_side", "fields", "sources", "page_url", "page_flipped")
+
+    def __init__(self, date, home, away, team_side):
+        self.date = date
+        self.home = home
+        self.away = away
+        self.team_side = team_side
+        self.fields = {}
+        self.sources = {}
+        self.page_url = None
+        # The match page lists home and away the other way round (neutral venues)
+        self.page_flipped = False
+
+    @property
+    def teams(self):
+        """The two teams regardless of which one a source lists as home"""
+        return frozenset((canonical_team_name(self.home), canonical_team_name(self.away)))
+
+    def fill(self, source, **fields):
+        """Set fields that are still missing and record which source provided them"""
+        for field, value in fields.items():
+            if value is None or self.fields.get(field) is not None:
+                continue
+            self.fields[field] = value
+            self.sources[field] = source
+
+    def missing(self, fields):
+        return [field for field in fields if self.fields.get(field) is None]
+
+    def to_match(self):
+        """The Match record FotMobCrawler.generate_matches_markdown_report renders"""
+        stats = {stat: self.fields[stat] for stat in STAT_NAMES if self.fields.get(stat) is not None}
+        return Match(
+            utc_date=self.fields.get("utc_date"),
+            local_date_str=self.fields.get("local_date_str"),
+            opponent=self.away if self.team_side == "home" else self.home,
+            score=self.fields.get("score"),
+            home_team=self.fields.get("home_team", self.home),
+            away_team=self.fields.get("away_team", self.away),
+            competition=self.fields.get("competition"),
+            venue=self.fields.get("venue"),
+            stats=MatchStats(**stats) if stats else None,
+            events=self.fields.get("events") or [],
+            sources=dict(self.sources),
+        )
+
+
+class MatchResolver:
+    """
+    Resolve a team's matches from the cheapest source that knows about them.
+
+    Basic facts (date, teams, score, competition, venue) are filled from FPL,
+    then FBref, then the FotMob team page, stopping as soon as a source that
+    covers every competition has answered. FPL and a league page only know
+    their own competition, so a complete source (FBref or the FotMob team
+    page) is always consulted; the cheaper sources fill fields first and the
+    complete one adds cup matches and what they left out. A FotMob match page
+    is only opened for matches still missing one of the requested detail
+    fields.
+    """
+
+    def __init__(self, sources=("fpl", "fbref", "fotmob_team")):
+        self.sources = sorted(sources, key=SOURCE_COSTS.get)
+        self._fpl_scraper = None
+        self._fbref_scraper = None
+        self._fotmob_team_data = {}
+        self._fotmob_league_data = {}
+        # Match pages are shared by both teams when two subscribed teams meet
+        self._match_details = {}
+
+    @property
+    def fpl_scraper(self):
+        if self._fpl_scraper is None:
+            from scrappers.fpl import FPLScraper
+            self._fpl_scraper = FPLScraper()
+        return self._fpl_scraper
+
+    @property
+    def fbref_scraper(self):
+        if self._fbref_scraper is None:
+            from scrappers.fbref import FBrefScraper
+            self._fbref_scraper = FBrefScraper()
+        return self._fbref_scraper
+
+    def get_fotmob_team_data(self, team_name):
+        if team_name not in self._fotmob_team_data:
+            self._fotmob_team_data[team_name] = fot_mob_crawler._get_team_data(team_registry.get(team_name)["fotmob_id"])
+        return self._fotmob_team_data[team_name]
+
+    def get_fotmob_league_data(self, league_id):
+        if league_id not in self._fotmob_league_data:
+            self._fotmob_league_data[league_id] = fot_mob_crawler._get_league_data(league_id)
+        return self._fotmob_league_data[league_id]
+
+    def get_match_details(self, page_url):
+        if page_url not in self._match_details:
+            self._match_details[page_url] = fot_mob_crawler._analyze_match_details(page_url)
+            fot_mob_crawler._pause(0.5)
+        return self._match_details[page_url]
+
+    ### SOURCES ###
+    # Each _from_<source> returns (kickoff, home, away, team_side, fields) records,
+    # or None when the source has no mapping for the team.
+    def _from_fpl(self, team_name, start_date, end_date):
+        entry = team_registry.get(team_name) or {}
+        if "fpl_short_name" not in entry:
+            return None
+        scraper = self.fpl_scraper
+        teams, _ = scraper.fetch_bootstrap()
+        team_id = scraper.get_team_id(entry["fpl_short_name"], teams)
+        scraper.build_fixture_index(scraper.fetch_all_fixtures())
+
+        records = []
+        for fixture in scraper.fixtures_by_team.get(team_id, []):
+            if not fixture.get("finished") or not fixture.get("kickoff_time"):
+                continue
+            kickoff = datetime.fromisoformat(fixture["kickoff_time"].replace("Z", "+00:00"))
+            if not start_date <= kickoff <= end_date:
+                continue
+            is_home = fixture["team_h"] == team_id
+            home = scraper.team_by_id[fixture["team_h"]]["name"]
+            away = scraper.team_by_id[fixture["team_a"]]["name"]
+            records.append((kickoff, home, away, "home" if is_home else "away", {
+                "utc_date": fixture["kickoff_time"],
+                "local_date_str": kickoff.strftime("%Y-%m-%d %H:%M"),
+                "score": f"{fixture['team_h_score']} - {fixture['team_a_score']}",
+                "competition": "Premier League",
+                "venue": "Home" if is_home else "Away",
+            }))
+        return records
+
+    def _from_fbref(self, team_name, start_date, end_date):
+        entry = team_registry.get(team_name) or {}
+        if "fbref_id" not in entry:
+            return None
+        season_start = start_date.year if start_date.month >= 7 else start_date.year - 1
+        season = f"{season_start}-{season_start + 1}"
+        scraper = self.fbref_scraper
+        df = scraper.parse_match_logs(scraper.get_match_logs(entry["fbref_id"], season))
+        # Fixtures that have not been played yet have no score
+        df = df.dropna(subset=["date", "goals_for", "goals_against"])
+
+        records = []
+        for row in df.itertuples(index=False):
+            match_date = row.date.to_pydatetime().replace(tzinfo=timezone.utc)
+            if not start_date.date() <= match_date.date() <= end_date.date():
+                continue
+            is_home = row.venue == "Home"
+            home, away = (team_name, row.opponent) if is_home else (row.opponent, team_name)
+            home_goals, away_goals = (row.goals_for, row.goals_against) if is_home else (row.goals_against, row.goals_for)
+            possession = None
+            if row.possession == row.possession:
+                team_possession = int(row.possession)
+                possession = StatPair(
+                    home=f"{team_possession if is_home else 100 - team_possession}%",
+                    away=f"{100 - team_possession if is_home else team_possession}%",
+                )
+            records.append((match_date, home, away, "home" if is_home else "away", {
+                "score": f"{home_goals} - {away_goals}",
+                "competition": row.competition,
+                "venue": row.venue,
+                "possesion": possession,
+            }))
+        return records
+
+    def _from_fotmob_team(self, team_name, start_date, end_date):
+        if "fotmob_id" not in (team_registry.get(team_name) or {}):
+            return None
+        team_data = self.get_fotmob_team_data(team_name)
+        if not team_data:
+            raise RuntimeError("could not capture FotMob team data")
+
+        records = []
+        for match, match_date in fot_mob_crawler.get_finished_fixtures(start_date, end_date, team_data):
+            home = match.get("home", {}).get("name")
+            away = match.get("away", {}).get("name")
+            is_home = canonical_team_name(home) == canonical_team_name(team_name)
+            records.append((match_date, home, away, "home" if is_home else "away", {
+                "utc_date": match.get("status", {}).get("utcTime"),
+                "local_date_str": match_date.strftime("%Y-%m-%d %H:%M"),
+                "home_team": home,
+                "away_team": away,
+                "score": match.get("status", {}).get("scoreStr"),
+                "venue": "Home" if is_home else "Away",
+                "page_url": match.get("pageUrl"),
+            }))
+        return records
+
+    def _from_fotmob_league(self, team_name, start_date, end_date):
+        entry = team_registry.get(team_name) or {}
+        if entry.get("league_id") is None:
+            return None
+        league_data = self.get_fotmob_league_data(entry["league_id"])
+        if not league_data:
+            raise RuntimeError("could not capture FotMob league data")
+        competition = league_data.get("details", {}).get("name")
+
+        records = []
+        for match, match_date in fot_mob_crawler.get_league_finished_fixtures(start_date, end_date, league_data):
+            home = match.get("home", {})
+            away = match.get("away", {})
+            if entry["fotmob_id"] not in (home.get("id"), away.get("id")):
+                continue
+            is_home = home.get("id") == entry["fotmob_id"]
+            records.append((match_date, home.get("name"), away.get("name"), "home" if is_home else "away", {
+                "utc_date": match.get("status", {}).get("utcTime"),
+                "local_date_str": match_date.strftime("%Y-%m-%d %H:%M"),
+                "home_team": home.get("name"),
+                "away_team": away.get("name"),
+                "score": match.get("status", {}).get("scoreStr"),
+                "competition": competition,
+                "venue": "Home" if is_home else "Away",
+                "page_url": match.get("pageUrl"),
+            }))
+        return records
+
+    ### MERGE ###
+    def _merge(self, matches, source, records):
+        merged = []
+        for match_date, home, away, team_side, fields in records:
+            date = match_date.astimezone(timezone.utc).date()
+            candidate = CanonicalMatch(date, home, away, team_side)
+            # A source lists each match once, so its other records never join a match it already filled
+            nearby = sorted(
+                (m for m in matches if abs(m.date - date) <= DATE_TOLERANCE and not any(m is n for n in merged)),
+                key=lambda m: abs(m.date - date),
+            )
+            # Home and away are not fixed at neutral venues, so compare the pair of teams
+            existing = next((m for m in nearby if m.teams == candidate.teams), None)
+            if existing is None:
+                # Opponent spellings differ between sources; a team does not play
+                # twice within DATE_TOLERANCE, so the nearest date identifies the match.
+                existing = next(iter(nearby), None)
+            if existing is None:
+                matches.append(candidate)
+                existing = candidate
+            merged.append(existing)
+
+            flipped = existing is not candidate and team_side != existing.team_side
+            page_url = fields.pop("page_url", None)
+            if page_url and not existing.page_url:
+                existing.page_url = page_url
+                existing.page_flipped = flipped
+            existing.fill(source, **(flip_fields(fields) if flipped else fields))
+
+    def resolve(self, team_name, start_date, end_date, detail_fields=DETAIL_FIELDS):
+        """
+        Resolve the team's finished matches in [start_date, end_date].
+
+        Args:
+            team_name: canonical team name from setting.yml
+            start_date, end_date: YYYYMMDD strings or UTC datetimes
+            detail_fields: fields that may be filled from a FotMob match page
+
+        Returns:
+            list of CanonicalMatch, ordered by date
+        """
+        start_date, end_date = fot_mob_crawler.parse_date_range(start_date, end_date)
+        matches = []
+
+        for source in self.sources:
+            try:
+                records = getattr(self, f"_from_{source}")(team_name, start_date, end_date)
+            except Exception as e:
+                print(f"[{team_name}] {source} lookup failed: {e}")
+                continue
+            if records is None:
+                continue
+            self._merge(matches, source, records)
+            if source in COMPLETE_SOURCES:
+                break
+
+        # Match page URLs only come from FotMob league/team pages
+        needs_details = [m for m in matches if m.missing(detail_fields)]
+        for source in PAGE_URL_SOURCES:
+            if not any(not m.page_url for m in needs_details) or source not in self.sources:
+                continue
+            try:
+                self._merge(matches, source, getattr(self, f"_from_{source}")(team_name, start_date, end_date) or [])
+            except Exception as e:
+                print(f"[{team_name}] {source} lookup failed: {e}")
+
+        for match in needs_details:
+            if not match.page_url:
+                continue
+            try:
+                details = self.get_match_details(match.page_url)
+            except Exception as e:
+                print(f"[{team_name}] fotmob_match analysis failed for {match.page_url}: {e}")
+                continue
+            stats = details.get("stats") or MatchStats()
+            fields = {stat: getattr(stats, stat) for stat in STAT_NAMES if stat in detail_fields}
+            events = details.get("events") if "events" in detail_fields else None
+            if match.page_flipped:
+                fields = flip_fields(fields)
+                events = [flip_event(event) for event in events] if events else events
+            match.fill("fotmob_match", competition=details.get("competition"), events=events, **fields)
+
+        matches.sort(key=lambda m: m.date)
+        for match in matches:
+            provenance = ", ".join(f"{field}<-{source}" for field, source in match.sources.items())
+            print(f"[{team_name}] {match.date} {match.home} vs {match.away}: {provenance}")
+        return matches
+
+
+match_resolver = MatchResolver()
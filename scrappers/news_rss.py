@@ -1,34 +1,250 @@
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit
 import requests
 import feedparser
+import hashlib
+import json
 import os
-from datetime import datetime
+import re
+from datetime import datetime, timedelta
+
+from config import TEAMS, URL
+from metrics import tracer
+from scrappers.resilience import CircuitOpenError, DeadlineExceeded, resilient_get, submit_with_context
+
+RSS_CACHE_DIR = "datas/news_rss/cache"
+SEEN_INDEX_PATH = f"{RSS_CACHE_DIR}/seen_index.json"
+SEEN_INDEX_RETENTION_DAYS = 30
+
+
+def normalize_url(url):
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), "", ""))
+
+
+def normalize_title(title):
+    # 구글 뉴스 제목 끝의 " - 언론사" 제거
+    title = title.rsplit(" - ", 1)[0] if " - " in title else title
+    return " ".join(re.sub(r"[^\w\s]", " ", title.lower()).split())
+
+
+def _hash(value):
+    return hashlib.sha1(value.encode("utf-8")).hexdigest()
 
-from config import TEAMS
 
 class NewsRSS:
-    def __init__(self):
-        pass
+    def __init__(self, max_workers: int = 8, max_items: int = 20, max_new_items: int = 10, max_undeduped_items: int = 5):
+        self.max_workers = max_workers
+        self.max_items = max_items
+        self.max_new_items = max_new_items
+        # dedup 없이 가져올 때 팀별 기사 수 (기존과 같이 상위 5개)
+        self.max_undeduped_items = max_undeduped_items
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.validators_path = f"{RSS_CACHE_DIR}/validators.json"
+        self.base_url = URL["NEWS_RSS"].rstrip("/")
+
+    def build_rss_url(self, team_name):
+        # 검색어: 팀명 + transfer + (공신력 있는 언론사 필터)
+        query = f'"{team_name}" transfer (site:skysports.com OR site:bbc.co.uk OR site:theathletic.com)'
+        encoded_query = requests.utils.quote(query)
+        return f"{self.base_url}/search?q={encoded_query}&hl=en-GB&gl=GB&ceid=GB:en"
+
+    def _body_path(self, rss_url):
+        return f"{RSS_CACHE_DIR}/{hashlib.sha1(rss_url.encode()).hexdigest()}.xml"
+
+    def _load_validators(self, path=None):
+        path = path or self.validators_path
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def _save_validators(self, validators, path=None):
+        os.makedirs(RSS_CACHE_DIR, exist_ok=True)
+        with open(path or self.validators_path, "w") as f:
+            json.dump(validators, f, indent=2)
+
+    def fetch_feed(self, rss_url, validator=None):
+        """
+        ETag/Last-Modified를 이용한 조건부 요청으로 RSS 원본(bytes)을 가져옵니다.
+        304 응답이면 저장된 본문을 재사용합니다.
+
+        Returns:
+            (body, validator): RSS 본문과 다음 요청에 사용할 validator
+        """
+        body_path = self._body_path(rss_url)
+        headers = {}
+        if validator and os.path.exists(body_path):
+            if validator.get("etag"):
+                headers["If-None-Match"] = validator["etag"]
+            if validator.get("last_modified"):
+                headers["If-Modified-Since"] = validator["last_modified"]
+
+        with tracer.span("news_rss.fetch") as span:
+            resp = resilient_get(self.session, rss_url, headers=headers)
+            span.add(bytes=len(resp.content))
+            if resp.status_code == 304:
+                span.add(cache_hits=1)
+                with open(body_path, "rb") as f:
+                    return f.read(), validator
+            resp.raise_for_status()
+
+        os.makedirs(RSS_CACHE_DIR, exist_ok=True)
+        with open(body_path, "wb") as f:
+            f.write(resp.content)
+        new_validator = {
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+        }
+        return resp.content, new_validator
+
+    def parse_news_items(self, body):
+        with tracer.span("news_rss.parse", bytes=len(body)):
+            feed = feedparser.parse(body)
+
+        news_items = []
+        for entry in feed.entries[:self.max_items]:
+            news_items.append({
+                "title": entry.title,
+                "link": entry.link,
+                "published": entry.published
+            })
+        return news_items
+
+    def load_seen_index(self, path=SEEN_INDEX_PATH):
+        if not os.path.exists(path):
+            return {"urls": {}, "titles": {}, "repeats": {}}
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def save_seen_index(self, seen_index, today, path=SEEN_INDEX_PATH):
+        # 보관 기간이 지난 항목은 정리
+        cutoff = (datetime.strptime(today, "%Y%m%d") - timedelta(days=SEEN_INDEX_RETENTION_DAYS)).strftime("%Y%m%d")
+        for key in ("urls", "titles"):
+            seen_index[key] = {k: v for k, v in seen_index[key].items() if v >= cutoff}
+        for team_name, counts in seen_index["repeats"].items():
+            seen_index["repeats"][team_name] = {d: n for d, n in counts.items() if d >= cutoff}
+
+        os.makedirs(RSS_CACHE_DIR, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(seen_index, f, ensure_ascii=False)
+
+    def filter_seen_items(self, seen_index, team_name, news_items, today):
+        """
+        이전 날짜에 이미 수집한 기사(정규화된 URL 또는 제목 해시 기준)를 제외합니다.
+        오늘 처음 본 기사는 같은 날 다시 실행해도 유지됩니다.
+
+        Returns:
+            (new_items, repeat_count): 새 기사 목록과 중복으로 제외된 기사 수
+        """
+        new_items = []
+        repeat_count = 0
+        for item in news_items:
+            url_key = _hash(f"{team_name}|{normalize_url(item['link'])}")
+            title_key = _hash(f"{team_name}|{normalize_title(item['title'])}")
+            first_seen = min(
+                seen_index["urls"].get(url_key, today),
+                seen_index["titles"].get(title_key, today),
+            )
+            if first_seen < today:
+                repeat_count += 1
+                continue
+            if len(new_items) >= self.max_new_items:
+                continue
+            seen_index["urls"][url_key] = first_seen
+            seen_index["titles"][title_key] = first_seen
+            new_items.append(item)
+
+        seen_index["repeats"].setdefault(team_name, {})[today] = repeat_count
+        return new_items, repeat_count
 
     def get_transfer_news_rss(self, team_name):
-            """
-            구글 뉴스 RSS를 활용해 공신력 있는 소스의 이적 루머만 추출합니다.
-            """
-            # 검색어: 팀명 + transfer + (공신력 있는 언론사 필터)
-            query = f'"{team_name}" transfer (site:skysports.com OR site:bbc.co.uk OR site:theathletic.com)'
-            encoded_query = requests.utils.quote(query)
-            rss_url = f"https://news.google.com/rss/search?q={encoded_query}&hl=en-GB&gl=GB&ceid=GB:en"
-            
-            feed = feedparser.parse(rss_url)
-            
-            news_items = []
-            for entry in feed.entries[:5]:  # 상위 5개만 추출
-                news_items.append({
-                    "title": entry.title,
-                    "link": entry.link,
-                    "published": entry.published
-                })
-                
-            return news_items
+        """
+        구글 뉴스 RSS를 활용해 공신력 있는 소스의 이적 루머만 추출합니다.
+        """
+        return self.get_transfer_news_rss_batch([team_name])[team_name]
+
+    def get_transfer_news_rss_batch(self, team_names, dedup: bool = False, today: str = None, shard: str = None):
+        """
+        여러 팀의 RSS를 동시에 가져와 팀별 뉴스 목록을 반환합니다.
+        dedup이면 이전 날짜에 수집한 기사를 제외하고 seen index를 갱신하며 (최대 max_new_items개),
+        아니면 상위 max_undeduped_items개만 반환합니다.
+        shard가 주어지면 validator/seen index를 샤드별 파일에 저장하고, merge_shard_state로 합칩니다.
+
+        Returns:
+            news_by_team: 팀 이름 -> 뉴스 목록 (가져오지 못한 팀은 빈 목록)
+        """
+        validators = self._load_validators()
+        urls = {team_name: self.build_rss_url(team_name) for team_name in team_names}
+
+        def fetch(team_name):
+            rss_url = urls[team_name]
+            try:
+                with tracer.team(team_name):
+                    return team_name, self.fetch_feed(rss_url, validators.get(rss_url))
+            except (requests.exceptions.RequestException, CircuitOpenError, DeadlineExceeded) as e:
+                print(f"Error fetching RSS for {team_name}: {e}")
+                return team_name, (None, validators.get(rss_url))
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, max(len(urls), 1))) as executor:
+            # 호출한 쪽의 deadline이 작업 스레드에도 적용되도록 context를 복사해 실행
+            results = [future.result() for future in [submit_with_context(executor, fetch, team_name) for team_name in urls]]
+
+        news_by_team = {}
+        for team_name, (body, validator) in results:
+            if validator:
+                validators[urls[team_name]] = validator
+            with tracer.team(team_name):
+                news_by_team[team_name] = self.parse_news_items(body) if body else []
+        self._save_validators(validators, self._shard_path(self.validators_path, shard))
+
+        if dedup:
+            today = today or datetime.now().strftime("%Y%m%d")
+            seen_index = self.load_seen_index()
+            for team_name, news_items in news_by_team.items():
+                news_by_team[team_name], repeat_count = self.filter_seen_items(seen_index, team_name, news_items, today)
+                print(f"[{team_name}] RSS: {len(news_by_team[team_name])} new, {repeat_count} repeat(s) skipped")
+            self.save_seen_index(seen_index, today, self._shard_path(SEEN_INDEX_PATH, shard))
+        else:
+            news_by_team = {team_name: news_items[:self.max_undeduped_items] for team_name, news_items in news_by_team.items()}
+        return news_by_team
+
+    def _shard_path(self, path, shard):
+        if not shard:
+            return path
+        root, ext = os.path.splitext(path)
+        return f"{root}.shard-{shard}{ext}"
+
+    def merge_shard_state(self, shards, today: str = None):
+        """
+        샤드별 validator/seen index 파일을 기본 파일에 합치고 샤드 파일은 삭제합니다.
+        같은 기사는 가장 먼저 본 날짜를 유지합니다.
+        """
+        today = today or datetime.now().strftime("%Y%m%d")
+        validators = self._load_validators()
+        seen_index = self.load_seen_index()
+        merged = False
+        for shard in shards:
+            validators_path = self._shard_path(self.validators_path, shard)
+            if os.path.exists(validators_path):
+                validators.update(self._load_validators(validators_path))
+                os.remove(validators_path)
+                merged = True
+            seen_index_path = self._shard_path(SEEN_INDEX_PATH, shard)
+            if os.path.exists(seen_index_path):
+                shard_index = self.load_seen_index(seen_index_path)
+                for key in ("urls", "titles"):
+                    for item_key, first_seen in shard_index[key].items():
+                        seen_index[key][item_key] = min(first_seen, seen_index[key].get(item_key, first_seen))
+                for team_name, counts in shard_index["repeats"].items():
+                    seen_index["repeats"].setdefault(team_name, {}).update(counts)
+                os.remove(seen_index_path)
+                merged = True
+        if merged:
+            self._save_validators(validators)
+            self.save_seen_index(seen_index, today)
 
     def get_news_rss_markdown(self, news_items, team_name):
         if not news_items:
@@ -39,4 +255,4 @@ class NewsRSS:
         return markdown
 
 
-news_rss = NewsRSS()
\ No newline at end of file
+news_rss = NewsRSS()
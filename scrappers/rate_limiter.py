@@ -0,0 +1,64 @@
+from urllib.parse import urlparse
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. acquire()
+    reserves a token and sleeps only for the deficit, so a caller that arrives
+    after the bucket has refilled never waits, and concurrent callers are
+    spaced out instead of all waking at once.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self) -> float:
+        """Take one token and return how long the caller must wait before using it"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self) -> float:
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+# requests per second, burst size
+# FBref allows at most 10 requests per minute; a burst of 1 keeps every
+# 60-second window at or below that limit.
+HOST_RATE_LIMITS = {
+    "fbref.com": (10 / 60, 1),
+}
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_host_limiter(url: str):
+    """Return the shared TokenBucket for the url's host, or None if the host is not limited"""
+    host = urlparse(url).hostname or ""
+    for domain, (rate, capacity) in HOST_RATE_LIMITS.items():
+        if host == domain or host.endswith("." + domain):
+            with _limiters_lock:
+                if domain not in _limiters:
+                    _limiters[domain] = TokenBucket(rate, capacity)
+                return _limiters[domain]
+    return None
@@ -0,0 +1,158 @@
+"""
+Typed records for collected matches and transfers.
+
+Slotted dataclasses keep season-long histories small (no per-instance
+__dict__) and make field access a plain attribute lookup. to_dict/from_dict
+map to and from the same JSON shape the scrapers produced as plain dicts,
+so saved data and benchmark fixtures stay readable.
+"""
+from dataclasses import dataclass, field
+from typing import NamedTuple, Optional
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+STAT_NAMES = ("possesion", "xg_point", "total_shots")
+# Event type -> fields only that type has
+EVENT_FIELDS = {
+    "substitution": ("player_in", "player_out"),
+    "goal": ("scorer", "score", "assist"),
+    "card": ("player", "card_type"),
+}
+
+
+class StatPair(NamedTuple):
+    home: Optional[str]
+    away: Optional[str]
+
+    @classmethod
+    def from_value(cls, value):
+        """StatPair from {"home", "away"}, a [home, away] pair, or None"""
+        if value is None or isinstance(value, StatPair):
+            return value
+        if isinstance(value, dict):
+            return cls(value.get("home"), value.get("away"))
+        return cls(*value)
+
+
+@dataclass(slots=True)
+class MatchStats:
+    possesion: Optional[StatPair] = None
+    xg_point: Optional[StatPair] = None
+    total_shots: Optional[StatPair] = None
+
+    def rows(self):
+        """(stat name, StatPair) for every recorded stat, in report order"""
+        return [(name, getattr(self, name)) for name in STAT_NAMES if getattr(self, name) is not None]
+
+    def to_dict(self):
+        return {name: {"home": pair.home, "away": pair.away} for name, pair in self.rows()}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: StatPair.from_value(data.get(name)) for name in STAT_NAMES})
+
+
+@dataclass(slots=True)
+class MatchEvent:
+    """
+    One timeline entry. Only the fields of its type are set:
+    substitution (player_in, player_out), goal (scorer, score, assist),
+    card (player, card_type).
+    """
+    time: Optional[str]
+    type: str
+    side: Optional[str] = None
+    player_in: Optional[str] = None
+    player_out: Optional[str] = None
+    scorer: Optional[str] = None
+    score: Optional[str] = None
+    assist: Optional[str] = None
+    player: Optional[str] = None
+    card_type: Optional[str] = None
+
+    def to_dict(self):
+        data = {"time": self.time, "type": self.type, "side": self.side}
+        for name in EVENT_FIELDS.get(self.type, ()):
+            data[name] = getattr(self, name)
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: data.get(name) for name in ("time", "type", "side", *EVENT_FIELDS.get(data.get("type"), ()))})
+
+
+@dataclass(slots=True)
+class Match:
+    utc_date: Optional[str]
+    local_date_str: Optional[str]
+    opponent: Optional[str]
+    score: Optional[str]
+    home_team: Optional[str]
+    away_team: Optional[str]
+    competition: Optional[str]
+    venue: Optional[str]
+    stats: Optional[MatchStats] = None
+    events: list = field(default_factory=list)
+    # field -> source that provided it, when the match was merged from several sources
+    sources: Optional[dict] = None
+
+    def to_dict(self):
+        return {
+            "utc_date": self.utc_date,
+            "local_date_str": self.local_date_str,
+            "opponent": self.opponent,
+            "score": self.score,
+            "home_team": self.home_team,
+            "away_team": self.away_team,
+            "competition": self.competition,
+            "venue": self.venue,
+            "stats": self.stats.to_dict() if self.stats else {},
+            "events": [event.to_dict() for event in self.events],
+            "sources": self.sources,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = data.get("stats")
+        return cls(
+            utc_date=data.get("utc_date"),
+            local_date_str=data.get("local_date_str"),
+            opponent=data.get("opponent"),
+            score=data.get("score"),
+            home_team=data.get("home_team"),
+            away_team=data.get("away_team"),
+            competition=data.get("competition"),
+            venue=data.get("venue"),
+            stats=MatchStats.from_dict(stats) if stats else None,
+            events=[MatchEvent.from_dict(event) for event in data.get("events") or []],
+            sources=data.get("sources"),
+        )
+
+
+@dataclass(slots=True)
+class Transfer:
+    player: Optional[str]
+    type: str  # "<from club> -> <to club>"
+    date: Optional[str]
+
+    def to_dict(self):
+        return {"player": self.player, "type": self.type, "date": self.date}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("player"), data.get("type"), data.get("date"))
+
+
+def dumps_records(records) -> bytes:
+    data = [record.to_dict() for record in records]
+    if orjson:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def loads_records(cls, raw):
+    return [cls.from_dict(data) for data in (orjson.loads(raw) if orjson else json.loads(raw))]
@@ -0,0 +1,280 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from contextvars import ContextVar
+from urllib.parse import urlparse
+import contextvars
+import os
+import random
+import threading
+import time
+
+import requests
+
+from metrics import tracer
+
+# Seconds a whole run / a single team may spend before remaining calls fail fast
+RUN_BUDGET_SECONDS = float(os.environ.get("RUN_BUDGET_SECONDS", 3600))
+TEAM_BUDGET_SECONDS = float(os.environ.get("TEAM_BUDGET_SECONDS", 600))
+
+# timeout: per-attempt seconds, retries: extra attempts after the first,
+# hedge_after: seconds before a duplicate request is sent (None disables hedging).
+# max_in_flight: requests (hedges included) open to the host at once (None: unbounded);
+# a hedge is only sent when a slot is free. Rate-limited hosts are never hedged.
+DEFAULT_POLICY = {"timeout": 15, "retries": 2, "hedge_after": None, "max_in_flight": None}
+HOST_POLICIES = {
+    "fantasy.premierleague.com": {"timeout": 10, "retries": 2, "hedge_after": 2.0},
+    "fbref.com": {"timeout": 20, "retries": 1, "hedge_after": None},
+    # 8 = NewsRSS's batch workers, so hedging never adds requests on top of the batch
+    "news.google.com": {"timeout": 10, "retries": 2, "hedge_after": 1.5, "max_in_flight": 8},
+    "www.fotmob.com": {"timeout": 10, "retries": 2, "hedge_after": None},
+}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_deadline = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+### DEADLINES ###
+@contextmanager
+def deadline(seconds):
+    """Bound every call made in this block (on this thread) by `seconds`; nested budgets only shrink"""
+    outer = _deadline.get()
+    expires_at = time.monotonic() + seconds
+    token = _deadline.set(min(expires_at, outer) if outer is not None else expires_at)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_budget():
+    """Seconds left in the innermost deadline, or None when there is no deadline"""
+    expires_at = _deadline.get()
+    if expires_at is None:
+        return None
+    return expires_at - time.monotonic()
+
+
+def check_deadline(what="call"):
+    remaining = remaining_budget()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded(f"deadline exceeded before {what}")
+    return remaining
+
+
+def bounded_timeout(timeout):
+    """The smaller of `timeout` and the time left in the current deadline"""
+    remaining = check_deadline()
+    return timeout if remaining is None else max(0.1, min(timeout, remaining))
+
+
+def submit_with_context(executor, fn, *args):
+    """executor.submit that carries the caller's deadline (and other context vars) into the worker"""
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+### CIRCUIT BREAKERS ###
+class CircuitBreaker:
+    """
+    Stop calling a host after `failure_threshold` consecutive failures.
+
+    After `reset_timeout` seconds one trial call is let through (half-open); its
+    result closes the breaker again or re-opens it for another period.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=60):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout or self.trial_in_flight:
+                return False
+            self.trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def release_trial(self):
+        """End a trial call that neither succeeded nor failed, so the next call can try again"""
+        with self.lock:
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.failures >= self.failure_threshold and self.opened_at is None:
+                print(f"Circuit opened for {self.name} after {self.failures} consecutive failures")
+                tracer.record("resilience.circuit_open", 0.0, host=self.name)
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def host_of(url):
+    return urlparse(url).hostname or url
+
+
+def get_breaker(host):
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(host)
+        return _breakers[host]
+
+
+def get_policy(host):
+    return dict(DEFAULT_POLICY, **HOST_POLICIES.get(host, {}))
+
+
+@contextmanager
+def guarded(host, what=None):
+    """Fail fast when the host's breaker is open or the deadline has passed; record the outcome"""
+    breaker = get_breaker(host)
+    check_deadline(what or host)
+    if not breaker.allow():
+        raise CircuitOpenError(f"circuit open for {host}")
+    recorded = False
+    try:
+        yield
+    except DeadlineExceeded:
+        # Our own budget ran out; the host did nothing wrong
+        raise
+    except Exception:
+        breaker.record_failure()
+        recorded = True
+        raise
+    else:
+        breaker.record_success()
+        recorded = True
+    finally:
+        if not recorded:
+            # Deadline or BaseException: no verdict on the host, but a half-open trial must not stay claimed
+            breaker.release_trial()
+
+
+### RETRIES ###
+def backoff_delay(attempt, base_delay=0.5, max_delay=8.0):
+    """Full-range jitter around exponential backoff: attempt 0 -> ~0.5s, 1 -> ~1s, ..."""
+    return min(max_delay, base_delay * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+
+def call_with_retries(fn, host, retries=2, retry_on=(requests.RequestException,), before_attempt=None):
+    """
+    Call fn() up to retries + 1 times with jittered exponential backoff.
+
+    Every attempt goes through the host's circuit breaker and the current
+    deadline; a backoff that would overrun the deadline is not slept.
+    """
+    attempt = 0
+    while True:
+        if before_attempt:
+            before_attempt()
+        try:
+            with guarded(host):
+                return fn()
+        except retry_on as e:
+            if attempt >= retries or get_breaker(host).opened_at is not None:
+                raise
+            delay = backoff_delay(attempt)
+            remaining = remaining_budget()
+            if remaining is not None and delay >= remaining:
+                raise DeadlineExceeded(f"no budget left to retry {host}: {e}") from e
+            print(f"Retrying {host} in {delay:.1f}s ({attempt + 1}/{retries}): {e}")
+            tracer.record("resilience.retry", delay, host=host, retries=1)
+            time.sleep(delay)
+            attempt += 1
+
+
+class RetryableStatus(requests.HTTPError):
+    pass
+
+
+_hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hedge")
+
+_host_slots = {}
+_host_slots_lock = threading.Lock()
+
+
+def get_host_slots(host, max_in_flight):
+    """Shared semaphore bounding the requests open to the host, or None when unbounded"""
+    if max_in_flight is None:
+        return None
+    with _host_slots_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(max_in_flight)
+        return _host_slots[host]
+
+
+def _get_once(session, url, timeout, hedge_after, max_in_flight=None, **kwargs):
+    slots = get_host_slots(host_of(url), max_in_flight)
+
+    def send():
+        try:
+            resp = session.get(url, timeout=bounded_timeout(timeout), **kwargs)
+        finally:
+            if slots is not None:
+                slots.release()
+        if resp.status_code in RETRY_STATUSES:
+            raise RetryableStatus(f"{resp.status_code} from {url}", response=resp)
+        return resp
+
+    if slots is not None and not slots.acquire(timeout=check_deadline(url)):
+        raise DeadlineExceeded(f"deadline exceeded waiting for a request slot for {url}")
+
+    if hedge_after is None:
+        return send()
+
+    # Hedge: if the first request is still pending after hedge_after seconds,
+    # send a duplicate (when the host has a free slot) and take whichever answers first.
+    futures = [submit_with_context(_hedge_executor, send)]
+    done, _ = wait(futures, timeout=hedge_after)
+    if not done and (slots is None or slots.acquire(blocking=False)):
+        tracer.record("resilience.hedge", 0.0, host=host_of(url))
+        futures.append(submit_with_context(_hedge_executor, send))
+    error = None
+    pending = set(futures)
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+    raise error
+
+
+def resilient_get(session, url, before_attempt=None, **kwargs):
+    """
+    GET with the host's policy: bounded per-attempt timeout, retries with
+    jittered backoff on connection errors and 429/5xx, circuit breaking and
+    optional hedging. Other 4xx responses are returned to the caller as is.
+    """
+    host = host_of(url)
+    policy = get_policy(host)
+    return call_with_retries(
+        lambda: _get_once(session, url, policy["timeout"], policy["hedge_after"], policy["max_in_flight"], **kwargs),
+        host,
+        retries=policy["retries"],
+        before_attempt=before_attempt,
+    )
@@ -0,0 +1,71 @@
+import re
+
+from config import FBREF_TEAMS, FOTMOB_LEAGUES, FOTMOB_TEAMS, FPL_TEAMS, TEAMS
+from scrappers.fotmob import fot_mob_crawler
+
+
+def normalize_team_name(name):
+    name = re.sub(r"[^\w\s]", " ", (name or "").lower())
+    words = ["united" if w == "utd" else w for w in name.split() if w not in ("fc", "afc")]
+    return " ".join(words)
+
+
+class TeamRegistry:
+    """
+    Every configured team with its per-source ids, indexed once from teams.yml.
+
+    Lookups by canonical name, by any known spelling and by FotMob id are
+    dict hits, so callers never scan the per-source team lists.
+    """
+
+    def __init__(self, teams=TEAMS, fotmob_teams=FOTMOB_TEAMS, fpl_teams=FPL_TEAMS, fbref_teams=FBREF_TEAMS, leagues=FOTMOB_LEAGUES):
+        self.leagues = {league["id"]: league for league in leagues}
+        self.teams = {team["name"]: {"name": team["name"]} for team in teams}
+        self.by_fotmob_id = {}
+        self.aliases = {}
+
+        for team in fotmob_teams:
+            entry = self.teams.setdefault(team["name"], {"name": team["name"]})
+            entry["fotmob_id"] = team["id"]
+            entry["league_id"] = team.get("league_id")
+            self.by_fotmob_id[team["id"]] = entry
+        for team in fpl_teams:
+            self.teams.setdefault(team["name"], {"name": team["name"]})["fpl_short_name"] = team["short_name"]
+        for team in fbref_teams:
+            self.teams.setdefault(team["name"], {"name": team["name"]})["fbref_id"] = team["id"]
+
+        # Every known spelling of a team -> its canonical (setting.yml) name
+        for source_teams, keys in ((fpl_teams, ("name", "short_name")), (fbref_teams, ("name",)), (fotmob_teams, ("name",))):
+            for team in source_teams:
+                for key in keys:
+                    self.aliases[normalize_team_name(team[key])] = team["name"]
+        for name in list(self.teams):
+            self.aliases.setdefault(normalize_team_name(name), name)
+            self.aliases.setdefault(normalize_team_name(fot_mob_crawler._transform_team_name(name)), name)
+
+    def get(self, team_name):
+        """Registry entry for a canonical name or any known spelling, or None"""
+        entry = self.teams.get(team_name)
+        if entry is None:
+            entry = self.teams.get(self.aliases.get(normalize_team_name(team_name)))
+        return entry
+
+    def canonical_name(self, team_name):
+        """Canonical name for a known spelling; unknown teams keep their own (normalized) name"""
+        normalized = normalize_team_name(team_name)
+        return self.aliases.get(normalized, normalized)
+
+    def get_by_fotmob_id(self, fotmob_id):
+        return self.by_fotmob_id.get(fotmob_id)
+
+    def league_ids(self, team_names):
+        """FotMob leagues the given teams play in, in first-seen order"""
+        league_ids = []
+        for team_name in team_names:
+            entry = self.get(team_name) or {}
+            if entry.get("league_id") is not None and entry["league_id"] not in league_ids:
+                league_ids.append(entry["league_id"])
+        return league_ids
+
+
+team_registry = TeamRegistry()
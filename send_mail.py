@@ -1,26 +1,31 @@
-import os
 from datetime import datetime, timezone, timedelta
 
-from config import TEAMS
+from metrics import tracer
+from email_sender.digest import DigestBuilder
 from email_sender.smtp_sender import smtp_sender
 from google_sheet_parser import google_sheet_parser
 
 
-def get_newsletter(today, team_name: str) -> str | None:
-
-    team_name_normalized = team_name.replace(" ", "_")
-
-    newsletter_data = ""
-    newsletter_path = f"datas/newsletter/{today}/newsletter_{team_name_normalized}.md"
-
-    if not os.path.exists(newsletter_path):
-        return ""
-
-    if os.path.exists(newsletter_path):
-        with open(newsletter_path, "r") as f:
-            newsletter_data += f.read() + "\n"
-
-    return newsletter_data
+def send_digest(digest: dict, subscribers, sent=None, on_sent=None):
+    """
+    Send the digest to every subscriber not already in sent.
+    sent is appended to as each email goes out, so callers still know who
+    received it when a later send raises; on_sent(sent) is called after each
+    send so they can persist progress as it happens.
+    """
+    label = " + ".join(digest["teams"])
+    sent = [] if sent is None else sent
+    already_sent = set(sent)
+    for email in subscribers:
+        if email in already_sent:
+            continue
+        smtp_sender.send_email(email, digest["subject"], digest["markdown"], html_body=digest["html"])
+        sent.append(email)
+        already_sent.add(email)
+        print(f"[{label}] Sent to {email}")
+        if on_sent is not None:
+            on_sent(sent)
+    return sent
 
 
 if __name__ == "__main__":
@@ -29,20 +34,24 @@ if __name__ == "__main__":
     start_date = today - timedelta(days=7)
     today_str = today.strftime('%Y%m%d')
     start_date_str = start_date.strftime('%Y%m%d')
-
-    for team in TEAMS:
-        team_name = team["name"]
-
-        newsletter = get_newsletter(today_str, team_name)
-
-        subscribers = google_sheet_parser.get_team_subscribers(team_name)
-        if not subscribers:
-            print(f"[{team_name}] No subscribers found, skipping.")
-            continue
-
-        subject = f"[FootballNews] {team_name} 주간 뉴스레터 ({start_date_str}~{today_str})"
-        for email in subscribers:
-            smtp_sender.send_email(email, subject, newsletter)
-            print(f"[{team_name}] Sent to {email}")
-
-        print(f"[{team_name}] Done — {len(subscribers)} subscriber(s) notified.")
+    tracer.start_run("send_mail")
+
+    try:
+        with tracer.span("mail.get_subscribers") as span:
+            subscriptions = google_sheet_parser.get_subscriptions()
+            span.set(subscribers=len(subscriptions))
+
+        # 같은 팀 조합을 구독하는 사람끼리 묶어 조합마다 한 번만 조립
+        builder = DigestBuilder(today_str, start_date_str)
+        for teams, subscribers in builder.group_subscribers(subscriptions).items():
+            label = " + ".join(teams)
+            with tracer.span("mail.build_digest", teams=label):
+                digest = builder.build(teams)
+            if not digest:
+                print(f"[{label}] No newsletter found, skipping.")
+                continue
+
+            send_digest(digest, subscribers)
+            print(f"[{label}] Done — {len(subscribers)} subscriber(s) notified.")
+    finally:
+        tracer.write()
@@ -0,0 +1,131 @@
+"""
+Split collection across runners and check that the shards add up.
+
+Teams are assigned to shards greedily by expected cost, longest first, using
+per-team durations from earlier runs (datas/collect_shards/team_costs.json).
+Any runner that sees the same TEAMS and cost file gets the same partition.
+Each shard writes a manifest. The merge step checks that every team was
+collected exactly once, folds the shards' RSS state back together and
+updates the cost file for the next run.
+"""
+import json
+import os
+import statistics
+
+from config import TEAMS
+
+SHARDS_DIR = "datas/collect_shards"
+TEAM_COSTS_PATH = f"{SHARDS_DIR}/team_costs.json"
+DEFAULT_TEAM_COST = 60.0  # seconds; roughly one FotMob team page plus a match page
+MIN_TEAM_COST = 1.0  # a team that was all cache hits last time still costs something
+COST_SMOOTHING = 0.5  # weight of the latest observation in the stored cost
+
+
+def parse_shard(value: str):
+    """'2/4' -> (2, 4); shards are numbered from 1"""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{value}', expected i/N (e.g. 1/3)")
+    if not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{value}', i must be between 1 and N")
+    return index, count
+
+
+def shard_label(index: int, count: int) -> str:
+    return f"{index}-of-{count}"
+
+
+def load_team_costs(path=TEAM_COSTS_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def partition_teams(teams, count: int, costs=None):
+    """
+    Split teams into count shards with roughly equal expected cost.
+
+    Returns:
+        list of team lists, one per shard (index 0 is shard 1)
+    """
+    names = {team["name"] for team in teams}
+    known = {name: max(cost, MIN_TEAM_COST) for name, cost in (costs or {}).items() if name in names}
+    default_cost = statistics.median(known.values()) if known else DEFAULT_TEAM_COST
+    team_cost = {name: known.get(name, default_cost) for name in names}
+
+    shards = [[] for _ in range(count)]
+    loads = [0.0] * count
+    for team in sorted(teams, key=lambda team: (-team_cost[team["name"]], team["name"])):
+        target = min(range(count), key=lambda i: (loads[i], len(shards[i]), i))
+        shards[target].append(team)
+        loads[target] += team_cost[team["name"]]
+    # Keep setting.yml order inside each shard
+    order = {team["name"]: i for i, team in enumerate(teams)}
+    return [sorted(shard, key=lambda team: order[team["name"]]) for shard in shards]
+
+
+def manifest_path(date_str: str, index: int, count: int) -> str:
+    return f"{SHARDS_DIR}/{date_str}/shard_{shard_label(index, count)}.json"
+
+
+def write_manifest(date_str: str, index: int, count: int, results: dict):
+    """results: team name -> {"status", "duration_s", "outputs"}"""
+    path = manifest_path(date_str, index, count)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"date": date_str, "shard": index, "of": count, "teams": results}, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def check_shards(date_str: str, count: int, teams=TEAMS):
+    """
+    Verify that all count shard manifests exist and every team was collected
+    exactly once with all of its outputs present.
+
+    Returns:
+        (manifests, problems): loaded manifests and a list of problem descriptions
+    """
+    manifests = []
+    problems = []
+    for index in range(1, count + 1):
+        path = manifest_path(date_str, index, count)
+        if not os.path.exists(path):
+            problems.append(f"shard {index}/{count}: manifest missing ({path})")
+            continue
+        with open(path, "r") as f:
+            manifests.append(json.load(f))
+
+    seen = {}
+    for manifest in manifests:
+        for team_name, result in manifest["teams"].items():
+            if team_name in seen:
+                problems.append(f"{team_name}: collected by shards {seen[team_name]} and {manifest['shard']}")
+                continue
+            seen[team_name] = manifest["shard"]
+            if result.get("status") != "done":
+                problems.append(f"{team_name}: shard {manifest['shard']} reported {result.get('status')}")
+            missing = [path for path in result.get("outputs", []) if not os.path.exists(path)]
+            if missing:
+                problems.append(f"{team_name}: missing outputs {', '.join(missing)}")
+
+    for team in teams:
+        if team["name"] not in seen and len(manifests) == count:
+            problems.append(f"{team['name']}: not assigned to any shard")
+    return manifests, problems
+
+
+def update_team_costs(manifests, path=TEAM_COSTS_PATH):
+    costs = load_team_costs(path)
+    for manifest in manifests:
+        for team_name, result in manifest["teams"].items():
+            if result.get("status") != "done" or result.get("duration_s") is None:
+                continue
+            observed = result["duration_s"]
+            previous = costs.get(team_name, observed)
+            costs[team_name] = round(COST_SMOOTHING * observed + (1 - COST_SMOOTHING) * previous, 1)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(costs, f, indent=2, ensure_ascii=False, sort_keys=True)
+    return costs
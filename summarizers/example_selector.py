@@ -0,0 +1,110 @@
+"""
+Pick the few-shot examples closest to a week's input, within a token budget.
+
+Each example's features and token count are computed once, when the selector
+is built. A week's input is reduced to the same small feature tuple (match
+count, home/away, events, transfers, rumours), and the selection for each
+distinct tuple is cached. A call costs a few regex scans and a dict hit, so
+prompt size stays flat as example.yml grows.
+"""
+import re
+
+from langchain_core.example_selectors import BaseExampleSelector
+
+from summarizers.prompt_profiler import count_tokens
+
+MATCH_RE = re.compile(r"^(?:## 🏟️ )?Match:", re.MULTILINE)
+VENUE_RE = re.compile(r"Venue:\**\s*(Home|Away)")
+EVENT_RE = re.compile(r"Goal|Card|Substitution|Key Events|Match Events")
+NONE_THIS_WEEK = "(none this week)"
+
+
+def _bucket(count, edges):
+    """Index of the first edge count is below, so 0 / few / many compare as small ints"""
+    for i, edge in enumerate(edges):
+        if count < edge:
+            return i
+    return len(edges)
+
+
+def _block(text, heading):
+    """Body of a '### heading' block in the combined transfers/news input"""
+    match = re.search(rf"^### {re.escape(heading)}\n(.*?)(?=^### |\Z)", text, re.MULTILINE | re.DOTALL)
+    return match.group(1).strip() if match else ""
+
+
+def _bullets(text):
+    return sum(1 for line in text.splitlines() if line.lstrip().startswith("- "))
+
+
+def matches_features(text: str) -> tuple:
+    venues = set(VENUE_RE.findall(text))
+    return (
+        _bucket(len(MATCH_RE.findall(text)), (1, 2, 3)),
+        int("Home" in venues),
+        int("Away" in venues),
+        int(bool(EVENT_RE.search(text))),
+    )
+
+
+def transfers_and_news_features(text: str) -> tuple:
+    transfers = _block(text, "Official Transfers")
+    news = _block(text, "News & Rumors")
+    return (
+        int(bool(transfers) and transfers != NONE_THIS_WEEK),
+        _bucket(0 if news == NONE_THIS_WEEK else _bullets(news), (1, 4, 8)),
+    )
+
+
+FEATURES = {
+    "matches_report": matches_features,
+    "transfers_and_news_report": transfers_and_news_features,
+}
+
+
+class FeatureExampleSelector(BaseExampleSelector):
+    """
+    Up to k examples, nearest first by feature distance, whose rendered
+    tokens fit in token_budget. Selected examples keep their example.yml order.
+    """
+
+    def __init__(self, examples, features, example_template, k=2, token_budget=None, model="gpt-5-mini"):
+        self.features = features
+        self.example_template = example_template
+        self.k = k
+        self.token_budget = token_budget
+        self.model = model
+        self.examples = []
+        self._example_features = []
+        self._example_tokens = []
+        self._cache = {}
+        for example in examples:
+            self.add_example(example)
+
+    def add_example(self, example):
+        self.examples.append(example)
+        self._example_features.append(self.features(example["input"]))
+        self._example_tokens.append(count_tokens(self.example_template.format(**example), self.model)[0])
+        self._cache.clear()
+
+    def _select_indices(self, key):
+        ranked = sorted(
+            range(len(self.examples)),
+            key=lambda i: (sum(abs(a - b) for a, b in zip(key, self._example_features[i])), self._example_tokens[i], i),
+        )
+        chosen = []
+        used = 0
+        for i in ranked:
+            if len(chosen) >= self.k:
+                break
+            if self.token_budget is not None and used + self._example_tokens[i] > self.token_budget:
+                continue
+            chosen.append(i)
+            used += self._example_tokens[i]
+        return sorted(chosen)
+
+    def select_examples(self, input_variables):
+        key = self.features(input_variables["input"])
+        if key not in self._cache:
+            self._cache[key] = [self.examples[i] for i in self._select_indices(key)]
+        return self._cache[key]
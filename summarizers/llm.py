@@ -1,11 +1,102 @@
+import time
+
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import FewShotPromptTemplate, PromptTemplate
 
-from config import API_KEY, PROMPT, MODEL, EXAMPLE
+from config import API_KEY, PROMPT, MODEL, MODEL_ROUTING, EXAMPLE, FEW_SHOT, URL
+from metrics import tracer
+from summarizers.example_selector import FEATURES, FeatureExampleSelector
+from summarizers.prompt_profiler import format_profile, profile_prompt, usage_cost
+
+REPORT_SECTIONS = ("matches_report", "transfers_and_news_report")
+EXAMPLE_TEMPLATE = "Input:\n{input}\n\nOutput:\n{output}\n"
+PROMPT_SUFFIX = "Input:\n{input}\n\nOutput:\n"
 
 class LLMSummarizer:
-    def __init__(self):
-        self.llm = ChatOpenAI(model=MODEL, temperature=0, api_key=API_KEY["OPENAI"])
+    def __init__(self, model=MODEL, routing=MODEL_ROUTING, few_shot=FEW_SHOT):
+        self.model = model
+        self.rules = routing.get("rules") or []
+        self.fallback_model = routing.get("fallback_model")
+        self.timeout = routing.get("timeout")
+        self._llms = {}
+        self.llm = self.get_llm(model)
+
+        # Example features and token counts are computed here once; selections are cached per input shape
+        example_prompt = PromptTemplate(input_variables=["input", "output"], template=EXAMPLE_TEMPLATE)
+        self.example_selectors = {
+            section: FeatureExampleSelector(
+                EXAMPLE[section],
+                FEATURES[section],
+                example_prompt,
+                k=few_shot.get("k", 2),
+                token_budget=few_shot.get("token_budget"),
+                model=model,
+            )
+            for section in REPORT_SECTIONS
+        }
+
+
+    def get_llm(self, model: str) -> ChatOpenAI:
+        if model not in self._llms:
+            # Retries are left to the fallback model so a slow call is not paid for twice
+            self._llms[model] = ChatOpenAI(
+                model=model,
+                temperature=0,
+                api_key=API_KEY["OPENAI"],
+                base_url=URL.get("OPENAI"),
+                timeout=self.timeout,
+                max_retries=0 if self.fallback_model else 2,
+            )
+        return self._llms[model]
+
+
+    def select_model(self, section: str, input_chars: int) -> str:
+        """Model for the section, from the first matching model_routing rule in setting.yml"""
+        for rule in self.rules:
+            sections = rule.get("section")
+            if sections and section not in ([sections] if isinstance(sections, str) else sections):
+                continue
+            if "max_input_chars" in rule and input_chars > rule["max_input_chars"]:
+                continue
+            if "min_input_chars" in rule and input_chars < rule["min_input_chars"]:
+                continue
+            return rule["model"]
+        return self.model
+
+
+    def invoke(self, section: str, prompt: str, input_text: str):
+        """Call the routed model, falling back to fallback_model on an error or timeout"""
+        input_chars = len(input_text)
+        models = [self.select_model(section, input_chars)]
+        if self.fallback_model and self.fallback_model not in models:
+            models.append(self.fallback_model)
+
+        # Tokenize the prompt's parts before sending, so prompt growth shows up in every run's trace
+        profile = profile_prompt(section, self.prompt_components(section, input_text), models[0])
+        print(f"[llm] {format_profile(profile)}")
+        for name, count, limit in profile["over_limit"]:
+            print(f"[llm] Warning: {section} {name} is {count} tokens, over its limit of {limit} (prompt_token_limits in setting.yml)")
+        prompt_tokens = {f"prompt_{name}_tokens": count for name, count in profile["tokens"].items()}
+
+        for attempt, model in enumerate(models):
+            started = time.perf_counter()
+            try:
+                with tracer.span(f"llm.{section}", model=model, prompt_chars=len(prompt), input_chars=input_chars, retries=attempt, **prompt_tokens) as span:
+                    response = self.get_llm(model).invoke(prompt)
+                    usage = getattr(response, "usage_metadata", None) or {}
+                    if usage:
+                        span.set(
+                            input_tokens=usage.get("input_tokens"),
+                            output_tokens=usage.get("output_tokens"),
+                            cost_usd=usage_cost(usage.get("input_tokens", 0), usage.get("output_tokens", 0), model),
+                        )
+            except Exception as e:
+                print(f"[llm] {section}: {model} failed after {time.perf_counter() - started:.1f}s: {type(e).__name__}: {e}")
+                if attempt == len(models) - 1:
+                    raise
+                continue
+            print(f"[llm] {section}: served by {model} in {time.perf_counter() - started:.1f}s ({input_chars} input chars)")
+            return response
 
 
     def generate_prompt(self, prompt_name: str, data: str = None) -> str:
@@ -18,23 +109,47 @@ class LLMSummarizer:
         return prompt
 
 
-    def generate_example(self, example_name: str) -> dict:
-        example = EXAMPLE[example_name]
-        return example
+    def prompt_components(self, section: str, input_text: str) -> dict:
+        """The parts of a report prompt, in the order build_*_prompt joins them"""
+        example_prompt = PromptTemplate(input_variables=["input", "output"], template=EXAMPLE_TEMPLATE)
+        return {
+            "system_prompt": self.generate_prompt("system_prompt"),
+            "instructions": self.generate_prompt(section),
+            "examples": "\n\n".join(example_prompt.format(**example) for example in self.generate_example(section, input_text)),
+            "input": PROMPT_SUFFIX.format(input=input_text),
+        }
 
 
-    def generate_matches_report(self, matches_data: str) -> str:
-        if not matches_data:
-            return None
+    def section_input(self, section: str, matches_data: str, transfers_data: str, news_rss_data: str) -> str:
+        """The weekly data a report section is given as its input"""
+        if section == "matches_report":
+            return matches_data
+        combined_blocks = []
+        combined_blocks.append("### Official Transfers")
+        combined_blocks.append(transfers_data if transfers_data else "(none this week)")
+        combined_blocks.append("")
+        combined_blocks.append("### News & Rumors")
+        combined_blocks.append(news_rss_data if news_rss_data else "(none this week)")
+        return "\n".join(combined_blocks)
+
+
+    def generate_example(self, example_name: str, input_text: str = None) -> list:
+        """Every example for the report, or only those selected for input_text"""
+        if input_text is None:
+            return EXAMPLE[example_name]
+        return self.example_selectors[example_name].select_examples({"input": input_text})
+
+
+    def build_matches_prompt(self, matches_data: str) -> str:
         system_prompt = self.generate_prompt("system_prompt")
         
-        # Few-shot 예제 정의
-        examples = self.generate_example("matches_report")
+        # Few-shot 예제 선택기 (입력과 가장 비슷한 예제를 토큰 예산 안에서 선택)
+        example_selector = self.example_selectors["matches_report"]
         
         # 예제 포맷터 생성
         example_prompt = PromptTemplate(
             input_variables=["input", "output"],
-            template="Input:\n{input}\n\nOutput:\n{output}\n"
+            template=EXAMPLE_TEMPLATE
         )
         
         # matches_report 프롬프트에서 Input Data 부분 제외하고 prefix 생성
@@ -42,51 +157,60 @@ class LLMSummarizer:
         
         # FewShotPromptTemplate 생성
         few_shot_prompt = FewShotPromptTemplate(
-            examples=examples,
+            example_selector=example_selector,
             example_prompt=example_prompt,
             prefix=matches_prompt_template,
-            suffix="Input:\n{input}\n\nOutput:\n",
+            suffix=PROMPT_SUFFIX,
             input_variables=["input"]
         )
         
         # 최종 프롬프트 생성
         prompt = few_shot_prompt.format(input=matches_data)
 
-        return self.llm.invoke(system_prompt + prompt)
+        return system_prompt + prompt
 
 
-    def generate_transfers_and_news_report(self, transfers_data: str, news_rss_data: str) -> str:
-        if not transfers_data and not news_rss_data:
+    def generate_matches_report(self, matches_data: str) -> str:
+        if not matches_data:
             return None
+        prompt = self.build_matches_prompt(matches_data)
+        return self.invoke("matches_report", prompt, matches_data)
+
+
+    def build_transfers_and_news_prompt(self, transfers_data: str, news_rss_data: str) -> str:
         system_prompt = self.generate_prompt("system_prompt")
 
-        example = self.generate_example("transfers_and_news_report")
+        example_selector = self.example_selectors["transfers_and_news_report"]
 
         example_prompt = PromptTemplate(
             input_variables=["input", "output"],
-            template="Input:\n{input}\n\nOutput:\n{output}\n"
+            template=EXAMPLE_TEMPLATE
         )
 
         prompt_template = self.generate_prompt("transfers_and_news_report")
 
         few_shot_prompt = FewShotPromptTemplate(
-            examples=example,
+            example_selector=example_selector,
             example_prompt=example_prompt,
             prefix=prompt_template,
-            suffix="Input:\n{input}\n\nOutput:\n",
+            suffix=PROMPT_SUFFIX,
             input_variables=["input"]
         )
 
-        combined_blocks = []
-        combined_blocks.append("### Official Transfers")
-        combined_blocks.append(transfers_data if transfers_data else "(none this week)")
-        combined_blocks.append("")
-        combined_blocks.append("### News & Rumors")
-        combined_blocks.append(news_rss_data if news_rss_data else "(none this week)")
-        combined_data = "\n".join(combined_blocks)
+        combined_data = self.section_input("transfers_and_news_report", None, transfers_data, news_rss_data)
 
         prompt = few_shot_prompt.format(input=combined_data)
-        return self.llm.invoke(system_prompt + prompt)
+        return system_prompt + prompt
+
+
+    def generate_transfers_and_news_report(self, transfers_data: str, news_rss_data: str) -> str:
+        if not transfers_data and not news_rss_data:
+            return None
+        prompt = self.build_transfers_and_news_prompt(transfers_data, news_rss_data)
+        return self.invoke(
+            "transfers_and_news_report", prompt, self.section_input("transfers_and_news_report", None, transfers_data, news_rss_data)
+        )
+
 
     def generate_newsletter(self, matches_data: str, transfers_data: str, news_rss_data: str) -> str:
         matches_report = self.generate_matches_report(matches_data)
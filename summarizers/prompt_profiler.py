@@ -0,0 +1,178 @@
+"""
+Count the tokens each newsletter prompt spends per component.
+
+Every report prompt is split into the system_prompt, the section's
+instructions from prompt.yml, its few-shot examples from example.yml and
+the week's input. Each part is tokenized offline with tiktoken. A part past
+its limit in setting.yml (prompt_token_limits) is flagged, and an input cost
+is estimated from model_prices.
+
+tiktoken downloads an encoding file on first use. This command loads it, but
+the token counts LLMSummarizer logs before each call and the few-shot budget
+only do when PROMPT_TOKENS_EXACT=1 is set, so a newsletter run never waits on
+that download. Otherwise, or when tiktoken is unavailable, counts fall back
+to an estimate of one token per 4 UTF-8 bytes and are marked approximate.
+
+    python -m summarizers.prompt_profiler                  # every team, last 7 days of data
+    python -m summarizers.prompt_profiler --teams Arsenal
+    python -m summarizers.prompt_profiler --check          # exit 1 when a component is over its limit
+"""
+from datetime import datetime, timedelta, timezone
+import argparse
+import os
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+from config import MODEL_PRICES, PROMPT_TOKEN_LIMITS
+
+COMPONENTS = ("system_prompt", "instructions", "examples", "input")
+DEFAULT_ENCODING = "o200k_base"
+# Load tiktoken encodings (a network download on first use) outside this command too
+EXACT_COUNTS = os.environ.get("PROMPT_TOKENS_EXACT", "0") != "0"
+
+_encodings = {}
+
+
+def get_encoding(model: str):
+    """tiktoken encoding for the model, or None when it is not loaded and loading is not allowed or fails"""
+    if tiktoken is None:
+        return None
+    try:
+        name = tiktoken.encoding_name_for_model(model)
+    except KeyError:
+        name = DEFAULT_ENCODING
+    if name not in _encodings:
+        if not EXACT_COUNTS:
+            return None
+        try:
+            _encodings[name] = tiktoken.get_encoding(name)
+        except Exception as e:
+            print(f"[prompt] tiktoken encoding {name} unavailable, estimating token counts: {e}")
+            _encodings[name] = None
+    return _encodings[name]
+
+
+def count_tokens(text: str, model: str):
+    """(token count, exact) for text under the model's tokenizer"""
+    encoding = get_encoding(model)
+    if encoding is None:
+        return (len(text.encode("utf-8")) + 3) // 4, False
+    return len(encoding.encode(text, disallowed_special=())), True
+
+
+def input_cost(tokens: int, model: str):
+    """Estimated USD for tokens prompt tokens, or None when the model has no price in setting.yml"""
+    price = MODEL_PRICES.get(model)
+    if not price:
+        return None
+    return tokens * price["input"] / 1_000_000
+
+
+def usage_cost(input_tokens: int, output_tokens: int, model: str):
+    price = MODEL_PRICES.get(model)
+    if not price:
+        return None
+    return (input_tokens * price["input"] + output_tokens * price.get("output", 0)) / 1_000_000
+
+
+def profile_prompt(section: str, components: dict, model: str) -> dict:
+    """
+    Args:
+        components: component name -> text, as LLMSummarizer.prompt_components returns
+
+    Returns:
+        {"section", "model", "tokens": {component: count}, "total", "exact",
+         "cost_usd", "over_limit": [(component, count, limit)]}
+    """
+    tokens = {}
+    exact = True
+    for name, text in components.items():
+        tokens[name], exact_count = count_tokens(text, model)
+        exact = exact and exact_count
+    total = sum(tokens.values())
+    over_limit = [
+        (name, count, PROMPT_TOKEN_LIMITS[name])
+        for name, count in tokens.items()
+        if name in PROMPT_TOKEN_LIMITS and count > PROMPT_TOKEN_LIMITS[name]
+    ]
+    return {
+        "section": section,
+        "model": model,
+        "tokens": tokens,
+        "total": total,
+        "exact": exact,
+        "cost_usd": input_cost(total, model),
+        "over_limit": over_limit,
+    }
+
+
+def format_profile(profile: dict) -> str:
+    parts = ", ".join(f"{name} {count}" for name, count in profile["tokens"].items())
+    cost = f", ~${profile['cost_usd']:.5f}" if profile["cost_usd"] is not None else ""
+    approx = "" if profile["exact"] else "~"
+    return f"{profile['section']} on {profile['model']}: {approx}{profile['total']} tokens ({parts}){cost}"
+
+
+def main():
+    global EXACT_COUNTS
+    from generate_newsletter import load_weekly_data
+    from summarizers.llm import REPORT_SECTIONS, llmSummarizer
+    from config import TEAMS
+
+    EXACT_COUNTS = True
+
+    parser = argparse.ArgumentParser(description="Profile newsletter prompt tokens per section and team")
+    parser.add_argument("--teams", type=str, help="Comma-separated team names (default: every team in setting.yml)")
+    parser.add_argument("--days", type=int, default=7, help="Days of collected data to use as input (default: 7)")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 when a component is over its limit")
+    args = parser.parse_args()
+
+    teams = [team["name"] for team in TEAMS]
+    if args.teams:
+        teams = [name.strip() for name in args.teams.split(",")]
+
+    end_date = datetime.now(timezone.utc)
+    start_date = end_date - timedelta(days=args.days)
+
+    totals = {}
+    flagged = []
+    exact = True
+    print(f"{'team':<22} {'section':<26} {'model':<14} " + " ".join(f"{name:>13}" for name in COMPONENTS) + f" {'total':>8} {'cost $':>9}")
+    for team_name in teams:
+        matches_data, transfers_data, news_rss_data = load_weekly_data(team_name, start_date, end_date)
+        for section in REPORT_SECTIONS:
+            input_text = llmSummarizer.section_input(section, matches_data, transfers_data, news_rss_data)
+            model = llmSummarizer.select_model(section, len(input_text))
+            profile = profile_prompt(section, llmSummarizer.prompt_components(section, input_text), model)
+            cost = f"{profile['cost_usd']:.5f}" if profile["cost_usd"] is not None else "-"
+            print(
+                f"{team_name:<22} {section:<26} {model:<14} "
+                + " ".join(f"{profile['tokens'][name]:>13}" for name in COMPONENTS)
+                + f" {profile['total']:>8} {cost:>9}"
+            )
+            entry = totals.setdefault(section, {"calls": 0, "tokens": 0, "cost_usd": 0.0})
+            entry["calls"] += 1
+            entry["tokens"] += profile["total"]
+            entry["cost_usd"] += profile["cost_usd"] or 0.0
+            flagged.extend((team_name, section, *over) for over in profile["over_limit"])
+            exact = exact and profile["exact"]
+
+    print()
+    for section, entry in totals.items():
+        print(f"{section}: {entry['calls']} call(s), {entry['tokens']} prompt tokens, ~${entry['cost_usd']:.4f} input cost")
+    if not exact:
+        print("Token counts are estimates (tiktoken encoding unavailable).")
+
+    if flagged:
+        print("\nOver limit (prompt_token_limits in setting.yml):")
+        for team_name, section, name, count, limit in flagged:
+            print(f"  {team_name} {section}: {name} {count} > {limit}")
+        if args.check:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Collect each match as soon as it finishes instead of waiting for the daily run.
+
+The watcher reads every team's fixtures from its FotMob team page and sleeps
+until the expected full time of the next match (kickoff + 110 minutes). From
+then on it checks only that match's status, starting every 3 minutes and
+backing off to every 15. Once FotMob marks the match finished, the match page
+is analysed once. The match report is then written where the daily
+collect_news.py run would put it (datas/fotmob/<day after the match>/), and
+that day's bundle is rebuilt. Transfer and RSS reports are left to the daily
+run. A match between two subscribed teams is checked and analysed only once.
+
+Team pages are re-read every 6 hours to pick up new or rescheduled fixtures.
+A match that is still unfinished 5 hours after kickoff is left to the daily
+run. Collected matches are recorded in datas/watch/state.json, so a restarted
+watcher does not collect them again.
+
+    python watch.py                          # every team in setting.yml, until stopped
+    python watch.py --teams Arsenal,Chelsea
+    python watch.py --hours 48               # stop after 48 hours
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import argparse
+import json
+import os
+import time
+
+from backfill import output_date
+from bundles import write_bundle
+from collect_news import write_fotmob_reports
+from config import TEAMS
+from metrics import tracer
+from scrappers.fotmob import fot_mob_crawler
+from scrappers.records import Match
+from scrappers.team_registry import team_registry
+
+STATE_PATH = "datas/watch/state.json"
+# 90 minutes, half-time and stoppage time
+FULL_TIME_AFTER = timedelta(minutes=110)
+POLL_INTERVAL = timedelta(minutes=3)
+MAX_POLL_INTERVAL = timedelta(minutes=15)
+POLL_BACKOFF = 1.5
+GIVE_UP_AFTER = timedelta(hours=5)
+REFRESH_INTERVAL = timedelta(hours=6)
+# Fixtures further ahead are picked up by a later refresh
+HORIZON = timedelta(hours=36)
+STATE_RETENTION = timedelta(days=8)
+
+
+def parse_utc_time(value):
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%fZ").replace(tzinfo=timezone.utc)
+
+
+@dataclass(slots=True)
+class WatchedMatch:
+    page_url: str
+    fixture: dict
+    kickoff: datetime
+    # canonical team name -> (the team's name on FotMob, the fixture from its team page),
+    # for every subscribed team in the match; opponent is relative to the team
+    teams: dict
+    next_check: datetime
+    interval: timedelta = POLL_INTERVAL
+
+    def reschedule(self, kickoff):
+        self.kickoff = kickoff
+        self.next_check = kickoff + FULL_TIME_AFTER
+        self.interval = POLL_INTERVAL
+
+
+class Watcher:
+    def __init__(self, teams, state_path=STATE_PATH):
+        self.teams = teams
+        self.state_path = state_path
+        self.state = self.load_state()
+        self.watched = {}
+        self.next_refresh = None
+
+    ### STATE ###
+    def load_state(self):
+        """{"done": {page_url: kickoff}, "reports": {team: {day: {page_url: match dict}}}}"""
+        if not os.path.exists(self.state_path):
+            return {"done": {}, "reports": {}}
+        with open(self.state_path, "r") as f:
+            return json.load(f)
+
+    def save_state(self, now):
+        cutoff = now - STATE_RETENTION
+        self.state["done"] = {
+            page_url: kickoff for page_url, kickoff in self.state["done"].items()
+            if datetime.fromisoformat(kickoff) >= cutoff
+        }
+        oldest_day = output_date(cutoff)
+        for days in self.state["reports"].values():
+            for day in [day for day in days if day < oldest_day]:
+                del days[day]
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        with open(self.state_path + ".tmp", "w") as f:
+            json.dump(self.state, f, ensure_ascii=False)
+        os.replace(self.state_path + ".tmp", self.state_path)
+
+    ### FIXTURES ###
+    def refresh(self, now):
+        """Re-read every team page and start watching matches that kick off within HORIZON"""
+        for team in self.teams:
+            name = team["name"]
+            entry = team_registry.get(name) or {}
+            if "fotmob_id" not in entry:
+                print(f"Warning: Team '{name}' not found in FOTMOB_TEAMS")
+                continue
+            try:
+                with tracer.team(name), tracer.span("watch.team_page"):
+                    team_data = fot_mob_crawler._get_team_data(entry["fotmob_id"])
+            except Exception as e:
+                print(f"[{name}] FotMob team page failed, keeping the current schedule: {e}")
+                continue
+            if not team_data:
+                print(f"[{name}] could not capture FotMob team data, keeping the current schedule")
+                continue
+            fotmob_name = fot_mob_crawler._transform_team_name(team_data.get("details", {}).get("name", name))
+
+            for fixture, kickoff in fot_mob_crawler.get_fixtures(now - GIVE_UP_AFTER, now + HORIZON, team_data):
+                page_url = fixture.get("pageUrl")
+                if not page_url or page_url in self.state["done"] or fixture.get("status", {}).get("cancelled"):
+                    continue
+                watched = self.watched.get(page_url)
+                if watched is None:
+                    self.watched[page_url] = WatchedMatch(page_url, fixture, kickoff, {name: (fotmob_name, fixture)}, kickoff + FULL_TIME_AFTER)
+                    continue
+                # Keep watched.fixture one of the dicts in teams, so a polled status lands on it
+                watched.teams[name] = (fotmob_name, fixture)
+                watched.fixture = fixture
+                if kickoff != watched.kickoff:
+                    print(f"{page_url} moved to {kickoff:%Y-%m-%d %H:%M} UTC")
+                    watched.reschedule(kickoff)
+        self.next_refresh = now + REFRESH_INTERVAL
+        print(f"Watching {len(self.watched)} match(es)")
+
+    def _status_from_team_page(self, watched):
+        """The match's status from one of its teams' pages, when the matchDetails API gives nothing"""
+        entry = team_registry.get(next(iter(watched.teams))) or {}
+        team_data = fot_mob_crawler._get_team_data(entry["fotmob_id"])
+        for fixture in (team_data or {}).get("fixtures", {}).get("allFixtures", {}).get("fixtures", []):
+            if fixture.get("pageUrl") == watched.page_url:
+                return fixture.get("status")
+        return None
+
+    ### POLLING ###
+    def check(self, watched, now):
+        """Check one due match; collect it when it is finished, otherwise schedule the next check"""
+        with tracer.span("watch.status", url=watched.page_url) as span:
+            status = fot_mob_crawler.get_match_status(watched.fixture.get("id"))
+            if status is None:
+                status = self._status_from_team_page(watched)
+            span.set(finished=bool(status and status.get("finished")))
+        # Decide from the status just polled; the cached fixture only fills in what it left out
+        status = {**watched.fixture.get("status", {}), **(status or {})}
+        for _, fixture in watched.teams.values():
+            fixture["status"] = {**fixture.get("status", {}), **status}
+
+        if status.get("cancelled"):
+            print(f"{watched.page_url} was cancelled")
+            del self.watched[watched.page_url]
+        elif status.get("finished"):
+            self.collect(watched, now)
+        elif not status.get("started") and status.get("utcTime") and parse_utc_time(status["utcTime"]) > watched.kickoff:
+            watched.reschedule(parse_utc_time(status["utcTime"]))
+            print(f"{watched.page_url} moved to {watched.kickoff:%Y-%m-%d %H:%M} UTC")
+        elif now - watched.kickoff > GIVE_UP_AFTER:
+            print(f"{watched.page_url} still not finished {GIVE_UP_AFTER} after kickoff, leaving it to the daily run")
+            del self.watched[watched.page_url]
+        else:
+            watched.next_check = now + watched.interval
+            watched.interval = min(watched.interval * POLL_BACKOFF, MAX_POLL_INTERVAL)
+
+    def collect(self, watched, now):
+        with tracer.span("watch.match_page", url=watched.page_url):
+            details = fot_mob_crawler._analyze_match_details(watched.page_url)
+
+        day = output_date(watched.kickoff)
+        day_start, day_end = fot_mob_crawler.parse_date_range(
+            (datetime.strptime(day, "%Y%m%d") - timedelta(days=1)).strftime("%Y%m%d"), day
+        )
+        for name, (fotmob_name, fixture) in watched.teams.items():
+            match = fot_mob_crawler.build_match(fixture, watched.kickoff, fotmob_name, details)
+            # Every match of the team collected for that day, so a second match does not replace the first
+            reports = self.state["reports"].setdefault(name, {}).setdefault(day, {})
+            reports[watched.page_url] = match.to_dict()
+            matches = sorted((Match.from_dict(data) for data in reports.values()), key=lambda m: m.utc_date or "")
+            with tracer.team(name):
+                write_fotmob_reports(name, day, day_start, day_end, matches, None)
+            print(f"[{name}] {match.home_team} {match.score} {match.away_team} written to datas/fotmob/{day}/")
+        write_bundle(day)
+
+        self.state["done"][watched.page_url] = watched.kickoff.isoformat()
+        self.save_state(now)
+        del self.watched[watched.page_url]
+
+    def run(self, until=None):
+        while True:
+            now = datetime.now(timezone.utc)
+            if until is not None and now >= until:
+                return
+            if self.next_refresh is None or now >= self.next_refresh:
+                self.refresh(now)
+
+            due = sorted((w for w in self.watched.values() if w.next_check <= now), key=lambda w: w.next_check)
+            for watched in due:
+                try:
+                    self.check(watched, now)
+                except Exception as e:
+                    print(f"{watched.page_url} check failed: {e}")
+                    watched.next_check = now + watched.interval
+                    watched.interval = min(watched.interval * POLL_BACKOFF, MAX_POLL_INTERVAL)
+            if tracer.spans:
+                tracer.write()
+                tracer.start_run("watch")
+
+            wake = min([w.next_check for w in self.watched.values()] + [self.next_refresh] + ([until] if until else []))
+            upcoming = min(self.watched.values(), key=lambda w: w.next_check, default=None)
+            if upcoming is not None and upcoming.next_check == wake:
+                print(f"Next check: {upcoming.page_url} at {wake:%Y-%m-%d %H:%M} UTC")
+            time.sleep(max(0.0, (wake - datetime.now(timezone.utc)).total_seconds()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collect each match as soon as it finishes")
+    parser.add_argument("--teams", type=str, help="Comma-separated team names (default: every team in setting.yml)")
+    parser.add_argument("--hours", type=float, help="Stop after this many hours (default: run until stopped)")
+    args = parser.parse_args()
+
+    teams = TEAMS
+    if args.teams:
+        wanted = [name.strip() for name in args.teams.split(",")]
+        unknown = [name for name in wanted if name not in {team["name"] for team in TEAMS}]
+        if unknown:
+            parser.error(f"Unknown team(s): {', '.join(unknown)}")
+        teams = [team for team in TEAMS if team["name"] in wanted]
+    until = datetime.now(timezone.utc) + timedelta(hours=args.hours) if args.hours else None
+
+    tracer.start_run("watch")
+    try:
+        Watcher(teams).run(until)
+    except KeyboardInterrupt:
+        print("Stopped")
+    finally:
+        if tracer.spans:
+            tracer.write()
+
+
+if __name__ == "__main__":
+    main()